@@ -1,25 +1,245 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import argparse
+import asyncio
 import json
 import random
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+
+BASE_URL = 'https://vnexpress.net'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+CATEGORIES = [
+    {'name': 'Chính trị', 'path': '/thoi-su', 'category_id': 1},
+    {'name': 'Sức khỏe', 'path': '/suc-khoe', 'category_id': 2},
+    {'name': 'Khoa học', 'path': '/khoa-hoc-cong-nghe/bo-khoa-hoc-va-cong-nghe', 'category_id': 3},
+    {'name': 'Công nghệ', 'path': '/khoa-hoc-cong-nghe/ai', 'category_id': 4},
+    {'name': 'Kinh doanh', 'path': '/goc-nhin', 'category_id': 5},
+    {'name': 'Thể thao', 'path': '/the-thao', 'category_id': 6},
+]
+
+LINK_SELECTOR = 'h3.title-news a, h2.title-news a, h3 a.title-news'
+NO_TITLE = 'Không có tiêu đề'
+NO_CONTENT = 'Không thể lấy nội dung'
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# ========= Phân tích HTML (selectolax, không cần trình duyệt) ==========
+def parse_article_links(html, page_url, base_url=BASE_URL, sl=5):
+    """Link bài viết trên trang danh mục (giữ thứ tự, bỏ trùng và link ngoài site)."""
+    tree = LexborHTMLParser(html)
+    links = []
+    for node in tree.css(LINK_SELECTOR):
+        href = node.attributes.get('href')
+        if not href:
+            continue
+        link = urljoin(page_url, href)
+        if link.startswith(base_url.rstrip('/') + '/') and link not in links:
+            links.append(link)
+    return links[:sl]
+
+
+def parse_post(html):
+    """(tiêu đề, nội dung) của trang bài viết; nội dung None nếu trang không có phần mô tả."""
+    tree = LexborHTMLParser(html)
+
+    title_element = tree.css_first('h1.title-detail') or tree.css_first('h1')
+    title = title_element.text().strip() if title_element else ''
+
+    description = tree.css_first('p.description')
+    if description is None:
+        return title or NO_TITLE, None
+    content_text = '\n'.join(
+        text for text in (elem.text().strip() for elem in tree.css('article.fck_detail p.Normal')) if text
+    )
+    return title or NO_TITLE, description.text().strip() + '\n\n' + content_text
+
+
+def make_post(title, content, category_id):
+    crawl_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        "user_id": random.choice([8, 9]),
+        "category_id": category_id,
+        "title": title,
+        "content": content,
+        "status": "published",
+        "published_at": crawl_time,
+        "updated_at": None,
+        "credibility_score": 99.0,
+        "credibility_label": "Thật",
+        "created_at": crawl_time
+    }
+
+
+def save_to_json(data, filename='data.json'):
+    """Lưu dữ liệu vào file JSON"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# ========= Giới hạn theo host ==========
+class HostLimiter:
+    """Mỗi host: tối đa per_host request cùng lúc, các request bắt đầu cách nhau >= delay (+ jitter) giây."""
+
+    def __init__(self, per_host=2, delay=0.5, jitter=0.25):
+        self.per_host = per_host
+        self.delay = delay
+        self.jitter = jitter
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            # Giữ chỗ trước khi chờ để các request sau xếp hàng nối tiếp
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay + random.uniform(0, self.jitter)
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+    def penalize(self, host, seconds):
+        """Host trả 429 / Retry-After: dời mọi request kế tiếp của host."""
+        loop = asyncio.get_running_loop()
+        self._next_start[host] = max(self._next_start.get(host, 0), loop.time() + seconds)
+
+
+# ========= Crawler HTTP bất đồng bộ ==========
+class AsyncVnExpressCrawler:
+    def __init__(self, base_url=BASE_URL, categories=None, concurrency=8, per_host=2, delay=0.5, jitter=0.25,
+                 timeout=15.0, retries=2, selenium_fallback=False):
+        self.base_url = base_url.rstrip('/')
+        self.categories = [
+            {**category, 'url': self.base_url + category['path']} for category in (categories or CATEGORIES)
+        ]
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = HostLimiter(per_host, delay, jitter)
+        # Selenium chỉ dùng khi bật và trang không đọc được qua HTTP
+        self.selenium_fallback = selenium_fallback
+        self._selenium = None
+        self._selenium_lock = asyncio.Lock()
+        self._client = None
+        self.stats = {'requests': 0, 'retries': 0, 'failed': 0, 'selenium': 0}
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            timeout=self.timeout,
+            follow_redirects=True,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._selenium is not None:
+            await asyncio.to_thread(self._selenium.close)
+            self._selenium = None
+
+    async def fetch(self, url):
+        """HTML của url, None nếu lỗi (thử lại khi 429 / 5xx / lỗi mạng)."""
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.limiter.slot(host):
+                    self.stats['requests'] += 1
+                    response = await self._client.get(url)
+            except httpx.HTTPError:
+                response = None
+            if response is not None and response.status_code not in RETRY_STATUS:
+                if response.is_success:
+                    return response.text
+                break
+            if attempt < self.retries:
+                self.stats['retries'] += 1
+                wait = _retry_after(response) if response is not None else None
+                self.limiter.penalize(host, wait if wait is not None else 2 ** attempt)
+        self.stats['failed'] += 1
+        return None
+
+    async def get_article_links(self, category_url, sl=5):
+        html = await self.fetch(category_url)
+        if html is None:
+            return []
+        return parse_article_links(html, category_url, self.base_url, sl)
+
+    async def craw_post(self, url, category_id):
+        html = await self.fetch(url)
+        title, content = parse_post(html) if html is not None else (None, None)
+        if content is None and self.selenium_fallback:
+            return await self._craw_post_selenium(url, category_id)
+        if html is None:
+            return None
+        return make_post(title, content if content is not None else NO_CONTENT, category_id)
+
+    async def crawl_category(self, category, articles_per_category=5):
+        links = await self.get_article_links(category['url'], articles_per_category)
+        posts = await asyncio.gather(*(self.craw_post(link, category['category_id']) for link in links))
+        return [post for post in posts if post]
+
+    async def start_crawk(self, articles_per_category=5):
+        """Cào song song mọi danh mục, kết quả giữ thứ tự danh mục / bài viết."""
+        results = await asyncio.gather(
+            *(self.crawl_category(category, articles_per_category) for category in self.categories)
+        )
+        return [post for posts in results for post in posts]
+
+    async def _craw_post_selenium(self, url, category_id):
+        # 1 Chrome dùng chung, lần lượt từng trang
+        async with self._selenium_lock:
+            if self._selenium is None:
+                self._selenium = await asyncio.to_thread(VnExpressScraper)
+            self.stats['selenium'] += 1
+            return await asyncio.to_thread(self._selenium.craw_post, url, category_id)
 
 
+def _retry_after(response):
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ========= Selenium (tuỳ chọn, --selenium-fallback) ==========
 class VnExpressScraper:
-    def __init__(self):
+    def __init__(self, base_url=BASE_URL):
+        # Chỉ cần selenium / webdriver-manager khi dùng fallback
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
         # Cấu hình Chrome options
         chrome_options = Options()
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
         chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
         chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
@@ -28,105 +248,30 @@ class VnExpressScraper:
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.wait = WebDriverWait(self.driver, 10)
 
-        
-        self.categories = [
-            {
-                'name': 'Chính trị',
-                'url': 'https://vnexpress.net/thoi-su',
-                'category_id': 1
-            },
-            {
-                'name': 'Sức khỏe',
-                'url': 'https://vnexpress.net/suc-khoe',
-                'category_id': 2
-            },
-            {
-                'name': 'Khoa học',
-                'url': 'https://vnexpress.net/khoa-hoc-cong-nghe/bo-khoa-hoc-va-cong-nghe',
-                'category_id': 3
-            },
-            {
-                'name': 'Công nghệ',
-                'url': 'https://vnexpress.net/khoa-hoc-cong-nghe/ai',
-                'category_id': 4
-            },
-            {
-                'name': 'Kinh doanh',
-                'url': 'https://vnexpress.net/goc-nhin',
-                'category_id': 5
-            },
-            {
-                'name': 'Thể thao',
-                'url': 'https://vnexpress.net/the-thao',
-                'category_id': 6
-            }
-        ]
+        self.base_url = base_url.rstrip('/')
+        self.categories = [{**category, 'url': self.base_url + category['path']} for category in CATEGORIES]
 
 
     # ========= Lấy danh sách link bài viết từ trang danh mục ==========
     def get_article_links(self, category_url, sl=5):
         self.driver.get(category_url)
         time.sleep(3)
-
-        link_bai_viet = []
-        bai_viet = self.driver.find_elements(By.CSS_SELECTOR, 'h3.title-news a, h2.title-news a, h3 a.title-news')
-
-        for s in bai_viet[:sl]:
-            link = s.get_attribute('href')
-            if link and link.startswith('https://vnexpress.net/'):
-                link_bai_viet.append(link)
-
-        return list(set(link_bai_viet))[:sl]
+        return parse_article_links(self.driver.page_source, category_url, self.base_url, sl)
 
     # ========= Craw dữ liều từng bài viết ==========
     def craw_post(self, url, category_id):
-        
+
         try:
             self.driver.get(url)
             time.sleep(2)
-
-            crawl_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Lấy tiêu đề
-            title = ''
-            try:
-                title_element = self.driver.find_element(By.CSS_SELECTOR, 'h1.title-detail')
-                title = title_element.text.strip()
-            except:
-                try:
-                    title_element = self.driver.find_element(By.CSS_SELECTOR, 'h1')
-                    title = title_element.text.strip()
-                except:
-                    title = 'Không có tiêu đề'
-
-            # Lấy nội dung
-            content = ''
-            try:
-                description = self.driver.find_element(By.CSS_SELECTOR, 'p.description').text.strip()
-                content_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article.fck_detail p.Normal')
-                content_text = '\n'.join([elem.text.strip() for elem in content_elements if elem.text.strip()])
-                content = description + '\n\n' + content_text
-            except:
-                content = 'Không thể lấy nội dung'
-
-            return {
-                "user_id": random.choice([8, 9]),
-                "category_id": category_id,
-                "title": title,
-                "content": content,
-                "status": "published",
-                "published_at": crawl_time,
-                "updated_at": None,
-                "credibility_score": 99.0,
-                "credibility_label": "Thật",
-                "created_at": crawl_time
-            }
+            title, content = parse_post(self.driver.page_source)
+            return make_post(title, content if content is not None else NO_CONTENT, category_id)
 
         except Exception as e:
             return None
 
     def start_crawk(self, articles_per_category=5):
-        
+
         res = []
 
         for category in self.categories:
@@ -141,7 +286,7 @@ class VnExpressScraper:
 
                     if article_data:
                         res.append(article_data)
-                    time.sleep(1)  
+                    time.sleep(1)
 
             except Exception as e:
                 continue
@@ -150,25 +295,42 @@ class VnExpressScraper:
 
     def save_to_json(self, data, filename='data.json'):
         """Lưu dữ liệu vào file JSON"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
+        save_to_json(data, filename)
+
     def close(self):
         """Đóng browser"""
         self.driver.quit()
 
 
+async def crawl(args):
+    async with AsyncVnExpressCrawler(
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        delay=args.delay,
+        selenium_fallback=args.selenium_fallback,
+    ) as crawler:
+        articles = await crawler.start_crawk(articles_per_category=args.articles)
+        print(f"Đã cào {len(articles)} bài viết ({crawler.stats})")
+        return articles
+
+
 # Sử dụng
+#     python CrawDataVNEXPRESS.py --articles 8
+#     python CrawDataVNEXPRESS.py --selenium-fallback   # trang không đọc được qua HTTP -> Chrome
 if __name__ == '__main__':
-    scraper = VnExpressScraper()
-    try:
-        # ==== CRAWL ====
-        articles = scraper.start_crawk(articles_per_category=8)
-
-        # Lưu vào file JSON
-        scraper.save_to_json(articles)
+    parser = argparse.ArgumentParser(description='Cào bài viết VnExpress')
+    parser.add_argument('--articles', type=int, default=8, help='Số bài mỗi danh mục')
+    parser.add_argument('--concurrency', type=int, default=8, help='Số kết nối HTTP tối đa')
+    parser.add_argument('--per-host', type=int, default=2, help='Số request đồng thời tối đa mỗi host')
+    parser.add_argument('--delay', type=float, default=0.5, help='Khoảng cách tối thiểu (giây) giữa 2 request tới 1 host')
+    parser.add_argument('--selenium-fallback', action='store_true', help='Dùng Chrome khi trang không đọc được qua HTTP')
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--output', default='data.json')
+    args = parser.parse_args()
 
+    # ==== CRAWL ====
+    articles = asyncio.run(crawl(args))
 
-    finally:
-        scraper.close()
-        
\ No newline at end of file
+    # Lưu vào file JSON
+    save_to_json(articles, args.output)
@@ -1,5 +1,29 @@
 const API_BASE_URL = 'http://localhost:8000';
 
+// Sau khi ghi, server trả header X-Read-Primary-Until (thời điểm epoch, giây);
+// gửi lại header này cho đến khi hết hạn để đọc ngay được dữ liệu vừa ghi
+// (server đọc từ primary thay vì replica / cache)
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+const READ_PRIMARY_KEY = 'read_primary_until';
+
+function rememberReadPrimary(response) {
+    const until = response.headers.get(READ_PRIMARY_HEADER);
+    if (until) {
+        localStorage.setItem(READ_PRIMARY_KEY, until);
+    }
+}
+
+function readPrimaryHeaders() {
+    // Giá trị "<epoch hết hạn>.<chữ ký>" do server ký, gửi lại nguyên vẹn
+    const pin = localStorage.getItem(READ_PRIMARY_KEY) || '';
+    const until = Number(pin.split('.')[0] || 0);
+    if (until * 1000 > Date.now()) {
+        return { [READ_PRIMARY_HEADER]: pin };
+    }
+    localStorage.removeItem(READ_PRIMARY_KEY);
+    return {};
+}
+
 class APIClient {
     constructor(baseURL = API_BASE_URL) {
         this.baseURL = baseURL;
@@ -13,6 +37,7 @@ class APIClient {
     getHeaders() {
         const headers = {
             'Content-Type': 'application/json',
+            ...readPrimaryHeaders(),
         };
         const token = this.getToken(); 
         if (token && token.trim() !== '') {
@@ -46,6 +71,7 @@ class APIClient {
 
         try {
             const response = await fetch(url, config);
+            rememberReadPrimary(response);
             
             console.log('API Response:', {
                 status: response.status,
@@ -97,12 +123,14 @@ class APIClient {
             ...options,
             headers: {
                 'Content-Type': 'application/json',
+                ...readPrimaryHeaders(),
                 ...options.headers,
             },
         };
 
         try {
             const response = await fetch(url, config);
+            rememberReadPrimary(response);
             
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
@@ -261,6 +289,7 @@ class APIClient {
                 headers: headers,
                 body: formData,
             });
+            rememberReadPrimary(response);
 
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
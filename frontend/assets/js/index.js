@@ -233,7 +233,7 @@ class NewsManager {
                         <span class="text-xs text-gray-500">${credibilityPercentage}% tin cậy</span>
                     </div>
                     <h3 class="text-xl font-bold text-gray-800 mb-3 leading-tight line-clamp-2">${post.title}</h3>
-                    <p class="text-gray-600 mb-4 leading-relaxed line-clamp-2">${post.content.substring(0, 100)}...</p>
+                    <p class="text-gray-600 mb-4 leading-relaxed line-clamp-2">${(post.excerpt || '').substring(0, 100)}...</p>
                     <div class="flex items-center justify-between text-sm text-gray-500">
                         <div class="flex items-center gap-2">
                             <i data-feather="calendar" class="w-4 h-4"></i>
@@ -149,7 +149,7 @@ class PostHistoryPage {
                                 ${credibilityBadge}
                             </div>
                             <h3 class="text-xl font-bold text-gray-800 mb-2 leading-tight">${this.escapeHtml(post.title)}</h3>
-                            <p class="text-gray-600 mb-3 line-clamp-2">${this.escapeHtml(post.content || 'Không có nội dung').substring(0, 150)}...</p>
+                            <p class="text-gray-600 mb-3 line-clamp-2">${this.escapeHtml(post.excerpt || 'Không có nội dung').substring(0, 150)}...</p>
                         </div>
                     </div>
 
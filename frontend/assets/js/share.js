@@ -246,6 +246,12 @@ async function sharePost(formData) {
         body: JSON.stringify(payload)
     });
     
+    // Ghim đọc primary như rememberReadPrimary() trong api.js
+    const readPrimaryUntil = response.headers.get('X-Read-Primary-Until');
+    if (readPrimaryUntil) {
+        localStorage.setItem('read_primary_until', readPrimaryUntil);
+    }
+    
     if (!response.ok) {
         if (response.status === 401) {
             throw new Error('401 Unauthorized');
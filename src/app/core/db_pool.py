@@ -0,0 +1,95 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+# ===================================================================
+#  CONNECTION POOL
+#  Engine async với pool cấu hình được + đo thời gian chờ lấy connection,
+#  dùng để chọn pool_size phù hợp với số worker uvicorn.
+# ===================================================================
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool có đếm số lần checkout và thời gian chờ."""
+
+    # Checkout lâu hơn ngưỡng này được tính là "phải chờ": pool hết connection
+    # rảnh, hoặc phải mở connection mới (overflow / pool chưa đầy)
+    WAIT_THRESHOLD = 0.001
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                if elapsed >= self.WAIT_THRESHOLD:
+                    self.waits += 1
+                    self.wait_seconds += elapsed
+                    self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+
+def create_db_engine(
+    url: str,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    echo: bool = False,
+) -> AsyncEngine:
+    """Tạo AsyncEngine với TimedQueuePool theo các tham số pool."""
+    return create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        echo=echo,
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        waits = pool.waits or 1
+        stats.update({
+            "checkouts": pool.checkouts,
+            "waits": pool.waits,
+            "timeouts": pool.timeouts,
+            "avg_wait_ms": round(pool.wait_seconds / waits * 1000, 3),
+            "max_wait_ms": round(pool.max_wait_seconds * 1000, 3),
+        })
+    return stats
@@ -0,0 +1,100 @@
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Sequence
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.db_pool import create_db_engine, pool_stats
+
+
+# ===================================================================
+#  READ REPLICAS
+#  Session cho các route chỉ đọc được mở trên replica theo round-robin.
+#  Replica không kết nối được bị loại khỏi vòng trong retry_seconds rồi
+#  thử lại; hết replica dùng được thì đọc từ primary.
+#  Ghi và đọc-ngay-sau-khi-ghi luôn đi primary (app.dependency.database).
+#  Failover: tests/test_read_replicas.py
+# ===================================================================
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        urls: Sequence[str],
+        retry_seconds: float = 30,
+        **engine_kwargs,
+    ):
+        self.primary = primary
+        self.urls = list(urls)
+        self.retry_seconds = retry_seconds
+        self.engines = [create_db_engine(url, **engine_kwargs) for url in self.urls]
+        self.sessions = [
+            async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        self._down_until = [0.0] * len(self.engines)
+        self.reads = [0] * len(self.engines)
+        self.failures = [0] * len(self.engines)
+        self.primary_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> List[int]:
+        """Replica theo thứ tự round-robin, bỏ qua replica đang bị đánh dấu lỗi."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [index for index in range(len(self.engines)) if self._down_until[index] <= now]
+            if not healthy:
+                return []
+            start = next(self._next) % len(healthy)
+            return healthy[start:] + healthy[:start]
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self.failures[index] += 1
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    @asynccontextmanager
+    async def session(self, pinned: bool = False) -> AsyncIterator[AsyncSession]:
+        """Session đọc: replica còn sống tiếp theo, hoặc primary nếu pinned / hết replica."""
+        if self.enabled and not pinned:
+            for index in self.candidates():
+                db = self.sessions[index]()
+                try:
+                    # Lấy connection ngay để phát hiện replica chết trước khi vào handler
+                    await db.connection()
+                except (exc.DBAPIError, OSError):
+                    await db.close()
+                    self.mark_down(index)
+                    continue
+                self.reads[index] += 1
+                async with db:
+                    yield db
+                return
+        self.primary_reads += 1
+        async with self.primary() as db:
+            yield db
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._down_until[index] <= now,
+                "reads": self.reads[index],
+                "failures": self.failures[index],
+                "pool": pool_stats(engine),
+            }
+            for index, engine in enumerate(self.engines)
+        ]
@@ -0,0 +1,153 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import FEED_CACHE_SIZE, FEED_CACHE_TTL
+from app.dependency.database import pinned_to_primary
+from app.dependency.pagination import NEXT_CURSOR_HEADER
+from app.dependency.posts import project
+from app.models.Post_images import PostImage
+from app.models.Posts import Post
+from app.schemas.Posts import PostSimple
+
+
+# ===================================================================
+#  FEED CACHE
+#  Cache JSON đã serialize của các trang /posts/published và
+#  /posts/category/{id} theo (filter, skip, limit, cursor), kèm ETag
+#  (sha1 của payload). Request có If-None-Match khớp -> 304, không query DB.
+#  Không dùng Last-Modified: xóa / unpublish / đổi thứ tự bài viết có thể
+#  không đổi updated_at lớn nhất của trang -> If-Modified-Since trả 304 sai.
+#  Mọi commit thêm / sửa / xóa Post hoặc ảnh xóa toàn bộ cache của worker;
+#  worker khác tự hết hạn sau ttl giây.
+# ===================================================================
+
+FEED_ADAPTER = TypeAdapter(List[PostSimple])
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+
+    def not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+        return False
+
+    def response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.next_cursor:
+            headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.not_modified(request):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class FeedCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, FeedEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable, request: Request) -> Optional[FeedEntry]:
+        # Client vừa ghi (đang đọc primary) luôn nhận dữ liệu mới
+        if not self.enabled or pinned_to_primary(request):
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        entry = item[1]
+        if entry.not_modified(request):
+            self.not_modified += 1
+        return entry
+
+    def put(self, key: Hashable, posts, columns: Sequence[str], response: Response, request: Request) -> FeedEntry:
+        """Serialize các trường columns của 1 trang bài viết thành FeedEntry và lưu vào cache."""
+        rows = FEED_ADAPTER.validate_python(project(posts, columns))
+        body = FEED_ADAPTER.dump_json(rows, exclude_unset=True)
+        entry = FeedEntry(
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            next_cursor=response.headers.get(NEXT_CURSOR_HEADER),
+        )
+        if self.enabled and not pinned_to_primary(request):
+            with self._lock:
+                self._data[key] = (time.monotonic() + self.ttl, entry)
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        return entry
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._data),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+feed_cache = FeedCache(FEED_CACHE_SIZE, FEED_CACHE_TTL)
+
+
+# ===================================================================
+#  Commit có thay đổi Post / PostImage (publish, unpublish, update, delete,
+#  thêm ảnh...) -> xóa cache
+# ===================================================================
+
+PENDING_KEY = "feed_cache_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_feed_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Post, PostImage)):
+            session.info[PENDING_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_feed_cache(session):
+    if session.info.pop(PENDING_KEY, False):
+        feed_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_feed_changes(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,320 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    IMAGE_FORMATS,
+    IMAGE_QUALITY,
+    IMAGE_THUMBNAIL_SIZE,
+    IMAGE_WIDTHS,
+    IMAGE_WORKERS,
+    SessionLocal,
+)
+from app.core.feed_cache import feed_cache
+from app.models.Post_images import PostImage
+
+
+# ===================================================================
+#  IMAGE PIPELINE
+#  Sau khi upload / gắn ảnh vào bài viết, tạo nền (process pool, ngoài
+#  request) các ảnh phái sinh trong thư mục variants/ cạnh ảnh gốc:
+#    - <tên>-thumb.<fmt>: cắt vừa IMAGE_THUMBNAIL_SIZE cho card danh sách
+#    - <tên>-w<W>.<fmt>: thu nhỏ theo IMAGE_WIDTHS (chỉ khi nhỏ hơn ảnh gốc)
+#    - <tên>-full.<fmt>: đúng kích thước gốc (MediaFiles trả thay ảnh gốc
+#      khi trình duyệt Accept định dạng này và file nhỏ hơn)
+#  với mỗi định dạng trong IMAGE_FORMATS (webp, avif nếu Pillow hỗ trợ),
+#  rồi ghi kích thước + danh sách variant vào các dòng PostImage cùng URL.
+#  File đã tồn tại thì không encode lại -> xử lý lại 1 URL gần như miễn phí.
+# ===================================================================
+
+UPLOAD_URL_PREFIX = "/uploads/"
+VARIANTS_SUBDIR = "variants"
+
+
+def local_path(image_url: Optional[str]) -> Optional[str]:
+    """Đường dẫn file của ảnh upload, None với URL ngoài / không hợp lệ."""
+    if not image_url or not image_url.startswith(UPLOAD_URL_PREFIX):
+        return None
+    path = os.path.normpath(image_url.lstrip("/"))
+    if not path.startswith("uploads" + os.sep):
+        return None
+    return path
+
+
+def _to_url(path: str) -> str:
+    return "/" + path.replace(os.sep, "/")
+
+
+def supported_formats(formats: Sequence[str]) -> List[str]:
+    """Các định dạng Pillow encode được (rỗng nếu chưa cài Pillow)."""
+    try:
+        from PIL import features
+    except ImportError:
+        return []
+    result = []
+    for fmt in formats:
+        try:
+            if features.check(fmt):
+                result.append(fmt)
+        except ValueError:
+            pass
+    return result
+
+
+def render_variants(
+    path: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    thumbnail_size: Tuple[int, int],
+    quality: int,
+) -> dict:
+    """Chạy trong process con: tạo ảnh phái sinh của 1 file, trả kích thước + variants."""
+    from PIL import Image, ImageOps
+
+    directory, filename = os.path.split(path)
+    stem = os.path.splitext(filename)[0]
+    out_dir = os.path.join(directory, VARIANTS_SUBDIR)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(path) as original:
+        # Ảnh động (GIF/WebP nhiều frame) chỉ có thumbnail tĩnh từ frame đầu:
+        # bản w*/full sẽ mất animation, client phải nhận ảnh gốc
+        animated = getattr(original, "is_animated", False)
+        image = ImageOps.exif_transpose(original)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        width, height = image.size
+
+        targets = [("thumb", tuple(thumbnail_size), lambda: ImageOps.fit(image, tuple(thumbnail_size), Image.LANCZOS))]
+        if not animated:
+            for target in sorted({w for w in widths if w < width}):
+                size = (target, max(1, round(height * target / width)))
+                targets.append((f"w{target}", size, partial(image.resize, size, Image.LANCZOS)))
+            targets.append(("full", (width, height), lambda: image))
+
+        variants = []
+        for name, size, build in targets:
+            derived = None
+            for fmt in formats:
+                out_path = os.path.join(out_dir, f"{stem}-{name}.{fmt}")
+                if not os.path.exists(out_path):
+                    if derived is None:
+                        derived = build()
+                    temp_path = out_path + ".part"
+                    derived.save(temp_path, format=fmt.upper(), quality=quality)
+                    os.replace(temp_path, out_path)
+                variants.append({
+                    "name": name, "format": fmt, "width": size[0], "height": size[1], "url": _to_url(out_path),
+                })
+    return {"width": width, "height": height, "variants": variants}
+
+
+class ImagePipeline:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        widths: Sequence[int] = (320, 640, 1280),
+        formats: Sequence[str] = ("webp",),
+        thumbnail_size: Tuple[int, int] = (400, 225),
+        quality: int = 80,
+    ):
+        # max_workers = 0: encode trong thread pool mặc định của event loop
+        self.max_workers = max_workers
+        self.widths = list(widths)
+        self.formats = list(formats)
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.quality = quality
+        self._enabled_formats: List[str] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._pending: Set[str] = set()
+        self._rerun: Set[str] = set()
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def available(self) -> bool:
+        return self._loop is not None and bool(self._enabled_formats)
+
+    def start(self) -> None:
+        """Gọi trong event loop của worker (lifespan)."""
+        self._enabled_formats = supported_formats(self.formats)
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def enqueue(self, image_url: str) -> None:
+        """Thread-safe, không chờ: xếp lịch tạo ảnh phái sinh cho 1 URL."""
+        loop = self._loop
+        if loop is None or local_path(image_url) is None:
+            return
+        loop.call_soon_threadsafe(self._schedule, image_url)
+
+    def _schedule(self, image_url: str) -> None:
+        if self._loop is None:
+            return
+        if image_url in self._pending:
+            # Dòng PostImage có thể được tạo sau lúc lượt đang chạy ghi DB -> chạy lại 1 lần
+            self._rerun.add(image_url)
+            return
+        self._pending.add(image_url)
+        task = self._loop.create_task(self.process(image_url))
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._finished, image_url))
+
+    def _finished(self, image_url: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._pending.discard(image_url)
+        if image_url in self._rerun:
+            self._rerun.discard(image_url)
+            self._schedule(image_url)
+
+    async def process(self, image_url: str) -> Optional[dict]:
+        """Tạo ảnh phái sinh và cập nhật các dòng PostImage có image_url này."""
+        path = local_path(image_url)
+        if path is None or not self._enabled_formats or not os.path.exists(path):
+            return None
+        job = partial(render_variants, path, self.widths, self._enabled_formats, self.thumbnail_size, self.quality)
+        pool = self._get_pool()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, job)
+        except BrokenProcessPool:
+            self._reset_pool(pool)
+            self.failed += 1
+            return None
+        except Exception as e:
+            # File hỏng / không phải ảnh: giữ ảnh gốc
+            print(f"[image_pipeline] Không thể xử lý {image_url}: {e}", file=sys.stderr)
+            self.failed += 1
+            return None
+        await self._record(image_url, result)
+        self.processed += 1
+        return result
+
+    async def _record(self, image_url: str, result: dict) -> None:
+        async with SessionLocal() as db:
+            updated = await db.execute(update(PostImage).where(PostImage.image_url == image_url).values(**result))
+            await db.commit()
+        if updated.rowcount:
+            # Danh sách bài viết trả thumbnail_url mới
+            feed_cache.invalidate()
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "workers": self.max_workers,
+            "formats": self._enabled_formats,
+            "widths": self.widths,
+            "thumbnail_size": list(self.thumbnail_size),
+            "in_progress": len(self._pending),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # "spawn" để process con không kế thừa thread/kết nối DB của worker cha
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _reset_pool(self, broken: Optional[ProcessPoolExecutor]) -> None:
+        if broken is None:
+            return
+        with self._lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+image_pipeline = ImagePipeline(
+    max_workers=IMAGE_WORKERS,
+    widths=IMAGE_WIDTHS,
+    formats=IMAGE_FORMATS,
+    thumbnail_size=IMAGE_THUMBNAIL_SIZE,
+    quality=IMAGE_QUALITY,
+)
+
+
+# ===================================================================
+#  Ảnh mới gắn vào bài viết (ở mọi router) -> xử lý sau khi commit
+# ===================================================================
+
+PENDING_KEY = "image_pipeline_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_images(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, PostImage) and obj.variants is None:
+            session.info.setdefault(PENDING_KEY, set()).add(obj.image_url)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_new_images(session):
+    for image_url in session.info.pop(PENDING_KEY, ()):
+        image_pipeline.enqueue(image_url)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_images(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+# ===================================================================
+#  Tạo ảnh phái sinh cho các ảnh đã có trước đó:
+#      cd src && python -m app.core.image_pipeline backfill
+# ===================================================================
+
+async def _backfill() -> int:
+    from app.core.config import engine
+
+    async with SessionLocal() as db:
+        urls = list(await db.scalars(select(PostImage.image_url).where(PostImage.variants.is_(None)).distinct()))
+    image_pipeline.start()
+    try:
+        results = await asyncio.gather(*(image_pipeline.process(url) for url in urls))
+    finally:
+        await image_pipeline.stop()
+        await engine.dispose()
+    return sum(result is not None for result in results)
+
+
+def main(argv: Sequence[str]) -> int:
+    if list(argv[:1]) != ["backfill"]:
+        print("Cách dùng: python -m app.core.image_pipeline backfill")
+        return 2
+    if not supported_formats(IMAGE_FORMATS):
+        print("Chưa cài Pillow (pip install Pillow)")
+        return 1
+    count = asyncio.run(_backfill())
+    print(f"Đã tạo ảnh phái sinh cho {count} ảnh ({image_pipeline.failed} lỗi)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,205 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from app.core.config import INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS, INFERENCE_MAX_QUEUE_SIZE
+from app.core.model_registry import ModelHandle, ModelRegistry, model_registry
+from app.dependency.standard import check_label
+
+
+# ===================================================================
+#  INFERENCE ENGINE
+#  Gom các request đồng thời thành 1 batch (theo kích thước / thời gian chờ),
+#  vectorize thành 1 ma trận sparse và gọi predict_proba 1 lần duy nhất.
+# ===================================================================
+
+class EngineOverloaded(Exception):
+    """Hàng đợi inference đã đầy."""
+
+
+@dataclass(frozen=True)
+class Prediction:
+    classes: tuple
+    probabilities: tuple
+    model_version: str
+
+    def as_check_result(self, fake_class=1) -> dict:
+        """Chuyển xác suất thành các trường của FakeNewsCheckResponse.
+
+        Nhãn được suy ra từ xác suất lớn nhất (tương đương model.predict).
+        """
+        idx = int(np.argmax(self.probabilities))
+        prediction = self.classes[idx]
+
+        proba_dict = {}
+        for class_lb, proba in zip(self.classes, self.probabilities):
+            label_name = "Fake" if class_lb == fake_class else "Real"
+            proba_dict[label_name] = float(proba)
+
+        is_fake = bool(prediction == fake_class)
+        dscore = float(self.probabilities[idx])
+        return {
+            "is_fake": is_fake,
+            "confidence_score": dscore,
+            "credibility_label": check_label(is_fake, dscore),
+            "label": "Fake" if is_fake else "Real",
+            "probabilities": proba_dict,
+        }
+
+
+def score_batch(handle: ModelHandle, texts: Sequence[str]) -> List[Prediction]:
+    """Vectorize + predict_proba cho cả batch văn bản đã tiền xử lý."""
+    if not texts:
+        return []
+    if handle.vectorizer is None:
+        # LinearScorer: tự tách n-gram + TF-IDF, bỏ qua sklearn
+        probas = handle.model.predict_proba(list(texts))
+    else:
+        probas = handle.model.predict_proba(handle.vectorizer.transform(list(texts)))
+    classes = tuple(handle.model.classes_.tolist())
+    return [
+        Prediction(classes=classes, probabilities=tuple(row.tolist()), model_version=handle.version)
+        for row in probas
+    ]
+
+
+class _Request:
+    __slots__ = ("text", "future", "enqueued_at")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceEngine:
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+        max_queue_size: int = 1000,
+    ):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue: "queue.Queue[_Request]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+        self._submitted = 0
+        self._rejected = 0
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._wait_seconds = 0.0
+        self._batch_seconds = 0.0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="inference-engine", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, text: str) -> Future:
+        if self._thread is None:
+            self.start()
+        request = _Request(text)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self._rejected += 1
+            raise EngineOverloaded("Inference queue is full")
+        self._submitted += 1
+        return request.future
+
+    def predict(self, text: str) -> Prediction:
+        """Chấm điểm 1 văn bản đã tiền xử lý (blocking, dùng trong sync route)."""
+        return self.submit(text).result()
+
+    async def apredict(self, text: str) -> Prediction:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stats(self) -> dict:
+        batches = self._batches or 1
+        items = self._items or 1
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize(),
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / batches, 2),
+            "largest_batch": self._largest_batch,
+            "avg_queue_wait_ms": round(self._wait_seconds / items * 1000, 3),
+            "avg_batch_latency_ms": round(self._batch_seconds / batches * 1000, 3),
+        }
+
+    def _collect(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                results = score_batch(self.registry.get(), [r.text for r in batch])
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+            else:
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+            finished = time.perf_counter()
+
+            self._batches += 1
+            self._items += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._wait_seconds += sum(started - r.enqueued_at for r in batch)
+            self._batch_seconds += finished - started
+
+
+inference_engine = InferenceEngine(
+    model_registry,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    max_queue_size=INFERENCE_MAX_QUEUE_SIZE,
+)
@@ -0,0 +1,220 @@
+import re
+import sys
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+# ===================================================================
+#  LINEAR SCORER (thuần NumPy)
+#  TF-IDF + LogisticRegression khi suy luận chỉ là:
+#      n-gram -> tra vocabulary -> tf * idf -> chuẩn hóa L2 -> w.x + b
+#  Export 1 lần các tham số từ file pickle sklearn sang .npz (không pickle)
+#  rồi chấm điểm trực tiếp, bỏ qua phần kiểm tra đầu vào của sklearn.
+# ===================================================================
+
+def check_exportable(vectorizer, model) -> None:
+    """Raise ValueError nếu LinearScorer không tái tạo đúng được vectorizer / model."""
+    if not hasattr(model, "predict_proba"):
+        # score_batch trả xác suất cho API; margin của SVM không phải xác suất
+        raise ValueError("Model không có predict_proba (vd. LinearSVC), không export được")
+    if model.coef_.shape[0] != 1:
+        raise ValueError("Chỉ hỗ trợ model tuyến tính nhị phân")
+    if vectorizer.analyzer != "word" or vectorizer.stop_words or vectorizer.sublinear_tf or vectorizer.binary:
+        raise ValueError("Cấu hình TfidfVectorizer không được hỗ trợ")
+    if vectorizer.preprocessor is not None or vectorizer.tokenizer is not None or vectorizer.strip_accents:
+        # Hàm Python tùy ý không lưu được vào file không pickle
+        raise ValueError("TfidfVectorizer dùng preprocessor / tokenizer / strip_accents, không export được")
+    if not vectorizer.use_idf:
+        raise ValueError("TfidfVectorizer(use_idf=False) không được hỗ trợ")
+
+
+class SortedVocabulary:
+    """Vocabulary dạng bảng chuỗi bytes (UTF-8) độ dài cố định đã sắp xếp.
+
+    Tra cứu bằng np.searchsorted (tìm nhị phân trong C) nên mảng `terms`
+    có thể là vùng nhớ memmap, không cần dựng dict trong từng process.
+    """
+
+    def __init__(self, terms: np.ndarray):
+        self.terms = terms
+        self.width = terms.dtype.itemsize
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, grams: Sequence[str]) -> np.ndarray:
+        """Chỉ số của từng n-gram trong bảng, -1 nếu không có."""
+        result = np.full(len(grams), -1, dtype=np.int64)
+        if not grams:
+            return result
+        encoded = [gram.encode("utf-8") for gram in grams]
+        # n-gram dài hơn độ rộng bảng chắc chắn không có (tránh bị cắt cụt khi ép kiểu)
+        fits = np.fromiter((len(b) <= self.width for b in encoded), dtype=bool, count=len(encoded))
+        keys = np.array([b for b, ok in zip(encoded, fits) if ok], dtype=self.terms.dtype)
+        if keys.size == 0:
+            return result
+        positions = np.searchsorted(self.terms, keys)
+        clipped = np.minimum(positions, len(self.terms) - 1)
+        matched = (positions < len(self.terms)) & (self.terms[clipped] == keys)
+        result[np.flatnonzero(fits)[matched]] = clipped[matched]
+        return result
+
+
+class LinearScorer:
+    def __init__(
+        self,
+        vocabulary: Union[Dict[str, int], "SortedVocabulary"],
+        idf: np.ndarray,
+        coef: Optional[np.ndarray],
+        intercept: float,
+        classes: np.ndarray,
+        kind: str = "logistic",
+        token_pattern: str = r"(?u)\b\w\w+\b",
+        ngram_range=(1, 2),
+        lowercase: bool = True,
+        norm: str = "l2",
+        weighted_coef: Optional[np.ndarray] = None,
+    ):
+        if kind != "logistic":
+            raise ValueError(f"Model loại '{kind}' không có predict_proba, export lại từ LogisticRegression")
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.classes_ = classes
+        self.kind = kind
+        self.token_re = re.compile(token_pattern)
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.norm = norm
+        # idf * coef gộp sẵn: w.(tf*idf) = (w*idf).tf
+        self._weighted_coef = weighted_coef if weighted_coef is not None else idf * coef
+
+    # ---------------- export / load ----------------
+
+    @staticmethod
+    def export(vectorizer, model, path: str) -> None:
+        """Ghi tham số của TfidfVectorizer + model tuyến tính nhị phân ra file .npz."""
+        check_exportable(vectorizer, model)
+
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+        np.savez(
+            path,
+            terms=np.array(terms.tolist(), dtype=str),
+            idf=vectorizer.idf_.astype(np.float64),
+            coef=np.asarray(model.coef_[0], dtype=np.float64),
+            intercept=np.array([model.intercept_[0]], dtype=np.float64),
+            classes=np.asarray(model.classes_),
+            kind=np.array("logistic"),
+            token_pattern=np.array(vectorizer.token_pattern),
+            ngram_range=np.array(vectorizer.ngram_range),
+            lowercase=np.array(vectorizer.lowercase),
+            norm=np.array(vectorizer.norm or ""),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScorer":
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            return cls(
+                vocabulary={term: index for index, term in enumerate(terms)},
+                idf=data["idf"],
+                coef=data["coef"],
+                intercept=float(data["intercept"][0]),
+                classes=data["classes"],
+                kind=str(data["kind"]),
+                token_pattern=str(data["token_pattern"]),
+                ngram_range=tuple(int(n) for n in data["ngram_range"]),
+                lowercase=bool(data["lowercase"]),
+                norm=str(data["norm"]),
+            )
+
+    # ---------------- scoring ----------------
+
+    def _ngrams(self, text: str) -> List[str]:
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_re.findall(text)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                grams.append(" ".join(tokens[i:i + n]))
+        return grams
+
+    def _features(self, text: str):
+        """Chỉ số feature và tần suất (term frequency) của 1 văn bản."""
+        vocabulary = self.vocabulary
+        if not isinstance(vocabulary, dict):
+            found = vocabulary.lookup(self._ngrams(text))
+            indices, tf = np.unique(found[found >= 0], return_counts=True)
+            return indices, tf.astype(np.float64)
+
+        counts: Dict[int, int] = {}
+        for gram in self._ngrams(text):
+            index = vocabulary.get(gram)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return indices, tf
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        scores = np.empty(len(texts), dtype=np.float64)
+        for row, text in enumerate(texts):
+            indices, tf = self._features(text)
+            if indices.size == 0:
+                scores[row] = self.intercept
+                continue
+            dot = float(tf @ self._weighted_coef[indices])
+            if self.norm == "l2":
+                norm = float(np.sqrt(np.dot(tf * self.idf[indices], tf * self.idf[indices])))
+                dot = dot / norm if norm else 0.0
+            elif self.norm == "l1":
+                norm = float(np.abs(tf * self.idf[indices]).sum())
+                dot = dot / norm if norm else 0.0
+            scores[row] = dot + self.intercept
+        return scores
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        p1 = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.classes_[(self.decision_function(texts) > 0).astype(int)]
+
+
+# ===================================================================
+#  Export từ pickle sklearn (khớp với sklearn: tests/test_linear_scorer.py):
+#      cd src && python -m app.core.linear_scorer export [model.pkl] [out.npz]
+# ===================================================================
+
+def _default_paths(argv, extension: str = ".npz"):
+    import os
+    from app.core.config import MODEL_PATH
+
+    model_path = argv[0] if len(argv) > 0 else os.path.splitext(MODEL_PATH)[0] + ".pkl"
+    out_path = argv[1] if len(argv) > 1 else os.path.splitext(model_path)[0] + extension
+    return model_path, out_path
+
+
+def main(argv) -> int:
+    import joblib
+    from app.core.config import VECTORIZER_PATH
+
+    if not argv or argv[0] != "export":
+        print("usage: python -m app.core.linear_scorer export [model.pkl] [out.npz]")
+        return 2
+    model_path, npz_path = _default_paths(argv[1:])
+    LinearScorer.export(joblib.load(VECTORIZER_PATH), joblib.load(model_path), npz_path)
+    print(f"Đã ghi {npz_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,267 @@
+import os
+import re
+import stat
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import MEDIA_IMMUTABLE_MAX_AGE, MEDIA_MAX_AGE
+
+
+# ===================================================================
+#  PHỤC VỤ /uploads
+#  StaticFiles thêm:
+#  - file lưu theo sha256 (ab/cd/<sha256>.<ext>, variants/<sha256>-*.<fmt>)
+#    không bao giờ đổi nội dung: Cache-Control immutable 1 năm, ETag mạnh
+#    = tên file (không đổi khi GC làm mới mtime)
+#  - chọn theo Accept / Accept-Encoding file nhỏ nhất trong: file gốc, bản
+#    AVIF / WebP cùng kích thước do image_pipeline tạo, bản nén sẵn .br / .gz
+#  - If-None-Match / If-Modified-Since -> 304, Range (1 khoảng) -> 206,
+#    If-Range; gửi bằng zero-copy (sendfile) nếu server ASGI hỗ trợ
+# ===================================================================
+
+CONTENT_ADDRESSED_RE = re.compile(r"^(?P<sha>[0-9a-f]{64})(?P<variant>-[a-z0-9]+)?\.(?P<ext>[a-z0-9]+)$")
+ALTERNATE_FORMATS = {"avif": "image/avif", "webp": "image/webp"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+NOT_MODIFIED_HEADERS = ("cache-control", "etag", "last-modified", "vary")
+MEDIA_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "svg": "image/svg+xml",
+}
+
+
+def _accepted(header: Optional[str]) -> List[str]:
+    """Các giá trị được liệt kê rõ trong Accept / Accept-Encoding (bỏ q=0 và */*)."""
+    values = []
+    for item in (header or "").split(","):
+        value, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        if value and "*" not in value and q > 0:
+            values.append(value.lower())
+    return values
+
+
+def _candidates(full_path: str, stat_result: os.stat_result, headers: Headers) -> List[Tuple[str, os.stat_result, str, Optional[str]]]:
+    """(đường dẫn, stat, định dạng, content-encoding) của các bản client nhận được."""
+    directory, filename = os.path.split(full_path)
+    match = CONTENT_ADDRESSED_RE.match(filename)
+    ext = filename.rsplit(".", 1)[-1].lower()
+    found = [(full_path, stat_result, ext, None)]
+
+    accept = _accepted(headers.get("accept"))
+    alternates = []
+    if match and match.group("variant") is None:
+        # Ảnh gốc -> bản cùng kích thước trong variants/
+        stem = os.path.join(directory, "variants", f"{match.group('sha')}-full")
+    elif match:
+        stem = os.path.join(directory, f"{match.group('sha')}{match.group('variant')}")
+    else:
+        stem = None
+    if stem is not None:
+        alternates = [(f"{stem}.{fmt}", fmt, None) for fmt, media_type in ALTERNATE_FORMATS.items()
+                      if fmt != ext and media_type in accept]
+
+    accept_encoding = _accepted(headers.get("accept-encoding"))
+    alternates += [(full_path + suffix, ext, encoding) for encoding, suffix in PRECOMPRESSED if encoding in accept_encoding]
+
+    for path, fmt, encoding in alternates:
+        try:
+            alt_stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(alt_stat.st_mode):
+            found.append((path, alt_stat, fmt, encoding))
+    return found
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Khoảng byte (start, end) của header Range; None = trả toàn bộ file.
+
+    Raise ValueError khi khoảng không hợp lệ với kích thước file (416).
+    Nhiều khoảng (multipart/byteranges) không hỗ trợ -> trả toàn bộ file.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    specs = header[len("bytes="):].split(",")
+    if len(specs) != 1:
+        return None
+    first, sep, last = specs[0].strip().partition("-")
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == "") or not (first or last):
+        return None
+    if first == "":
+        # bytes=-N: N byte cuối
+        start, end = max(0, size - int(last)), size - 1
+        if int(last) == 0:
+            raise ValueError(header)
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class MediaFileResponse(FileResponse):
+    chunk_size = 256 * 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+        self.byte_range: Optional[Tuple[int, int]] = None
+
+    def set_range(self, byte_range: Optional[Tuple[int, int]]) -> None:
+        """Chỉ gửi byte_range (206 Partial Content); None = toàn bộ file."""
+        if byte_range is None:
+            return
+        start, end = byte_range
+        self.byte_range = byte_range
+        self.status_code = 206
+        self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if self.send_header_only or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            # Server tự sendfile() từ fd, không copy qua Python
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend", "file": file,
+                    "offset": start, "count": count, "more_body": False,
+                })
+        elif "http.response.pathsend" in extensions and self.byte_range is None:
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+class MediaFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+        if not (stat_result and stat.S_ISREG(stat_result.st_mode)):
+            return await super().get_response(path, scope)
+
+        headers = Headers(scope=scope)
+        candidates = await anyio.to_thread.run_sync(_candidates, full_path, stat_result, headers)
+        # Bản nhỏ nhất, hòa thì giữ file gốc
+        served_path, served_stat, fmt, encoding = min(candidates, key=lambda c: c[1].st_size)
+        return self.media_response(full_path, served_path, served_stat, fmt, encoding, len(candidates) > 1, scope)
+
+    def media_response(
+        self,
+        full_path: str,
+        served_path: str,
+        served_stat: os.stat_result,
+        fmt: str,
+        encoding: Optional[str],
+        negotiated: bool,
+        scope: Scope,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        filename = os.path.basename(full_path)
+        immutable = CONTENT_ADDRESSED_RE.match(filename) is not None
+
+        response_headers = {}
+        if immutable:
+            response_headers["cache-control"] = f"public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+            response_headers["etag"] = f'"{os.path.basename(served_path)}"'
+        else:
+            response_headers["cache-control"] = f"public, max-age={MEDIA_MAX_AGE}"
+        if immutable or negotiated:
+            # Cùng URL có thể trả AVIF / WebP / bản nén khác nhau tùy header
+            response_headers["vary"] = "Accept, Accept-Encoding"
+        if encoding:
+            response_headers["content-encoding"] = encoding
+
+        response = MediaFileResponse(
+            served_path,
+            stat_result=served_stat,
+            headers=response_headers,
+            media_type=MEDIA_TYPES.get(fmt),
+            method=scope["method"],
+        )
+        if self._not_modified(response.headers, request_headers):
+            return Response(status_code=304, headers=self._subset(response.headers, NOT_MODIFIED_HEADERS))
+
+        range_header = request_headers.get("range")
+        if range_header and encoding is None and self._range_applies(response.headers, request_headers):
+            try:
+                response.set_range(parse_range(range_header, served_stat.st_size))
+            except ValueError:
+                return Response(status_code=416, headers={
+                    "content-range": f"bytes */{served_stat.st_size}",
+                    **self._subset(response.headers, ("etag", "vary")),
+                })
+        return response
+
+    @staticmethod
+    def _subset(headers, names) -> dict:
+        return {name: value for name, value in headers.items() if name in names}
+
+    @staticmethod
+    def _not_modified(response_headers, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # Có If-None-Match thì bỏ qua If-Modified-Since (RFC 9110)
+            etag = response_headers.get("etag")
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or (etag is not None and (etag in tags or f"W/{etag}" in tags))
+        if_modified_since = request_headers.get("if-modified-since")
+        last_modified = response_headers.get("last-modified")
+        if if_modified_since and last_modified:
+            try:
+                return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _range_applies(response_headers, request_headers: Headers) -> bool:
+        # If-Range: chỉ trả 1 phần khi client vẫn giữ đúng phiên bản file
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == response_headers.get("etag")
+        return if_range == response_headers.get("last-modified")
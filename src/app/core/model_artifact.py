@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.core.linear_scorer import LinearScorer, SortedVocabulary, check_exportable
+
+
+# ===================================================================
+#  MODEL ARTIFACT (.tgm) - không pickle, mở bằng numpy.memmap
+#  Bố cục file (little-endian):
+#      8 byte magic | uint32 độ dài header | header JSON (UTF-8)
+#      các section, mỗi section căn lề 64 byte:
+#          terms          S{width}  vocabulary UTF-8 đã sắp xếp theo byte
+#          idf            <f8       theo thứ tự của terms
+#          weighted_coef  <f8       idf * coef, theo thứ tự của terms
+#  Mở file chỉ đọc header + ánh xạ bộ nhớ (O(1), không dựng dict), các
+#  worker uvicorn dùng chung page cache của cùng 1 file. Header chứa sha1
+#  (tính lúc export) và kích thước các section -> model_registry không phải
+#  đọc / hash cả file khi khởi động; verify_artifact() mới tính lại sha1 để so.
+# ===================================================================
+
+MAGIC = b"TGMODEL1"
+ALIGNMENT = 64
+ARTIFACT_EXTENSION = ".tgm"
+SECTION_NAMES = ("terms", "idf", "weighted_coef")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _content_sha1(header: dict, sections: dict) -> str:
+    """sha1 của header (trừ layout / sha1) + dữ liệu các section."""
+    digest = hashlib.sha1()
+    meta = {key: value for key, value in header.items() if key not in ("sections", "sha1")}
+    digest.update(json.dumps(meta, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for name in SECTION_NAMES:
+        digest.update(np.ascontiguousarray(sections[name]).tobytes())
+    return digest.hexdigest()
+
+
+def export_artifact(vectorizer, model, path: str) -> None:
+    """Ghi TfidfVectorizer + model tuyến tính nhị phân ra file .tgm."""
+    check_exportable(vectorizer, model)
+
+    encoded = [b""] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        encoded[index] = term.encode("utf-8")
+    if any(b.endswith(b"\x00") for b in encoded):
+        raise ValueError("Vocabulary chứa ký tự NUL")
+    width = max(len(b) for b in encoded)
+    terms = np.array(encoded, dtype=f"S{width}")
+    order = np.argsort(terms, kind="stable")
+
+    idf = vectorizer.idf_.astype("<f8")
+    coef = np.asarray(model.coef_[0], dtype="<f8")
+    sections = {
+        "terms": terms[order],
+        "idf": idf[order],
+        "weighted_coef": (idf * coef)[order],
+    }
+
+    header = {
+        "kind": "logistic",
+        "intercept": float(model.intercept_[0]),
+        "classes": np.asarray(model.classes_).tolist(),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "lowercase": bool(vectorizer.lowercase),
+        "norm": vectorizer.norm or "",
+        "n_features": len(encoded),
+        "sections": {},
+    }
+    header["sha1"] = _content_sha1(header, sections)
+    # Offset phụ thuộc độ dài header -> tính với header giữ chỗ rồi tính lại
+    for _ in range(2):
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        offset = _align(len(MAGIC) + 4 + len(header_bytes) + 16)
+        layout = {}
+        for name, array in sections.items():
+            layout[name] = {"offset": offset, "dtype": array.dtype.str, "count": len(array)}
+            offset = _align(offset + array.nbytes)
+        header["sections"] = layout
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in sections.items():
+            f.write(b"\x00" * (layout[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    # Ghi file tạm rồi rename: worker đang memmap file cũ không bị đọc dở
+    os.replace(tmp_path, path)
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} không phải model artifact .tgm")
+        (header_size,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(header_size).decode("utf-8"))
+
+
+def header_info(header: dict) -> Tuple[Optional[str], int]:
+    """(sha1, tổng byte các section) ghi trong header; sha1 = None với file
+    export trước khi header có sha1."""
+    nbytes = sum(info["count"] * np.dtype(info["dtype"]).itemsize for info in header["sections"].values())
+    return header.get("sha1"), nbytes
+
+
+def _sections(path: str, header: dict) -> dict:
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def section(name: str) -> np.ndarray:
+        info = header["sections"][name]
+        return np.frombuffer(buffer, dtype=np.dtype(info["dtype"]), count=info["count"], offset=info["offset"])
+
+    return {name: section(name) for name in SECTION_NAMES}
+
+
+def verify_artifact(path: str) -> bool:
+    """Tính lại sha1 của dữ liệu (đọc cả file) và so với sha1 trong header."""
+    header = read_header(path)
+    return header.get("sha1") == _content_sha1(header, _sections(path, header))
+
+
+def open_artifact(path: str, header: Optional[dict] = None) -> LinearScorer:
+    """Ánh xạ file .tgm vào bộ nhớ và trả về LinearScorer (chỉ đọc)."""
+    if header is None:
+        header = read_header(path)
+    sections = _sections(path, header)
+    return LinearScorer(
+        vocabulary=SortedVocabulary(sections["terms"]),
+        idf=sections["idf"],
+        coef=None,
+        weighted_coef=sections["weighted_coef"],
+        intercept=header["intercept"],
+        classes=np.array(header["classes"]),
+        kind=header["kind"],
+        token_pattern=header["token_pattern"],
+        ngram_range=tuple(header["ngram_range"]),
+        lowercase=header["lowercase"],
+        norm=header["norm"],
+    )
+
+
+# ===================================================================
+#  Export từ pickle sklearn (khớp với sklearn: tests/test_model_artifact.py):
+#      cd src && python -m app.core.model_artifact export [model.pkl] [out.tgm]
+# ===================================================================
+
+def main(argv) -> int:
+    import joblib
+    from app.core.config import VECTORIZER_PATH
+    from app.core.linear_scorer import _default_paths
+
+    if not argv or argv[0] != "export":
+        print("usage: python -m app.core.model_artifact export [model.pkl] [out.tgm]")
+        return 2
+    model_path, artifact_path = _default_paths(argv[1:], ARTIFACT_EXTENSION)
+    export_artifact(joblib.load(VECTORIZER_PATH), joblib.load(model_path), artifact_path)
+    print(f"Đã ghi {artifact_path} ({os.path.getsize(artifact_path)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,264 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import joblib
+import numpy as np
+
+from app.core.config import MODEL_PATH, VECTORIZER_PATH, MODEL_WATCH_INTERVAL
+from app.core.linear_scorer import LinearScorer
+from app.core.model_artifact import ARTIFACT_EXTENSION, header_info, open_artifact, read_header
+
+
+# ===================================================================
+#  MODEL REGISTRY
+#  Nạp classifier + TF-IDF vectorizer đúng 1 lần cho mỗi process,
+#  mọi router dùng chung qua `model_registry.get()`.
+#  MODEL_PATH trỏ tới file .npz (app.core.linear_scorer) hoặc .tgm
+#  (app.core.model_artifact, memmap) thì dùng LinearScorer thuần NumPy,
+#  không cần vectorizer / sklearn.
+#  watch_interval > 0: thread nền (start/stop trong lifespan) nạp lại khi
+#  file đổi; nạp lỗi thì giữ handle cũ, request không bao giờ phải chờ nạp.
+# ===================================================================
+
+@dataclass(frozen=True)
+class ArtifactInfo:
+    path: str
+    sha1: str
+    load_seconds: float
+    nbytes: int
+    mtime: float
+
+
+@dataclass(frozen=True)
+class ModelHandle:
+    """Snapshot bất biến của 1 phiên bản model (model + vectorizer).
+
+    vectorizer = None khi model là LinearScorer (nhận trực tiếp văn bản).
+    """
+    version: str
+    model: object
+    vectorizer: Optional[object]
+    loaded_at: datetime
+    artifacts: Dict[str, ArtifactInfo] = field(default_factory=dict)
+
+
+def _file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _deep_nbytes(obj, seen=None) -> int:
+    """Ước lượng bộ nhớ của 1 object (numpy array, dict vocabulary, estimator)."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += _deep_nbytes(k, seen) + _deep_nbytes(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _deep_nbytes(item, seen)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_nbytes(vars(obj), seen)
+    return size
+
+
+def _load_artifact(path: str, loader: Callable = joblib.load):
+    start = time.perf_counter()
+    obj = loader(path)
+    elapsed = time.perf_counter() - start
+    info = ArtifactInfo(
+        path=path,
+        sha1=_file_sha1(path),
+        load_seconds=elapsed,
+        nbytes=_deep_nbytes(obj),
+        mtime=os.path.getmtime(path),
+    )
+    return obj, info
+
+
+def _open_mapped_artifact(path: str):
+    """.tgm: sha1 và kích thước lấy từ header, không đọc / hash cả file."""
+    start = time.perf_counter()
+    mtime = os.path.getmtime(path)
+    header = read_header(path)
+    scorer = open_artifact(path, header)
+    sha1, nbytes = header_info(header)
+    if sha1 is None:
+        # File export trước khi header có sha1 (export lại để bỏ bước này)
+        sha1 = _file_sha1(path)
+    info = ArtifactInfo(
+        path=path,
+        sha1=sha1,
+        load_seconds=time.perf_counter() - start,
+        nbytes=nbytes,
+        mtime=mtime,
+    )
+    return scorer, info
+
+
+# Định dạng artifact không cần vectorizer riêng -> (scorer, ArtifactInfo)
+SCORER_LOADERS = {
+    ".npz": partial(_load_artifact, loader=LinearScorer.load),
+    ARTIFACT_EXTENSION: _open_mapped_artifact,
+}
+
+
+class ModelRegistry:
+    def __init__(self, model_path: str, vectorizer_path: str, watch_interval: float = 0):
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.watch_interval = watch_interval
+
+        self._handle: Optional[ModelHandle] = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._listeners: List[Callable[[ModelHandle], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # mtime của lần nạp lỗi gần nhất: chỉ thử lại khi file đổi tiếp
+        self._failed_mtimes: Optional[tuple] = None
+        self.reload_failures = 0
+        self.last_reload_error: Optional[str] = None
+
+    def get(self) -> ModelHandle:
+        """Trả về handle hiện tại, nạp lazily ở lần gọi đầu tiên."""
+        handle = self._handle
+        if handle is None:
+            with self._lock:
+                if self._handle is None:
+                    self._swap(self._build(self.model_path, self.vectorizer_path))
+                handle = self._handle
+        return handle
+
+    def load(self, model_path: Optional[str] = None, vectorizer_path: Optional[str] = None) -> ModelHandle:
+        """Nạp (hoặc nạp lại) model và hot-swap nguyên tử sang phiên bản mới.
+
+        Việc đọc file diễn ra ngoài lock; các request đang chạy vẫn giữ handle cũ
+        cho đến khi xong.
+        """
+        model_path = model_path or self.model_path
+        vectorizer_path = vectorizer_path or self.vectorizer_path
+        new_handle = self._build(model_path, vectorizer_path)
+        with self._lock:
+            self.model_path = model_path
+            self.vectorizer_path = vectorizer_path
+            return self._swap(new_handle)
+
+    def start(self) -> None:
+        """Chạy thread theo dõi file model (watch_interval > 0)."""
+        if self.watch_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stopping.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout)
+            self._watcher = None
+
+    def reload_if_changed(self) -> bool:
+        """Nạp lại nếu file của handle hiện tại đã đổi; lỗi thì giữ handle cũ."""
+        handle = self._handle
+        if handle is None:
+            return False
+        try:
+            mtimes = tuple(os.path.getmtime(info.path) for info in handle.artifacts.values())
+        except OSError:
+            # File đang được thay (xóa rồi ghi lại): thử lại ở lượt sau
+            return False
+        if mtimes == tuple(info.mtime for info in handle.artifacts.values()) or mtimes == self._failed_mtimes:
+            return False
+        try:
+            self.load()
+        except Exception as e:
+            self._failed_mtimes = mtimes
+            self.reload_failures += 1
+            self.last_reload_error = f"{type(e).__name__}: {e}"
+            print(f"[model_registry] Không thể nạp lại model, giữ {handle.version}: {e}", file=sys.stderr)
+            return False
+        self._failed_mtimes = None
+        self.last_reload_error = None
+        return True
+
+    def add_listener(self, callback: Callable[[ModelHandle], None]) -> None:
+        """Đăng ký callback được gọi mỗi khi model được swap."""
+        self._listeners.append(callback)
+
+    def stats(self) -> dict:
+        handle = self._handle
+        if handle is None:
+            return {"loaded": False, "model_path": self.model_path, "vectorizer_path": self.vectorizer_path}
+        return {
+            "loaded": True,
+            "version": handle.version,
+            "loaded_at": handle.loaded_at.isoformat(),
+            "watch_interval": self.watch_interval,
+            "reload_failures": self.reload_failures,
+            "last_reload_error": self.last_reload_error,
+            "artifacts": {
+                name: {
+                    "path": info.path,
+                    "sha1": info.sha1,
+                    "load_seconds": round(info.load_seconds, 4),
+                    "memory_bytes": info.nbytes,
+                }
+                for name, info in handle.artifacts.items()
+            },
+            "total_memory_bytes": sum(info.nbytes for info in handle.artifacts.values()),
+        }
+
+    def _build(self, model_path: str, vectorizer_path: str) -> ModelHandle:
+        scorer_loader = SCORER_LOADERS.get(os.path.splitext(model_path)[1])
+        if scorer_loader is not None:
+            scorer, scorer_info = scorer_loader(model_path)
+            return ModelHandle(
+                version=scorer_info.sha1[:16],
+                model=scorer,
+                vectorizer=None,
+                loaded_at=datetime.now(),
+                artifacts={"model": scorer_info},
+            )
+        model, model_info = _load_artifact(model_path)
+        vectorizer, vectorizer_info = _load_artifact(vectorizer_path)
+        return ModelHandle(
+            version=f"{model_info.sha1[:8]}{vectorizer_info.sha1[:8]}",
+            model=model,
+            vectorizer=vectorizer,
+            loaded_at=datetime.now(),
+            artifacts={"model": model_info, "vectorizer": vectorizer_info},
+        )
+
+    def _swap(self, handle: ModelHandle) -> ModelHandle:
+        # Gọi khi đang giữ self._lock
+        self._generation += 1
+        handle = replace(handle, version=f"{self._generation}-{handle.version}")
+        self._handle = handle
+        for callback in list(self._listeners):
+            callback(handle)
+        return handle
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.watch_interval):
+            self.reload_if_changed()
+
+
+model_registry = ModelRegistry(MODEL_PATH, VECTORIZER_PATH, watch_interval=MODEL_WATCH_INTERVAL)
@@ -0,0 +1,120 @@
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_WORKERS
+
+
+# ===================================================================
+#  PASSWORD HASHER
+#  bcrypt tốn ~100-300 ms CPU mỗi lần: chạy trên thread pool riêng (bcrypt
+#  nhả GIL khi hash) thay vì threadpool chung của Starlette, giới hạn số
+#  việc đang chờ để đợt đăng nhập dồn dập bị từ chối (429) thay vì làm
+#  chậm các request đọc bài viết.
+# ===================================================================
+
+class PasswordHasherOverloaded(Exception):
+    """Hàng đợi hash password đã đầy."""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = 2, max_queue: int = 32, rounds: int = 12):
+        self.workers = workers
+        self.max_queue = max_queue
+        # deprecated="auto": hash với rounds khác cấu hình hiện tại -> needs_update
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.busy_seconds = 0.0
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self.context.verify, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(đúng password?, hash mới nếu hash cũ dùng rounds khác cấu hình hiện tại)."""
+        ok, new_hash = await self._run(self.context.verify_and_update, password, password_hash)
+        if new_hash is not None:
+            self.rehashed += 1
+        return ok, new_hash
+
+    def _admit(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # Đang chạy (workers) + đang chờ (max_queue)
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherOverloaded("Password hash queue is full")
+            self._pending += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._pool
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.busy_seconds += elapsed
+
+    async def _run(self, fn, *args):
+        pool = self._admit()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, self._timed, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "rounds": self.context.to_dict().get("bcrypt__rounds"),
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "avg_ms": round(self.busy_seconds / completed * 1000, 1),
+        }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, BCRYPT_ROUNDS)
+
+
+# ===================================================================
+#  Đo thời gian 1 lần hash theo rounds để chọn BCRYPT_ROUNDS:
+#      cd src && python -m app.core.password_hasher 10 11 12 13
+# ===================================================================
+
+def main(argv) -> int:
+    for rounds in [int(r) for r in argv] or [BCRYPT_ROUNDS]:
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        started = time.perf_counter()
+        for _ in range(3):
+            context.hash("mật khẩu thử")
+        print(f"rounds={rounds}: {(time.perf_counter() - started) / 3 * 1000:.0f} ms / hash")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
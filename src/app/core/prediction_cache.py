@@ -0,0 +1,186 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_URL
+from app.core.inference import Prediction
+from app.core.model_registry import model_registry
+from app.dependency.normalizer import normalize_text
+
+
+# ===================================================================
+#  PREDICTION CACHE
+#  Key = sha256(normalize_text(title + content)) + phiên bản model.
+#  Bài viết bị dán lại nhiều lần sẽ bỏ qua preprocess + TF-IDF + predict.
+# ===================================================================
+
+def normalize_key_text(title: str, content: str) -> str:
+    # Bước đầu của preprocess_pipeline trên đúng chuỗi các router đưa vào:
+    # phần còn lại (tách từ, stopwords) chỉ phụ thuộc kết quả này, nên 2 văn
+    # bản cùng key luôn cho cùng preprocessed_text
+    return normalize_text(f"{title} {content}")
+
+
+def make_key(title: str, content: str, model_version: str) -> str:
+    digest = hashlib.sha256(normalize_key_text(title, content).encode("utf-8")).hexdigest()
+    return f"prediction:{model_version}:{digest}"
+
+
+class MemoryBackend:
+    """LRU có giới hạn số entry, mỗi entry hết hạn sau ttl giây."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Backend dùng chung giữa các worker; entry cũ tự hết hạn theo TTL.
+
+    Client redis.asyncio: chờ Redis không chặn event loop.
+    """
+
+    def __init__(self, url: str, ttl: float):
+        from redis import asyncio as aioredis
+
+        self.ttl = ttl
+        self._client = aioredis.Redis.from_url(url, socket_timeout=0.05)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str) -> None:
+        # px (mili giây, >= 1): ex=int(ttl) bằng 0 khi ttl < 1 -> Redis báo lỗi
+        await self._client.set(key, value, px=max(1, int(self.ttl * 1000)))
+
+    def clear(self) -> None:
+        # Key đã chứa phiên bản model, không cần xóa trên Redis khi swap
+        pass
+
+
+class PredictionCache:
+    def __init__(self, memory: MemoryBackend, shared=None):
+        self.memory = memory
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_errors = 0
+
+    async def get(self, title: str, content: str, model_version: str) -> Optional[Tuple[str, Prediction]]:
+        """Trả về (preprocessed_text, prediction) nếu đã có trong cache."""
+        key = make_key(title, content, model_version)
+        raw = self.memory.get(key)
+        if raw is None and self.shared is not None:
+            raw = await self._shared_call("get", key)
+            if raw is not None:
+                self.memory.set(key, raw)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        data = json.loads(raw)
+        prediction = Prediction(
+            classes=tuple(data["classes"]),
+            probabilities=tuple(data["probabilities"]),
+            model_version=data["model_version"],
+        )
+        return data["preprocessed_text"], prediction
+
+    async def set(self, title: str, content: str, preprocessed: str, prediction: Prediction) -> None:
+        key = make_key(title, content, prediction.model_version)
+        raw = json.dumps({
+            "preprocessed_text": preprocessed,
+            "classes": list(prediction.classes),
+            "probabilities": list(prediction.probabilities),
+            "model_version": prediction.model_version,
+        }, ensure_ascii=False)
+        self.memory.set(key, raw)
+        if self.shared is not None:
+            await self._shared_call("set", key, raw)
+
+    def invalidate(self, *_args) -> None:
+        # Gọi cả từ thread theo dõi model (listener của model_registry)
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis+memory" if self.shared is not None else "memory",
+            "entries": len(self.memory),
+            "max_entries": self.memory.max_entries,
+            "ttl_seconds": self.memory.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.memory.evictions,
+            "expirations": self.memory.expirations,
+            "shared_errors": self.shared_errors,
+        }
+
+    async def _shared_call(self, method: str, *args):
+        # Backend dùng chung lỗi thì vẫn chạy tiếp với cache trong process
+        try:
+            return await getattr(self.shared, method)(*args)
+        except Exception:
+            self.shared_errors += 1
+            return None
+
+
+def _build_shared_backend():
+    if not PREDICTION_CACHE_URL:
+        return None
+    try:
+        return RedisBackend(PREDICTION_CACHE_URL, PREDICTION_CACHE_TTL)
+    except ImportError:
+        print(
+            "[prediction_cache] PREDICTION_CACHE_URL đã đặt nhưng chưa cài redis (pip install redis), "
+            "chỉ dùng cache trong process",
+            file=sys.stderr,
+        )
+        return None
+
+
+prediction_cache = PredictionCache(
+    MemoryBackend(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL),
+    shared=_build_shared_backend(),
+)
+model_registry.add_listener(prediction_cache.invalidate)
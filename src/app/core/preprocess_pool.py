@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence
+
+from app.core.config import PREPROCESS_WORKERS, PREPROCESS_BATCH_SIZE
+from app.dependency.standard import preprocess_pipeline
+from app.dependency.tokenize_cache import sentence_tokenize_cache
+
+
+# ===================================================================
+#  PREPROCESS EXECUTOR
+#  Chạy preprocess_pipeline (regex + underthesea) trong process pool
+#  để không giữ GIL của worker xử lý request.
+# ===================================================================
+
+def _init_worker():
+    # Nạp sẵn model CRF của underthesea trong process con
+    preprocess_pipeline("khởi động bộ tách từ")
+
+
+def _preprocess_many(texts: Sequence[str], remove_stop: bool):
+    results = [preprocess_pipeline(text, remove_stop=remove_stop) for text in texts]
+    # Gửi kèm thống kê cache tách từ của process con về cho process cha
+    return results, _tokenize_cache_stats()
+
+
+def _noop() -> None:
+    return None
+
+
+def _tokenize_cache_stats() -> dict:
+    return {"pid": os.getpid(), **sentence_tokenize_cache.stats()}
+
+
+class PreprocessExecutor:
+    def __init__(self, max_workers: int = 2, batch_size: int = 32):
+        # max_workers = 0: xử lý ngay trong thread hiện tại (không dùng pool)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._worker_stats = {}
+
+    def start(self) -> None:
+        """Tạo pool và chờ mọi process con nạp xong underthesea."""
+        pool = self._get_pool()
+        if pool is not None:
+            for future in [pool.submit(_noop) for _ in range(self.max_workers)]:
+                future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def submit_many(self, texts: Sequence[str], remove_stop: bool = True) -> Future:
+        pool = self._get_pool()
+        result: Future = Future()
+        if pool is None:
+            result.set_result(self._unpack(_preprocess_many(texts, remove_stop)))
+            return result
+        try:
+            inner = pool.submit(_preprocess_many, list(texts), remove_stop)
+        except BrokenProcessPool:
+            self._reset_pool(pool)
+            return self.submit_many(texts, remove_stop)
+
+        def _done(future: Future) -> None:
+            try:
+                result.set_result(self._unpack(future.result()))
+            except BaseException as e:
+                result.set_exception(e)
+
+        inner.add_done_callback(_done)
+        return result
+
+    def preprocess(self, text: str, remove_stop: bool = True) -> str:
+        """Blocking - dùng trong sync route (thread chờ không giữ GIL)."""
+        return self.submit_many([text], remove_stop).result()[0]
+
+    def preprocess_many(self, texts: Sequence[str], remove_stop: bool = True) -> List[str]:
+        futures = [self.submit_many(chunk, remove_stop) for chunk in self._chunks(texts)]
+        return [text for future in futures for text in future.result()]
+
+    async def run(self, text: str, remove_stop: bool = True) -> str:
+        result = await asyncio.wrap_future(self.submit_many([text], remove_stop))
+        return result[0]
+
+    async def run_many(self, texts: Sequence[str], remove_stop: bool = True) -> List[str]:
+        """Chia batch thành các phần nhỏ và xử lý song song trên nhiều process."""
+        futures = [asyncio.wrap_future(self.submit_many(chunk, remove_stop)) for chunk in self._chunks(texts)]
+        results = await asyncio.gather(*futures)
+        return [text for chunk in results for text in chunk]
+
+    def tokenize_cache_stats(self) -> List[dict]:
+        """Thống kê cache tách từ của từng process (cập nhật sau mỗi batch)."""
+        if self.max_workers <= 0:
+            return [_tokenize_cache_stats()]
+        return list(self._worker_stats.values())
+
+    def _unpack(self, payload) -> List[str]:
+        results, stats = payload
+        self._worker_stats[stats["pid"]] = stats
+        return results
+
+    def _chunks(self, texts: Sequence[str]):
+        texts = list(texts)
+        for start in range(0, len(texts), self.batch_size):
+            yield texts[start:start + self.batch_size]
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # "spawn" để process con không kế thừa thread/kết nối DB của worker cha
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._pool
+
+    def _reset_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+preprocess_executor = PreprocessExecutor(max_workers=PREPROCESS_WORKERS, batch_size=PREPROCESS_BATCH_SIZE)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import AUTH_PRINCIPAL_CACHE_SIZE, AUTH_PRINCIPAL_CACHE_TTL
+from app.models.User import User
+
+
+# ===================================================================
+#  PRINCIPAL CACHE
+#  get_current_user chỉ cần id / username / is_admin: giữ các trường này
+#  theo user id trong ttl giây thay vì SELECT users mỗi request.
+#  Mỗi worker có cache riêng; user bị sửa / xóa được xóa khỏi cache của
+#  worker thực hiện commit, các worker khác tự hết hạn sau ttl.
+# ===================================================================
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    is_admin: bool = False
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is None or item[0] < time.monotonic():
+                self._data.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return item[1]
+
+    def set(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._data.move_to_end(principal.id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Xóa 1 user khỏi cache (user_id=None: xóa toàn bộ)."""
+        with self._lock:
+            if user_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(user_id, None)
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._data),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(AUTH_PRINCIPAL_CACHE_SIZE, AUTH_PRINCIPAL_CACHE_TTL)
+
+
+# ===================================================================
+#  User được sửa / xóa (update_user, đổi quyền admin...) -> xóa khỏi cache
+#  sau khi commit thành công.
+# ===================================================================
+
+PENDING_KEY = "principal_cache_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session, flush_context):
+    pending = session.info.setdefault(PENDING_KEY, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            pending.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_changes(session):
+    for user_id in session.info.pop(PENDING_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop(PENDING_KEY, None)
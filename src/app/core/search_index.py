@@ -0,0 +1,345 @@
+import asyncio
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import SEARCH_INDEX_PATH, SessionLocal
+from app.core.preprocess_pool import preprocess_executor
+from app.models.Posts import Post
+
+
+# ===================================================================
+#  SEARCH INDEX (SQLite FTS5)
+#  Inverted index trên văn bản đã tách từ bởi preprocess_pipeline:
+#    - title / body: từ ghép tiếng Việt ("y_tế" là 1 token, tokenchars '_')
+#    - syllables:    từng âm tiết, để tìm được cả khi gõ 1 phần của từ ghép
+#  unicode61 remove_diacritics 2 + "đ" -> "d": tìm không phân biệt dấu.
+#  Xếp hạng bằng bm25(); chỉ bài viết "published" nằm trong index.
+#  Index được cập nhật từ event after_commit của Session (create / update /
+#  delete Post ở mọi router), xử lý nền trong 1 thread riêng.
+#  Index chỉ được dùng khi đã chứa đủ mọi bài viết (cờ "populated", ghi sau
+#  khi backfill / rebuild xong); trước đó /posts/search dùng ILIKE như cũ.
+# ===================================================================
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, body, syllables,
+    tokenize = "unicode61 remove_diacritics 2 tokenchars '_'"
+)
+"""
+STATE_SCHEMA = "CREATE TABLE IF NOT EXISTS posts_fts_state (key TEXT PRIMARY KEY, value TEXT)"
+POPULATED_KEY = "populated"
+# Phần tử đánh dấu trong hàng đợi: mọi bài viết đưa vào trước nó đã có trong index
+POPULATED_MARK = -1
+
+# Trọng số bm25 theo thứ tự cột: title, body, syllables
+BM25_WEIGHTS = (3.0, 1.5, 1.0)
+TOKEN_RE = re.compile(r"\w+")
+FOLD_D = str.maketrans({"đ": "d", "Đ": "D"})
+
+# Payload = (title, content) nếu bài viết published, None nếu phải xóa khỏi index
+Payload = Optional[Tuple[str, str]]
+
+
+def _fts_query(segmented: str) -> str:
+    """Query FTS5: (mọi từ ghép) OR (mọi âm tiết), mỗi token đặt trong dấu nháy."""
+    words = TOKEN_RE.findall(segmented.translate(FOLD_D))
+    if not words:
+        return ""
+    syllables = [s for word in words for s in word.split("_") if s]
+    word_clause = " AND ".join(f'"{w}"' for w in words)
+    syllable_clause = " AND ".join(f'"{s}"' for s in syllables)
+    if word_clause == syllable_clause:
+        return word_clause
+    return f"({word_clause}) OR ({syllable_clause})"
+
+
+class SearchIndex:
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = path
+        self.batch_size = batch_size
+        self.available = False
+        self._queue: "queue.Queue[Tuple[int, Payload]]" = queue.Queue()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._backfill: Optional[asyncio.Task] = None
+        self.indexed = 0
+        self.removed = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def start(self) -> None:
+        """Tạo bảng FTS5 (nếu chưa có) và chạy thread cập nhật index.
+
+        Gọi trong event loop (lifespan): index chưa đầy đủ thì backfill nền từ database.
+        """
+        if not self.enabled:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(FTS_SCHEMA)
+                conn.execute(STATE_SCHEMA)
+                populated = self._populated(conn)
+            self.available = True
+        except sqlite3.Error as e:
+            # SQLite không có FTS5 -> /posts/search dùng ILIKE như cũ
+            self.available = False
+            self.last_error = str(e)
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+                self._thread.start()
+        if not populated and (self._backfill is None or self._backfill.done()):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # CLI: dùng lệnh rebuild
+                return
+            self._backfill = loop.create_task(self._backfill_from_db())
+
+    def stop(self, timeout: float = 5) -> None:
+        if self._backfill is not None:
+            self._backfill.cancel()
+            self._backfill = None
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def enqueue(self, post_id: int, payload: Payload) -> None:
+        if self.enabled:
+            self._queue.put((post_id, payload))
+
+    def search(self, segmented_query: str, limit: int, offset: int = 0) -> Optional[List[int]]:
+        """Id bài viết khớp query (đã tách từ), sắp theo bm25 tốt nhất trước.
+
+        None nếu index chưa đầy đủ (đang backfill / rebuild).
+        """
+        match = _fts_query(segmented_query)
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        with self._connect() as conn:
+            if not self._populated(conn):
+                return None
+            if not match:
+                return []
+            rows = conn.execute(
+                f"SELECT rowid FROM posts_fts WHERE posts_fts MATCH ? "
+                f"ORDER BY bm25(posts_fts, {weights}) LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    async def asearch(self, query: str, limit: int, offset: int = 0) -> Optional[List[int]]:
+        # Query được tách từ giống hệt lúc index
+        segmented = await preprocess_executor.run(query, remove_stop=False)
+        return await asyncio.to_thread(self.search, segmented, limit, offset)
+
+    def stats(self) -> dict:
+        documents = None
+        populated = False
+        if self.available:
+            with self._connect() as conn:
+                documents = conn.execute("SELECT count(*) FROM posts_fts").fetchone()[0]
+                populated = self._populated(conn)
+        return {
+            "enabled": self.enabled,
+            "available": self.available,
+            "populated": populated,
+            "path": self.path,
+            "documents": documents,
+            "pending": self._queue.qsize(),
+            "indexed": self.indexed,
+            "removed": self.removed,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        # WAL: nhiều worker uvicorn đọc trong khi 1 worker đang ghi
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _populated(conn: sqlite3.Connection) -> bool:
+        return conn.execute("SELECT 1 FROM posts_fts_state WHERE key = ?", (POPULATED_KEY,)).fetchone() is not None
+
+    def _collect(self) -> Dict[int, Payload]:
+        try:
+            post_id, payload = self._queue.get(timeout=0.2)
+        except queue.Empty:
+            return {}
+        batch = {post_id: payload}
+        while len(batch) < self.batch_size:
+            try:
+                post_id, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            # Chỉ giữ thay đổi mới nhất của mỗi bài viết
+            batch[post_id] = payload
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                try:
+                    self._apply(batch)
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = str(e)
+
+    def _apply(self, batch: Dict[int, Payload]) -> None:
+        populated = POPULATED_MARK in batch
+        batch.pop(POPULATED_MARK, None)
+        upserts = [(post_id, payload) for post_id, payload in batch.items() if payload is not None]
+        texts = []
+        for _, (title, content) in upserts:
+            texts.extend([title or "", content or ""])
+        segmented = preprocess_executor.preprocess_many(texts, remove_stop=False) if texts else []
+
+        rows = []
+        for i, (post_id, _) in enumerate(upserts):
+            title, body = segmented[2 * i], segmented[2 * i + 1]
+            syllables = f"{title} {body}".replace("_", " ")
+            rows.append((post_id, title.translate(FOLD_D), body.translate(FOLD_D), syllables.translate(FOLD_D)))
+
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM posts_fts WHERE rowid = ?", [(post_id,) for post_id in batch])
+            conn.executemany("INSERT INTO posts_fts(rowid, title, body, syllables) VALUES (?, ?, ?, ?)", rows)
+            if populated:
+                conn.execute(
+                    "INSERT OR REPLACE INTO posts_fts_state(key, value) VALUES (?, ?)", (POPULATED_KEY, str(time.time()))
+                )
+        self.indexed += len(rows)
+        self.removed += len(batch) - len(rows)
+
+    async def rebuild(self, db) -> int:
+        """Xóa index và đưa lại toàn bộ bài viết published vào hàng đợi."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM posts_fts_state WHERE key = ?", (POPULATED_KEY,))
+            conn.execute("DELETE FROM posts_fts")
+        return await self._enqueue_all(db)
+
+    async def _enqueue_all(self, db) -> int:
+        result = await db.execute(
+            select(Post.id, Post.title, Post.content).where(Post.status == "published")
+        )
+        count = 0
+        for post_id, title, content in result:
+            self.enqueue(post_id, (title, content))
+            count += 1
+        # Thread ghi cờ populated sau khi đã index hết các bài viết ở trên
+        self.enqueue(POPULATED_MARK, None)
+        return count
+
+    async def _backfill_from_db(self) -> None:
+        """Index lần đầu: không xóa gì (nhiều worker có thể cùng backfill, ghi đè theo rowid)."""
+        try:
+            async with SessionLocal() as db:
+                await self._enqueue_all(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Vẫn dùng ILIKE cho đến khi rebuild thành công
+            self.errors += 1
+            self.last_error = f"backfill: {e}"
+
+
+search_index = SearchIndex(SEARCH_INDEX_PATH)
+
+
+# ===================================================================
+#  Theo dõi thay đổi Post qua event của Session: gom trong after_flush,
+#  chỉ đưa vào index sau khi commit thành công.
+# ===================================================================
+
+PENDING_KEY = "search_index_pending"
+INDEXED_FIELDS = ("title", "content", "status")
+
+
+def _payload(post: Post) -> Payload:
+    if post.status != "published":
+        return None
+    return post.title, post.content
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_post_changes(session, flush_context):
+    pending = session.info.setdefault(PENDING_KEY, {})
+    for obj in session.new:
+        if isinstance(obj, Post) and obj.id is not None:
+            pending[obj.id] = _payload(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Post) and obj.id is not None:
+            # Bỏ qua thay đổi không ảnh hưởng index (category, điểm tin cậy...)
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in INDEXED_FIELDS):
+                pending[obj.id] = _payload(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Post) and obj.id is not None:
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_post_changes(session):
+    for post_id, payload in session.info.pop(PENDING_KEY, {}).items():
+        search_index.enqueue(post_id, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_post_changes(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+# ===================================================================
+#  Dựng lại index từ database / thử tìm kiếm:
+#      cd src && python -m app.core.search_index rebuild
+#      cd src && python -m app.core.search_index search "y tế"
+# ===================================================================
+
+async def _rebuild_from_db() -> int:
+    from app.core.config import engine
+
+    async with SessionLocal() as db:
+        count = await search_index.rebuild(db)
+    await engine.dispose()
+    return count
+
+
+def main(argv) -> int:
+    if len(argv) < 1 or argv[0] not in ("rebuild", "search") or (argv[0] == "search" and len(argv) < 2):
+        print('usage: python -m app.core.search_index rebuild | search "query"')
+        return 2
+    preprocess_executor.max_workers = 0
+    search_index.start()
+    if not search_index.available:
+        print(f"FTS5 không dùng được: {search_index.last_error}")
+        return 1
+    if argv[0] == "rebuild":
+        started = time.perf_counter()
+        count = asyncio.run(_rebuild_from_db())
+        search_index.stop(timeout=None)
+        print(f"Đã index {count} bài viết trong {time.perf_counter() - started:.1f}s")
+        print(search_index.stats())
+        return 0
+    print(asyncio.run(search_index.asearch(argv[1], limit=20)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
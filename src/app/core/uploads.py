@@ -0,0 +1,385 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Set
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_GC_GRACE_SECONDS,
+    UPLOAD_GC_INTERVAL,
+    UPLOAD_MAX_FILE_BYTES,
+    UPLOAD_MAX_REQUEST_BYTES,
+    SessionLocal,
+)
+from app.models.Post_images import PostImage
+from app.models.Posts import Post
+
+
+UPLOAD_DIR = "uploads/images"
+
+
+# ===================================================================
+#  UPLOAD ẢNH
+#  - UploadSizeLimitMiddleware: đếm byte body của request upload ngay khi
+#    nhận (trước cả khi parse multipart), vượt UPLOAD_MAX_REQUEST_BYTES -> 413.
+#  - save_upload: chép từng chunk sang file tạm cùng thư mục (ghi đĩa trong
+#    threadpool, không chặn event loop), vượt UPLOAD_MAX_FILE_BYTES -> dừng
+#    ngay; vừa ghi vừa tính sha256 rồi os.replace (atomic) sang
+#    ab/cd/<sha256>.<ext>. Nội dung đã có trong kho -> bỏ file tạm, dùng lại.
+# ===================================================================
+
+def _too_large_detail(limit: int, filename: Optional[str] = None) -> str:
+    limit_mb = limit / (1024 * 1024)
+    if filename:
+        return f"File {filename} vượt quá giới hạn {limit_mb:g} MB"
+    return f"Dung lượng upload vượt quá giới hạn {limit_mb:g} MB"
+
+
+class UploadTooLarge(HTTPException):
+    # Là HTTPException để FastAPI không đổi thành 400 khi lỗi xảy ra lúc parse form
+    def __init__(self, limit: int, filename: Optional[str] = None):
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=_too_large_detail(limit, filename))
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    url: str
+    sha256: str
+    size: int
+    # False: nội dung đã có sẵn trong kho (không ghi thêm file)
+    created: bool
+
+
+# Cùng nội dung -> cùng file, kể cả khi client đặt đuôi .jpeg / .jpg
+EXTENSION_ALIASES = {".jpeg": ".jpg"}
+BLOB_URL_RE = re.compile(r"^/uploads/images/([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.[a-z0-9]+$")
+
+
+def blob_path(directory: str, digest: str, extension: str) -> str:
+    extension = EXTENSION_ALIASES.get(extension, extension)
+    return os.path.join(directory, digest[:2], digest[2:4], f"{digest}{extension}")
+
+
+def _to_url(path: str) -> str:
+    return "/" + path.replace(os.sep, "/")
+
+
+def _write_chunk(handle, chunk: bytes) -> None:
+    handle.write(chunk)
+
+
+def _commit_blob(temp_path: str, final_path: str) -> bool:
+    """Đưa file tạm vào kho; False nếu blob đã tồn tại (chỉ làm mới mtime)."""
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    if os.path.exists(final_path):
+        try:
+            # mtime mới -> GC không xóa blob vừa được upload lại
+            os.utime(final_path)
+        except FileNotFoundError:
+            # GC vừa xóa blob giữa 2 lệnh trên -> ghi lại từ file tạm
+            pass
+        else:
+            os.remove(temp_path)
+            return False
+    os.replace(temp_path, final_path)
+    return True
+
+
+async def save_upload(
+    file: UploadFile,
+    directory: str,
+    extension: str,
+    max_bytes: int = UPLOAD_MAX_FILE_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> StoredBlob:
+    """Lưu file upload vào kho theo sha256 của nội dung."""
+    fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    raise UploadTooLarge(max_bytes, file.filename)
+                digest.update(chunk)
+                await run_in_threadpool(_write_chunk, handle, chunk)
+        final_path = blob_path(directory, digest.hexdigest(), extension)
+        created = await run_in_threadpool(_commit_blob, temp_path, final_path)
+    except BaseException:
+        await run_in_threadpool(_remove_quietly, temp_path)
+        raise
+    return StoredBlob(url=_to_url(final_path), sha256=digest.hexdigest(), size=written, created=created)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class UploadSizeLimitMiddleware:
+    """Giới hạn tổng số byte body cho các path upload (ASGI middleware)."""
+
+    def __init__(self, app, path_prefix: str = "/images/upload", max_bytes: int = UPLOAD_MAX_REQUEST_BYTES):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_bytes or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        # Content-Length khai báo quá lớn: từ chối luôn, không đọc body
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > self.max_bytes:
+            await self._reject(send)
+            return
+
+        # Chunked / Content-Length sai: đếm byte thực nhận, vượt thì dừng đọc body -> 413
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise UploadTooLarge(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"detail": _too_large_detail(self.max_bytes)}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# ===================================================================
+#  DỌN BLOB KHÔNG CÒN DÙNG
+#  Số tham chiếu của 1 blob = số dòng PostImage có image_url trỏ tới nó
+#  (đếm trực tiếp trong DB, không lưu bộ đếm riêng nên không bị lệch).
+#  Sau commit xóa ảnh / bài viết, các blob liên quan được kiểm tra lại;
+#  ngoài ra quét toàn bộ kho mỗi UPLOAD_GC_INTERVAL giây (ảnh upload
+#  nhưng không bao giờ được gắn, request upload lỗi giữa chừng).
+#  Blob chỉ bị xóa khi không còn tham chiếu VÀ mtime cũ hơn
+#  UPLOAD_GC_GRACE_SECONDS: upload lại / gắn vào bài viết đều làm mới mtime.
+#  File cũ dạng uploads/images/<timestamp>_<tên> không bao giờ bị đụng tới.
+# ===================================================================
+
+def _blob_file(image_url: Optional[str]) -> Optional[str]:
+    if not image_url or not BLOB_URL_RE.match(image_url):
+        return None
+    return image_url.lstrip("/").replace("/", os.sep)
+
+
+def _touch(image_url: str) -> None:
+    path = _blob_file(image_url)
+    if path is not None:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_blob(path: str, grace_seconds: float) -> bool:
+    try:
+        if time.time() - os.path.getmtime(path) < grace_seconds:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    # Ảnh phái sinh do image_pipeline tạo: variants/<sha256>-*.<fmt>
+    directory, filename = os.path.split(path)
+    stem = os.path.splitext(filename)[0]
+    for variant in glob.glob(os.path.join(directory, "variants", f"{stem}-*")):
+        _remove_quietly(variant)
+    return True
+
+
+def _list_blob_urls(directory: str) -> List[str]:
+    urls = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [name for name in dirs if name != "variants"]
+        for name in files:
+            url = _to_url(os.path.join(root, name))
+            if BLOB_URL_RE.match(url):
+                urls.append(url)
+    return urls
+
+
+class UploadCollector:
+    def __init__(self, directory: str, grace_seconds: float = 86400, interval: float = 3600, batch_size: int = 500):
+        self.directory = directory
+        self.grace_seconds = grace_seconds
+        self.interval = interval
+        self.batch_size = batch_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.removed = 0
+        self.sweeps = 0
+
+    def start(self) -> None:
+        """Gọi trong event loop của worker (lifespan)."""
+        self._loop = asyncio.get_running_loop()
+        if self.interval > 0:
+            self._spawn(self._sweep_forever())
+
+    async def stop(self) -> None:
+        self._loop = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def release(self, image_urls: Iterable[str]) -> None:
+        """Thread-safe, không chờ: kiểm tra lại các blob vừa mất tham chiếu."""
+        loop = self._loop
+        urls = [url for url in image_urls if _blob_file(url) is not None]
+        if loop is None or not urls:
+            return
+        loop.call_soon_threadsafe(self._spawn, self.collect(urls))
+
+    async def collect(self, image_urls: Sequence[str]) -> int:
+        """Xóa các blob trong image_urls không còn PostImage nào tham chiếu."""
+        urls = sorted({url for url in image_urls if _blob_file(url) is not None})
+        removed = 0
+        for start in range(0, len(urls), self.batch_size):
+            batch = urls[start:start + self.batch_size]
+            async with SessionLocal() as db:
+                referenced = set(await db.scalars(
+                    select(PostImage.image_url).where(PostImage.image_url.in_(batch)).distinct()
+                ))
+            for url in batch:
+                if url not in referenced and await run_in_threadpool(_remove_blob, _blob_file(url), self.grace_seconds):
+                    removed += 1
+        self.removed += removed
+        return removed
+
+    async def sweep(self) -> int:
+        """Quét toàn bộ kho."""
+        urls = await run_in_threadpool(_list_blob_urls, self.directory)
+        removed = await self.collect(urls)
+        self.sweeps += 1
+        return removed
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"[uploads] Lỗi khi dọn blob: {e}", file=sys.stderr)
+
+    def _spawn(self, coro) -> None:
+        if self._loop is None:
+            coro.close()
+            return
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict:
+        return {
+            "grace_seconds": self.grace_seconds,
+            "interval_seconds": self.interval,
+            "removed": self.removed,
+            "sweeps": self.sweeps,
+            "pending": len(self._tasks),
+        }
+
+
+upload_collector = UploadCollector(UPLOAD_DIR, grace_seconds=UPLOAD_GC_GRACE_SECONDS, interval=UPLOAD_GC_INTERVAL)
+
+
+# ===================================================================
+#  Theo dõi tham chiếu qua event của Session:
+#  - PostImage mới: làm mới mtime của blob (GC đang chạy song song bỏ qua)
+#  - xóa PostImage / Post: kiểm tra lại blob sau khi commit. Post xóa ảnh
+#    bằng ON DELETE CASCADE (passive_deletes) nên phải đọc URL trước flush.
+# ===================================================================
+
+PENDING_KEY = "upload_collector_released"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deleted_post_images(session, flush_context, instances):
+    post_ids = [obj.id for obj in session.deleted if isinstance(obj, Post) and obj.id is not None]
+    if post_ids:
+        with session.no_autoflush:
+            urls = session.scalars(select(PostImage.image_url).where(PostImage.post_id.in_(post_ids))).all()
+        session.info.setdefault(PENDING_KEY, set()).update(urls)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_image_references(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, PostImage):
+            _touch(obj.image_url)
+    for obj in session.deleted:
+        if isinstance(obj, PostImage):
+            session.info.setdefault(PENDING_KEY, set()).add(obj.image_url)
+
+
+@event.listens_for(Session, "after_commit")
+def _release_blobs(session):
+    urls = session.info.pop(PENDING_KEY, None)
+    if urls:
+        upload_collector.release(urls)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_released_blobs(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+# ===================================================================
+#  Dọn kho thủ công:
+#      cd src && python -m app.core.uploads gc
+# ===================================================================
+
+async def _gc() -> int:
+    from app.core.config import engine
+
+    try:
+        return await upload_collector.sweep()
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Sequence[str]) -> int:
+    if list(argv[:1]) != ["gc"]:
+        print("Cách dùng: python -m app.core.uploads gc")
+        return 2
+    removed = asyncio.run(_gc())
+    print(f"Đã xóa {removed} file không còn bài viết nào dùng")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,9 +3,11 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import SessionLocal, SECRET_KEY
+from app.core.config import AUTH_TRUST_TOKEN_CLAIMS, SECRET_KEY
+from app.core.principal_cache import Principal, principal_cache
+from app.dependency.database import get_db
 from app.models.User import User
 
 
@@ -14,14 +16,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # =========== Tạo JWT access token để xác thực người dùng ===========
+def token_claims(user: User) -> dict:
+    """Claim của access token: sub + username / is_admin cho chế độ AUTH_TRUST_TOKEN_CLAIMS."""
+    return {"sub": str(user.id), "username": user.username, "is_admin": bool(user.is_admin)}
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -29,7 +29,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 # ================ Lấy ra người dùng hiện tại từ token =================
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -44,13 +44,23 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except Exception:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Token mới có đủ claim đã ký -> không cần đọc DB
+    if AUTH_TRUST_TOKEN_CLAIMS and "username" in payload and "is_admin" in payload:
+        return Principal(id=user_id, username=payload["username"], is_admin=bool(payload["is_admin"]))
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(principal)
+    return principal
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not getattr(current_user, "is_admin", False):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
     return current_user
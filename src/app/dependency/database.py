@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import time
+from typing import AsyncIterator
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import DB_READ_YOUR_WRITES_SECONDS, SECRET_KEY, SessionLocal, replica_router
+
+
+# Header ghim primary sau khi ghi: server trả về "<epoch hết hạn>.<HMAC>",
+# client gửi lại nguyên giá trị này ở các request sau (frontend: api.js).
+# Chữ ký (SECRET_KEY) để client không tự tạo được giá trị ghim primary.
+# Không dùng cookie vì frontend (:5500) gọi API (:8000) bằng fetch không kèm credentials.
+PRIMARY_PIN_HEADER = "X-Read-Primary-Until"
+PIN_STATE_KEY = "read_primary_until"
+REQUEST_KEY = "request"
+
+
+# =========== Session DB dùng chung cho mọi router (primary) ===========
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
+        db.info[REQUEST_KEY] = request
+        yield db
+
+
+# =========== Session chỉ đọc cho các route public (replica) ===========
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    async with replica_router.session(pinned=pinned_to_primary(request)) as db:
+        yield db
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Client vừa ghi (header do server ký, còn hạn): đọc từ primary, bỏ qua cache."""
+    until, _, signature = request.headers.get(PRIMARY_PIN_HEADER, "").partition(".")
+    if not until.isdigit() or not hmac.compare_digest(signature, _pin_signature(until)):
+        return False
+    now = time.time()
+    return now < int(until) <= now + DB_READ_YOUR_WRITES_SECONDS + 1
+
+
+def sign_pin(until: int) -> str:
+    return f"{until}.{_pin_signature(str(until))}"
+
+
+def _pin_signature(until: str) -> str:
+    message = f"{PRIMARY_PIN_HEADER}:{until}".encode("ascii")
+    return hmac.new(SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_reads_to_primary(session):
+    # Sau khi commit, các request đọc tiếp theo của client này đi primary
+    # cho đến khi replica kịp đồng bộ (read-your-own-writes)
+    request = session.info.get(REQUEST_KEY)
+    if request is None or not replica_router.enabled or DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    setattr(request.state, PIN_STATE_KEY, int(time.time()) + DB_READ_YOUR_WRITES_SECONDS)
+
+
+class PrimaryPinMiddleware:
+    """Thêm header ghim primary vào response thật sự được gửi đi (kể cả khi route
+    tự trả Response / StreamingResponse) nếu request đã commit."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # request.state của mọi Request trong request này dùng chung dict này
+        state = scope.setdefault("state", {})
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and PIN_STATE_KEY in state:
+                MutableHeaders(scope=message).append(PRIMARY_PIN_HEADER, sign_pin(state[PIN_STATE_KEY]))
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
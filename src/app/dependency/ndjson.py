@@ -0,0 +1,239 @@
+import codecs
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import BULK_MAX_BODY_BYTES, BULK_MAX_RECORD_CHARS, BULK_MAX_RECORDS
+
+
+# ===================================================================
+#  Đọc request body dạng JSON array / NDJSON theo từng phần,
+#  không cần giữ toàn bộ body trong bộ nhớ: buffer chỉ chứa tối đa
+#  1 bản ghi chưa parse xong (BULK_MAX_RECORD_CHARS ký tự).
+#  Số bản ghi / số byte body vượt giới hạn -> BodyFormatError, dừng đọc.
+# ===================================================================
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/jsonlines")
+
+_decoder = json.JSONDecoder()
+
+
+class BodyFormatError(ValueError):
+    def __init__(self, message: str, index: int):
+        super().__init__(message)
+        # Vị trí (bắt đầu từ 0) của bản ghi lỗi trong body
+        self.index = index
+
+
+class BodyTooLarge(ValueError):
+    pass
+
+
+def is_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in NDJSON_MEDIA_TYPES
+
+
+async def iter_ndjson(
+    request: Request,
+    max_record_chars: int = BULK_MAX_RECORD_CHARS,
+    max_body_bytes: int = BULK_MAX_BODY_BYTES,
+) -> AsyncIterator[object]:
+    """Mỗi dòng là 1 JSON object, dòng trống bị bỏ qua."""
+    buffer = ""
+    count = 0
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in _body_stream(request, max_body_bytes):
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield _loads(line, count)
+                count += 1
+        if len(buffer) > max_record_chars:
+            raise BodyFormatError(f"Dòng NDJSON dài quá {max_record_chars} ký tự", count)
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield _loads(buffer, count)
+
+
+# Trạng thái của iter_json_array: phần tiếp theo cần gặp
+_EXPECT_OPEN = "["
+_EXPECT_FIRST = "phần tử đầu tiên hoặc ]"
+_EXPECT_SEPARATOR = ", hoặc ]"
+_EXPECT_VALUE = "phần tử"
+_DONE = "hết"
+
+
+def _parse_array(buffer: str, state: str, count: int, final: bool, max_record_chars: int) -> Tuple[List[object], str, str]:
+    """Parse các phần tử trọn vẹn trong buffer; trả (phần tử, phần buffer còn lại, trạng thái)."""
+    items = []
+    pos = 0
+    while state != _DONE:
+        pos = _skip_ws(buffer, pos)
+        if pos >= len(buffer):
+            break
+        char = buffer[pos]
+        index = count + len(items)
+        if state == _EXPECT_OPEN:
+            if char != "[":
+                raise BodyFormatError("Body phải là JSON array", index)
+            state = _EXPECT_FIRST
+            pos += 1
+        elif char == "]" and state in (_EXPECT_FIRST, _EXPECT_SEPARATOR):
+            state = _DONE
+            pos += 1
+        elif state == _EXPECT_SEPARATOR:
+            if char != ",":
+                raise BodyFormatError(f"Thiếu dấu phẩy trước phần tử {index}", index)
+            state = _EXPECT_VALUE
+            pos += 1
+        elif char in ",]":
+            raise BodyFormatError(f"Cần {state} nhưng gặp '{char}'", index)
+        else:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if final or len(buffer) - pos > max_record_chars:
+                    raise BodyFormatError(f"Phần tử {index} không hợp lệ: {e.msg}", index)
+                # Phần tử chưa nhận đủ, chờ chunk tiếp theo
+                break
+            if end >= len(buffer) and not final:
+                # Số ở cuối buffer có thể còn tiếp ở chunk sau
+                break
+            items.append(item)
+            state = _EXPECT_SEPARATOR
+            pos = end
+    return items, buffer[pos:], state
+
+
+async def iter_json_array(
+    request: Request,
+    max_record_chars: int = BULK_MAX_RECORD_CHARS,
+    max_body_bytes: int = BULK_MAX_BODY_BYTES,
+) -> AsyncIterator[object]:
+    """Parse dần từng phần tử của 1 JSON array lớn."""
+    buffer = ""
+    state = _EXPECT_OPEN
+    count = 0
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in _body_stream(request, max_body_bytes):
+        buffer += decoder.decode(chunk)
+        items, buffer, state = _parse_array(buffer, state, count, False, max_record_chars)
+        for item in items:
+            yield item
+        count += len(items)
+        if state == _DONE:
+            return
+    buffer += decoder.decode(b"", final=True)
+    items, buffer, state = _parse_array(buffer, state, count, True, max_record_chars)
+    for item in items:
+        yield item
+    if state != _DONE:
+        raise BodyFormatError("JSON array không hợp lệ hoặc bị cắt ngang", count + len(items))
+
+
+async def iter_records(
+    request: Request,
+    max_records: int = BULK_MAX_RECORDS,
+    max_body_bytes: int = BULK_MAX_BODY_BYTES,
+) -> AsyncIterator[object]:
+    if is_ndjson(request):
+        source = iter_ndjson(request, max_body_bytes=max_body_bytes)
+    else:
+        source = iter_json_array(request, max_body_bytes=max_body_bytes)
+    count = 0
+    try:
+        async for item in source:
+            if max_records and count >= max_records:
+                raise BodyFormatError(f"Tối đa {max_records} bản ghi mỗi request", count)
+            yield item
+            count += 1
+    except BodyTooLarge as e:
+        raise BodyFormatError(str(e), count)
+    finally:
+        # Body lỗi / bị bỏ dở: không còn đọc body nữa
+        body_read_event(request).set()
+
+
+async def _body_stream(request: Request, max_body_bytes: int = BULK_MAX_BODY_BYTES) -> AsyncIterator[bytes]:
+    """request.stream() đọc trước 1 chunk để set body_read_event ngay khi đã nhận
+    chunk cuối (trước khi parse / chấm điểm các bản ghi trong chunk đó)."""
+    pending = None
+    received = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        received += len(chunk)
+        if max_body_bytes and received > max_body_bytes:
+            raise BodyTooLarge(f"Body vượt quá {max_body_bytes} byte")
+        if pending is not None:
+            yield pending
+        pending = chunk
+    body_read_event(request).set()
+    if pending is not None:
+        yield pending
+
+
+async def iter_chunks(items: AsyncIterator[object], size: int) -> AsyncIterator[List[object]]:
+    """Gom bản ghi thành từng chunk; khi body lỗi, chunk dở dang vẫn được trả trước lỗi."""
+    chunk = []
+    try:
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    except BodyFormatError:
+        if chunk:
+            yield chunk
+        raise
+    if chunk:
+        yield chunk
+
+
+def dumps_lines(rows: Iterable[dict]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def body_read_event(request: Request) -> anyio.Event:
+    """Event được set khi request body đã đọc xong (hoặc không còn được đọc nữa)."""
+    event: Optional[anyio.Event] = getattr(request.state, "ndjson_body_read", None)
+    if event is None:
+        event = request.state.ndjson_body_read = anyio.Event()
+    return event
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse đọc request body song song với việc ghi response.
+
+    listen_for_disconnect() của StreamingResponse gọi receive() và sẽ "nuốt"
+    các chunk body chưa đọc, nên chỉ bắt đầu nghe sau khi body đã đọc xong;
+    trong lúc đọc body, việc ngắt kết nối được phát hiện qua request.stream()
+    (ClientDisconnect). Ngắt kết nối -> hủy việc chấm điểm còn lại.
+    """
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content, request: Request, **kwargs):
+        super().__init__(content, **kwargs)
+        self.request = request
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await body_read_event(self.request).wait()
+        await super().listen_for_disconnect(receive)
+
+
+def _skip_ws(buffer: str, pos: int) -> int:
+    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _loads(line: str, index: int):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise BodyFormatError(f"Dòng NDJSON không hợp lệ: {e.msg}", index)
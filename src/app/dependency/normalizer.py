@@ -0,0 +1,76 @@
+import re
+
+import pandas as pd
+
+# ===================================================================
+#  CHUẨN HÓA VĂN BẢN (bản tối ưu)
+#  Cho kết quả giống hệt
+#      remove_extra_punctuation(normalize_repeated_chars(clean_text(text)))
+#  nhưng các pattern được compile 1 lần và số lần quét chuỗi ít hơn:
+#    - các pass URL / email / SĐT / HTML / emoji chỉ chạy khi chuỗi có thể khớp
+#    - "_" -> " ", gộp khoảng trắng, thay ký tự lạ bằng " " gộp thành 1 pass
+#    - ký tự lặp + dấu câu lặp gộp thành 1 pass
+#  Tương đương với pipeline cũ: tests/test_normalizer.py
+# ===================================================================
+
+EMOJI_RE = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emoticons
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    u"\U0001f926-\U0001f937"
+    u"\U00010000-\U0010ffff"
+    u"\u2640-\u2642"
+    u"\u2600-\u2B55"
+    u"\u200d"
+    u"\u23cf"
+    u"\u23e9"
+    u"\u231a"
+    u"\ufe0f"  # dingbats
+    u"\u3030"
+    "]+", flags=re.UNICODE)
+URL_RE = re.compile(r'http\S+|www\S+|https\S+|<url>')
+EMAIL_RE = re.compile(r'\S+@\S+')
+PHONE_RE = re.compile(r'\b\d{10,11}\b')
+DIGITS_10_RE = re.compile(r'\d{10}')
+HTML_RE = re.compile(r'<.*?>')
+
+VIETNAMESE_CHARS = "àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ"
+# Mọi ký tự không được phép (kể cả "_") và mọi khoảng trắng -> 1 dấu cách.
+# Tương đương: replace('_', ' ') + \s+ -> ' ' + [^...] -> ' ' + \s+ -> ' '
+SEPARATOR_RE = re.compile(r'[^a-zA-Z0-9' + VIETNAMESE_CHARS + r'.,!?-]+')
+# Ký tự nhỏ nhất trong EMOJI_RE
+EMOJI_MIN_CHAR = "\u200d"
+REPEAT_RE = re.compile(r'(.)\1+')
+
+
+def _collapse_repeat(match):
+    # ".."/"!!"/"??" -> 1 ký tự, ký tự khác lặp >= 3 lần -> 1 ký tự
+    run = match.group(0)
+    char = match.group(1)
+    if len(run) > 2 or char in ".!?":
+        return char
+    return run
+
+
+def normalize_text(text) -> str:
+    """clean_text + normalize_repeated_chars + remove_extra_punctuation"""
+    if not isinstance(text, str):
+        if pd.isna(text):
+            return ""
+        text = str(text)
+    text = text.lower()
+    if text and max(text) >= EMOJI_MIN_CHAR:
+        text = EMOJI_RE.sub('', text)
+    if 'http' in text or 'www' in text or '<url>' in text:
+        text = URL_RE.sub('', text)
+    if '@' in text:
+        text = EMAIL_RE.sub('', text)
+    if DIGITS_10_RE.search(text):
+        text = PHONE_RE.sub('', text)
+    if '<' in text:
+        text = HTML_RE.sub('', text)
+    text = SEPARATOR_RE.sub(' ', text).strip()
+    return REPEAT_RE.sub(_collapse_repeat, text)
@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+# ===================================================================
+#  KEYSET (CURSOR) PAGINATION
+#  Sắp xếp theo (cột thời gian DESC, id DESC); trang sau lọc bằng
+#  WHERE (col, id) < (giá trị, id) của dòng cuối trang trước nên không
+#  phải quét lại các dòng đã bỏ qua như OFFSET.
+#  Cursor trang kế tiếp trả về trong header X-Next-Cursor.
+#  NULL được xếp cuối (mặc định của MySQL / SQLite khi DESC).
+# ===================================================================
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: str, value, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"k": key, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str) -> Tuple[Optional[datetime], int]:
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor không hợp lệ")
+    try:
+        data = _load_cursor(cursor)
+        if data["k"] != key:
+            raise invalid
+        value = datetime.fromisoformat(data["v"]) if data["v"] is not None else None
+        return value, int(data["id"])
+    except HTTPException:
+        raise
+    except Exception:
+        raise invalid
+
+
+def encode_offset_cursor(key: str, offset: int) -> str:
+    """Cursor cho kết quả xếp hạng (vd. bm25): vị trí của trang kế tiếp trong thứ hạng."""
+    raw = json.dumps({"k": key, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: str, key: str) -> Optional[int]:
+    """Offset trong cursor xếp hạng, None nếu cursor không phải loại này (cursor keyset)."""
+    try:
+        data = _load_cursor(cursor)
+        if data.get("k") != key:
+            return None
+        return max(0, int(data["o"]))
+    except Exception:
+        return None
+
+
+def _load_cursor(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def _after(sort_column, id_column, value, row_id):
+    # Các dòng đứng sau (value, row_id) theo thứ tự (sort DESC NULL cuối, id DESC)
+    if value is None:
+        return and_(sort_column.is_(None), id_column < row_id)
+    return or_(
+        sort_column < value,
+        and_(sort_column == value, id_column < row_id),
+        sort_column.is_(None),
+    )
+
+
+def page_query(query: Select, sort_column, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Select:
+    """Thêm ORDER BY + điều kiện keyset (hoặc OFFSET) + LIMIT cho 1 trang."""
+    id_column = sort_column.class_.id
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column.key)
+        query = query.where(_after(sort_column, id_column, value, row_id))
+    elif skip:
+        query = query.offset(skip)
+    # Lấy dư 1 dòng để biết còn trang sau hay không
+    return query.limit(limit + 1)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_column,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> List:
+    """Chạy query theo 1 trang; có cursor thì dùng keyset, không thì skip/limit như cũ."""
+    key = sort_column.key
+    rows = (await db.scalars(page_query(query, sort_column, skip, limit, cursor))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key, getattr(last, key), last.id)
+    return rows
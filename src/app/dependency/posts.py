@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload, with_expression
+
+from app.core.config import POST_EXCERPT_LENGTH
+from app.models.Post_images import PostImage
+from app.models.Posts import Post
+
+
+# ===================================================================
+#  NẠP BÀI VIẾT KÈM ẢNH
+#  Post.images là lazy="raise": mọi query trả bài viết ra response phải
+#  nạp ảnh bằng selectinload -> thêm đúng 1 query
+#  (SELECT ... FROM post_images WHERE post_id IN (...)) cho cả trang.
+# ===================================================================
+
+WITH_IMAGES = selectinload(Post.images)
+
+
+async def load_post(db: AsyncSession, post_id: int) -> Optional[Post]:
+    """Bài viết kèm ảnh, luôn đọc lại từ DB (kể cả khi đã có trong session sau commit)."""
+    return await db.get(Post, post_id, options=[WITH_IMAGES], populate_existing=True)
+
+
+# ===================================================================
+#  PROJECTION CHO DANH SÁCH
+#  Danh sách không trả content: chỉ SELECT các cột cần (load_only), đoạn
+#  trích POST_EXCERPT_LENGTH ký tự đầu cắt ngay trong SQL (SUBSTR) và ảnh
+#  chính. Nội dung đầy đủ chỉ có ở GET /posts/{id}.
+#  ?fields=id,title,excerpt chọn bớt trường trả về.
+# ===================================================================
+
+# Trường của danh sách -> cột cần SELECT
+LIST_FIELDS: Dict[str, Tuple] = {
+    "id": (),
+    "user_id": (Post.user_id,),
+    "category_id": (Post.category_id,),
+    "title": (Post.title,),
+    "excerpt": (),
+    "status": (Post.status,),
+    "published_at": (Post.published_at,),
+    "created_at": (Post.created_at,),
+    "updated_at": (Post.updated_at,),
+    "credibility_score": (Post.credibility_score,),
+    "credibility_label": (Post.credibility_label,),
+    "main_image_url": (),
+    "thumbnail_url": (),
+}
+FIELDS_DESCRIPTION = "Các trường trả về, cách nhau bởi dấu phẩy (mặc định: tất cả). " + ", ".join(LIST_FIELDS)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    if not fields:
+        return tuple(LIST_FIELDS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trường không hợp lệ: {', '.join(unknown)}"
+        )
+    # id luôn có (dùng cho cursor và link tới chi tiết)
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+def list_options(columns: Sequence[str]) -> List:
+    """Loader option cho query danh sách chỉ nạp các trường được chọn."""
+    # Cột sắp xếp của keyset pagination và Last-Modified của feed cache luôn được nạp
+    loaded = {column.key: column for column in (Post.published_at, Post.updated_at, Post.created_at)}
+    for name in columns:
+        loaded.update((column.key, column) for column in LIST_FIELDS[name])
+    options = [load_only(*loaded.values())]
+    if "excerpt" in columns:
+        options.append(with_expression(Post.excerpt, func.substr(Post.content, 1, POST_EXCERPT_LENGTH)))
+    image_columns = [PostImage.post_id, PostImage.image_url, PostImage.is_main]
+    if "thumbnail_url" in columns:
+        image_columns.append(PostImage.variants)
+    if "main_image_url" in columns or "thumbnail_url" in columns:
+        options.append(selectinload(Post.images).load_only(*image_columns))
+    return options
+
+
+def project(posts: Sequence[Post], columns: Sequence[str]) -> List[dict]:
+    """Chỉ giữ các trường được chọn (response_model_exclude_unset bỏ các trường còn lại)."""
+    return [{name: getattr(post, name) for name in columns} for post in posts]
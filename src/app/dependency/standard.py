@@ -1,9 +1,10 @@
 import joblib
 import re
 import pandas as pd
-from underthesea import word_tokenize
 import os
 from pydantic import BaseModel
+from app.dependency.normalizer import normalize_text
+from app.dependency.tokenize_cache import sentence_tokenize_cache
 # ===================================================================
 #  HÀM TIỀN XỬ LÝ 
 # ===================================================================
@@ -51,9 +52,10 @@ def vietnamese_tokenize(text):
     if not text:
         return ""
     try:
-        tokenized_text = word_tokenize(text, format="text")
+        tokenized_text = sentence_tokenize_cache.tokenize(text)
         return tokenized_text
-    except:
+    except (ValueError, UnicodeError):
+        # Chỉ bỏ qua lỗi do nội dung văn bản; lỗi cài đặt / API underthesea phải báo ra
         return text
 
 VIETNAMESE_STOPWORDS= set([
@@ -100,9 +102,8 @@ def normalize_numbers(text):
     return text
 
 def preprocess_pipeline(text, remove_stop=True):
-    text = clean_text(text)
-    text = normalize_repeated_chars(text)
-    text = remove_extra_punctuation(text)
+    # normalize_text = clean_text + normalize_repeated_chars + remove_extra_punctuation
+    text = normalize_text(text)
     text = vietnamese_tokenize(text)
     if remove_stop:
         text = remove_stopwords(text)
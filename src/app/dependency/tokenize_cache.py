@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from underthesea import word_tokenize
+
+from app.core.config import TOKENIZE_CACHE_SIZE
+
+try:
+    # API nội bộ của underthesea==1.4.0 (requirements.txt): word_tokenize =
+    # regex_tokenize.tokenize + CRFModel.instance().predict
+    from underthesea.pipeline.word_tokenize import CRFModel as _CRFModel
+    from underthesea.pipeline.word_tokenize import regex_tokenize as _regex_tokenize
+except ImportError:  # phiên bản underthesea khác -> không cache, gọi word_tokenize
+    _CRFModel = None
+    _regex_tokenize = None
+
+
+# ===================================================================
+#  CACHE TÁCH TỪ THEO CÂU
+#  Văn bản được tách thành câu (sau token ".", "!", "?"); mỗi câu được gán
+#  nhãn B-W/I-W bằng CRF cùng CONTEXT_TOKENS token ngữ cảnh ở 2 bên, nên
+#  kết quả giống hệt chạy word_tokenize trên cả văn bản. Câu đã gặp (cùng
+#  ngữ cảnh) lấy nhãn từ cache, chỉ câu mới phải chạy CRF.
+# ===================================================================
+
+CONTEXT_TOKENS = 2
+SENTENCE_END_TOKENS = {".", "!", "?"}
+
+CacheKey = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+def _sentence_spans(tokens: Sequence[str]) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for i, token in enumerate(tokens):
+        if token in SENTENCE_END_TOKENS:
+            spans.append((start, i + 1))
+            start = i + 1
+    if start < len(tokens):
+        spans.append((start, len(tokens)))
+    return spans
+
+
+def _tags_to_text(tokens: Sequence[str], tags: Sequence[str]) -> str:
+    # Giống phần ghép từ trong underthesea.word_tokenize(format="text")
+    output = []
+    for i, (tag, token) in enumerate(zip(tags, tokens)):
+        if tag == "I-W" and i > 0:
+            output[-1] = output[-1] + " " + token
+        else:
+            output.append(token)
+    return " ".join(item.replace(" ", "_") for item in output)
+
+
+class SentenceTokenizeCache:
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[CacheKey, Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.crf_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and _regex_tokenize is not None and _CRFModel is not None
+
+    def tokenize(self, text: str) -> str:
+        """Tương đương word_tokenize(text, format="text")."""
+        if not self.enabled:
+            return word_tokenize(text, format="text")
+
+        tokens = _regex_tokenize.tokenize(text)
+        spans = _sentence_spans(tokens)
+        keys = [self._key(tokens, start, end) for start, end in spans]
+
+        sentence_tags: List[Optional[Tuple[str, ...]]] = [self._get(key) for key in keys]
+        missing = [i for i, tags in enumerate(sentence_tags) if tags is None]
+
+        if missing:
+            if len(missing) * 2 > len(spans):
+                # Phần lớn là câu mới: chạy CRF 1 lần cho cả văn bản
+                all_tags = self._predict(tokens)
+                for i in missing:
+                    start, end = spans[i]
+                    sentence_tags[i] = tuple(all_tags[start:end])
+            else:
+                for i in missing:
+                    start, end = spans[i]
+                    lo = max(0, start - CONTEXT_TOKENS)
+                    hi = min(len(tokens), end + CONTEXT_TOKENS)
+                    window_tags = self._predict(tokens[lo:hi])
+                    sentence_tags[i] = tuple(window_tags[start - lo:end - lo])
+            for i in missing:
+                self._set(keys[i], sentence_tags[i])
+
+        tags = [tag for sentence in sentence_tags for tag in sentence]
+        return _tags_to_text(tokens, tags)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "crf_seconds": round(self.crf_seconds, 3),
+        }
+
+    def _key(self, tokens: Sequence[str], start: int, end: int) -> CacheKey:
+        return (
+            tuple(tokens[max(0, start - CONTEXT_TOKENS):start]),
+            tuple(tokens[start:end]),
+            tuple(tokens[end:end + CONTEXT_TOKENS]),
+        )
+
+    def _predict(self, tokens: Sequence[str]) -> List[str]:
+        # CRFModel.instance() nạp model 1 lần / process, dùng chung với word_tokenize
+        model = _CRFModel.instance()
+        started = time.perf_counter()
+        tags = [tag for _, tag in model.predict(list(tokens))]
+        self.crf_seconds += time.perf_counter() - started
+        return tags
+
+    def _get(self, key: CacheKey) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            tags = self._data.get(key)
+            if tags is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return tags
+
+    def _set(self, key: CacheKey, tags: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._data[key] = tags
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+
+sentence_tokenize_cache = SentenceTokenizeCache(TOKENIZE_CACHE_SIZE)
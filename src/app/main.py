@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .routers.User import router as user_router
 from .routers.Posts import router as posts_router   
@@ -8,23 +9,71 @@ from .routers.CheckFakeNews import router as check_fake_news_router
 from .routers.UserPosts import router as user_posts_router
 from .routers.PostsFilter import router as posts_filter_router
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from .routers.Images import router as images_router
+from .routers.Internal import router as internal_router
+from .core.model_registry import model_registry
+from .core.inference import inference_engine
+from .core.preprocess_pool import preprocess_executor
+from .core.search_index import search_index
+from .core.password_hasher import password_hasher
+from .core.uploads import UploadSizeLimitMiddleware, upload_collector
+from .core.image_pipeline import image_pipeline
+from .core.media import MediaFiles
+from .core.config import engine, replica_router
+from .dependency.database import PRIMARY_PIN_HEADER, PrimaryPinMiddleware
 import os
 UPLOAD_DIR = "uploads/images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nạp model 1 lần khi khởi động worker thay vì ở request đầu tiên
+    model_registry.get()
+    model_registry.start()
+    # Mở connection đầu tiên trước khi có task nền (backfill search index) và
+    # request: event first_connect của pool giữ lock thread, 2 coroutine cùng
+    # mở connection đầu tiên trên 1 event loop sẽ deadlock
+    async with engine.connect():
+        pass
+    inference_engine.start()
+    preprocess_executor.start()
+    search_index.start()
+    image_pipeline.start()
+    upload_collector.start()
+    yield
+    await upload_collector.stop()
+    await image_pipeline.stop()
+    search_index.stop()
+    password_hasher.shutdown()
+    preprocess_executor.shutdown()
+    inference_engine.stop()
+    model_registry.stop()
+    # Đóng các connection còn trong pool
+    await engine.dispose()
+    await replica_router.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(user_router)
+# Trước posts_router: /posts/draft, /posts/search khớp trước GET /posts/{post_id}
+app.include_router(posts_filter_router)
 app.include_router(posts_router)
 app.include_router(check_fake_news_router)
 app.include_router(fake_news_router)
 app.include_router(posts_crud_router)
 app.include_router(images_router)
 app.include_router(user_posts_router)
-app.include_router(posts_filter_router)
+app.include_router(internal_router)
+
+# Ảnh upload: cache immutable, ETag mạnh, Range, chọn AVIF / WebP theo Accept
+app.mount("/uploads", MediaFiles(directory="uploads"), name="uploads")
+
+# Chặn body upload quá lớn trước khi Starlette spool multipart xuống đĩa
+app.add_middleware(UploadSizeLimitMiddleware)
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Sau khi ghi: trả header ghim đọc primary (read-your-own-writes khi có replica)
+app.add_middleware(PrimaryPinMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,4 +81,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", PRIMARY_PIN_HEADER],
 )
\ No newline at end of file
@@ -1,16 +1,36 @@
 from ..core.config import Base
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, func
 from sqlalchemy.orm import relationship
+from typing import Optional
+
+
+# Thứ tự ưu tiên khi cùng kích thước: file nhỏ hơn trước
+FORMAT_PREFERENCE = {"avif": 0, "webp": 1}
 
 
 class PostImage(Base):
     __tablename__ = "post_images"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
-    image_url = Column(String(255), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Ảnh upload: /uploads/images/ab/cd/<sha256>.<ext>, nhiều dòng có thể dùng chung 1 file
+    image_url = Column(String(255), nullable=False, index=True)
     is_main = Column(Boolean, default=False)
+    # Kích thước ảnh gốc và ảnh phái sinh do image_pipeline tạo nền sau upload:
+    # [{"name": "thumb" | "w640", "format": "webp", "width", "height", "url"}]
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    variants = Column(JSON, nullable=True)
 
-    
-
+    post = relationship("Post", back_populates="images", lazy="raise")
 
+    def variant_url(self, min_width: int = 0, name: Optional[str] = None) -> str:
+        """URL nhỏ nhất có chiều rộng >= min_width (ưu tiên AVIF > WebP), chưa xử lý thì trả ảnh gốc."""
+        candidates = [
+            v for v in (self.variants or [])
+            if (v["name"] == name if name else v["name"] != "thumb") and v["width"] >= min_width
+        ]
+        if not candidates:
+            return self.image_url
+        best = min(candidates, key=lambda v: (v["width"], FORMAT_PREFERENCE.get(v["format"], len(FORMAT_PREFERENCE))))
+        return best["url"]
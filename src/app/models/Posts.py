@@ -1,16 +1,27 @@
 from ..core.config import Base
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, func, Float, Index
+from sqlalchemy.orm import query_expression, relationship
 
 
 class Post(Base):
     __tablename__ = "posts"
+    # Index khớp với các query của router, tạo bởi migration 0002 / 0005
+    # (kiểm tra bằng EXPLAIN trong tests/test_query_plans.py)
+    __table_args__ = (
+        Index("ix_posts_status_published_at", "status", "published_at"),
+        # GET /posts/category/{id} (routers/Posts.py) và GET /posts/?category_id=
+        Index("ix_posts_category_id_updated_at", "category_id", "updated_at"),
+        Index("ix_posts_user_id_updated_at", "user_id", "updated_at"),
+        # Thứ tự sắp xếp của keyset pagination (app.dependency.pagination)
+        Index("ix_posts_published_at_id", "published_at", "id"),
+        Index("ix_posts_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(255), nullable=False)
-    content = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
     status = Column(String(50), default="draft")
 
     published_at = Column(DateTime, nullable=True)
@@ -18,4 +29,38 @@ class Post(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     credibility_score = Column(Float, nullable=True)
     credibility_label = Column(String(50), nullable=True)
-    
\ No newline at end of file
+    # Đoạn trích content, chỉ có giá trị khi query dùng with_expression (danh sách)
+    excerpt = query_expression()
+
+    # lazy="raise": ảnh phải được nạp trước bằng selectinload(Post.images),
+    # tránh mỗi bài viết 1 query (N+1) khi serialize danh sách
+    images = relationship(
+        "PostImage",
+        back_populates="post",
+        order_by="PostImage.id",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+
+    @property
+    def main_image(self):
+        """Ảnh đánh dấu is_main, không có thì lấy ảnh đầu tiên."""
+        for image in self.images:
+            if image.is_main:
+                return image
+        return self.images[0] if self.images else None
+
+    @property
+    def main_image_url(self):
+        image = self.main_image
+        return image.image_url if image else None
+
+    @property
+    def thumbnail_url(self):
+        """Thumbnail của ảnh chính (ảnh gốc nếu chưa tạo xong)."""
+        image = self.main_image
+        return image.variant_url(name="thumb") if image else None
+
+
+from .Post_images import PostImage  # noqa: E402 - đăng ký mapper cho relationship
@@ -1,44 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import BULK_CHUNK_SIZE, BULK_MAX_BODY_BYTES, BULK_MAX_RECORDS
+from app.dependency.auth import require_admin
+from app.dependency.database import get_db
 from app.schemas.Posts import PostCreateCheck, PostResponse, FakeNewsCheckResponse
 from app.models.Posts import Post
 from app.models.Categories import Category
 from app.models.Post_images import PostImage
 from typing import Optional
 from datetime import datetime
-from app.dependency.standard import preprocess_pipeline, check_label
-import joblib
+from app.core.inference import inference_engine, EngineOverloaded, score_batch
+from app.core.model_registry import model_registry
+from app.core.preprocess_pool import preprocess_executor
+from app.core.prediction_cache import prediction_cache
+from app.dependency.ndjson import iter_records, iter_chunks, dumps_lines, BodyFormatError, NDJSONStreamingResponse
 import re
 import pandas as pd
 from underthesea import word_tokenize
-import os
 
-PROJECT_ROOT = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "..")
-)
-
-model_path = os.path.join(PROJECT_ROOT, "logreg_fake_news_model.pkl")
-vectorizer_path = os.path.join(PROJECT_ROOT, "tfidf_vectorizer.pkl")
-
-loaded_model = joblib.load(model_path)
-vectorizer = joblib.load(vectorizer_path)
 
 router = APIRouter(prefix="/posts", tags=["check-fake-news"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post('/analyze', response_model=FakeNewsCheckResponse)
-def analyze_post(
+async def analyze_post(
     post_data: PostCreateCheck,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Check only - Kiểm tra tin giả mà không lưu vào database (submit.html)"""
     if not post_data.content:
@@ -54,33 +44,83 @@ def analyze_post(
             detail="Nội dung sau khi xử lý trống, vui lòng nhập nội dung hợp lệ"
         )
     
-    preprocessed = preprocess_pipeline(combine_text)
-    vector_text = vectorizer.transform([preprocessed])
-
-    prediction = loaded_model.predict(vector_text)[0]
-    prediction_proba = loaded_model.predict_proba(vector_text)[0]
-    
-    classes = loaded_model.classes_
-    proba_dict = {}
-    for idx, class_lb in enumerate(classes):
-        label_name = "Real" if class_lb == 0 else "Fake"
-        proba_dict[label_name] = float(prediction_proba[idx])
-    
-    is_fake = bool(prediction == 1)
-    label = "Fake" if is_fake else "Real"
-
-    idx = list(classes).index(prediction)
-    dscore = float(prediction_proba[idx])
-    cre_label = check_label(is_fake, dscore)
+    model_version = model_registry.get().version
+    cached = await prediction_cache.get(post_data.title, post_data.content, model_version)
+    if cached is not None:
+        preprocessed, prediction = cached
+    else:
+        preprocessed = await preprocess_executor.run(combine_text)
+        try:
+            prediction = await inference_engine.apredict(preprocessed)
+        except EngineOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Hệ thống đang quá tải, vui lòng thử lại sau"
+            )
+        await prediction_cache.set(post_data.title, post_data.content, preprocessed, prediction)
+    result = prediction.as_check_result()
 
     return {
-        "is_fake": is_fake,
-        "confidence_score": dscore,
-        "credibility_label": cre_label,
-        "label": label,
-        "probabilities": proba_dict,
+        **result,
         "preprocessed_text": preprocessed,
         "post": None
     }
 
 
+def _validate_chunk(records: list, start_index: int):
+    """Tách các bản ghi hợp lệ và các dòng lỗi của 1 chunk"""
+    rows = [None] * len(records)
+    texts = []
+    positions = []
+    for offset, record in enumerate(records):
+        index = start_index + offset
+        try:
+            post_data = PostCreateCheck.model_validate(record)
+        except ValidationError as e:
+            rows[offset] = {"index": index, "error": e.errors(include_url=False)}
+            continue
+        if not post_data.content:
+            rows[offset] = {"index": index, "error": "Nội dung bài viết không được để trống"}
+            continue
+        texts.append(f"{post_data.title} {post_data.content}")
+        positions.append(offset)
+    return rows, texts, positions
+
+
+async def _stream_bulk_results(request: Request, include_text: bool):
+    index = 0
+    try:
+        # Khi body lỗi giữa chừng, iter_chunks trả nốt các bản ghi hợp lệ trước đó
+        records_iter = iter_records(request, BULK_MAX_RECORDS, BULK_MAX_BODY_BYTES)
+        async for records in iter_chunks(records_iter, BULK_CHUNK_SIZE):
+            rows, texts, positions = _validate_chunk(records, index)
+            preprocessed = await preprocess_executor.run_many(texts)
+            predictions = await run_in_threadpool(score_batch, model_registry.get(), preprocessed)
+            for offset, text, prediction in zip(positions, preprocessed, predictions):
+                row = {"index": index + offset, **prediction.as_check_result()}
+                if include_text:
+                    row["preprocessed_text"] = text
+                rows[offset] = row
+            index += len(records)
+            yield dumps_lines(rows)
+    except BodyFormatError as e:
+        yield dumps_lines([{"index": e.index, "error": str(e)}])
+    except ClientDisconnect:
+        # Client đã đóng kết nối khi đang gửi body: dừng chấm điểm
+        return
+
+
+@router.post('/analyze/bulk', dependencies=[Depends(require_admin)])
+async def analyze_posts_bulk(
+    request: Request,
+    include_text: bool = Query(False, description="Trả kèm preprocessed_text cho từng bản ghi")
+):
+    """Check hàng loạt - nhận JSON array hoặc NDJSON {title, content}, trả kết quả NDJSON theo từng chunk"""
+    # Content-Length khai báo quá lớn: từ chối luôn; body chunked được đếm khi đọc (ndjson)
+    content_length = request.headers.get("content-length", "")
+    if BULK_MAX_BODY_BYTES and content_length.isdigit() and int(content_length) > BULK_MAX_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Body vượt quá {BULK_MAX_BODY_BYTES} byte"
+        )
+    return NDJSONStreamingResponse(_stream_bulk_results(request, include_text), request)
@@ -1,45 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db
+from app.dependency.posts import load_post
 from app.schemas.Posts import PostCreate, PostResponse, FakeNewsCheckResponse
 from app.dependency.auth import get_current_user
 from app.models.Posts import Post
 from app.models.Categories import Category
 from app.models.Post_images import PostImage
-from app.models.User import User
-from app.dependency.standard import preprocess_pipeline, check_label
+from app.core.principal_cache import Principal
+from app.core.preprocess_pool import preprocess_executor
+from app.core.prediction_cache import prediction_cache
+from app.core.inference import inference_engine, EngineOverloaded
+from app.core.model_registry import model_registry
 from typing import Optional
 from datetime import datetime
-import os
-import joblib
 
 
-PROJECT_ROOT = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "..")
-)
-
-model_path = os.path.join(PROJECT_ROOT, "logreg_fake_news_model.pkl")
-vectorizer_path = os.path.join(PROJECT_ROOT, "tfidf_vectorizer.pkl")
-
-loaded_model = joblib.load(model_path)
-vectorizer = joblib.load(vectorizer_path)
 
 router = APIRouter(prefix="/posts", tags=["fake-news-detection"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post('/user-share', response_model=FakeNewsCheckResponse)
-def user_share_post(
+async def user_share_post(
     post_data: PostCreate,
-    current_user: User = Depends(get_current_user),  
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),  
+    db: AsyncSession = Depends(get_db)
 ):
     if not post_data.content:
         raise HTTPException(
@@ -55,31 +40,30 @@ def user_share_post(
         )
     
     # AI Analysis
-    preprocessed = preprocess_pipeline(combine_text)
-    vector_text = vectorizer.transform([preprocessed])
-    prediction = loaded_model.predict(vector_text)[0]
-    prediction_proba = loaded_model.predict_proba(vector_text)[0]
-    
-    classes = loaded_model.classes_
-    proba_dict = {}
-    for idx, class_lb in enumerate(classes):
-        label_name = "Real" if class_lb == 0 else "Fake"
-        proba_dict[label_name] = float(prediction_proba[idx])
-    
-    is_fake = bool(prediction == 1)
-    label = "Fake" if is_fake else "Real"
-    idx = list(classes).index(prediction)
-    dscore = float(prediction_proba[idx])
-    cre_label = check_label(is_fake, dscore)
+    model_version = model_registry.get().version
+    cached = await prediction_cache.get(post_data.title, post_data.content, model_version)
+    if cached is not None:
+        preprocessed, prediction = cached
+    else:
+        preprocessed = await preprocess_executor.run(combine_text)
+        try:
+            prediction = await inference_engine.apredict(preprocessed)
+        except EngineOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Hệ thống đang quá tải, vui lòng thử lại sau"
+            )
+        await prediction_cache.set(post_data.title, post_data.content, preprocessed, prediction)
+    result = prediction.as_check_result()
     
     # Validate category
     if post_data.category_id:
-        category = db.query(Category).filter(Category.id == post_data.category_id).first()
+        category = await db.get(Category, post_data.category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category không tồn tại")
     
     
-    final_status = "published" if label == "Real" else "draft"
+    final_status = "published" if result["label"] == "Real" else "draft"
     
     try:
     # Lưu post
@@ -89,12 +73,12 @@ def user_share_post(
             title=post_data.title,
             content=post_data.content,
             status=final_status,
-            credibility_score=dscore,
-            credibility_label=cre_label,
+            credibility_score=result["confidence_score"],
+            credibility_label=result["credibility_label"],
             published_at=datetime.now() if final_status == "published" else None
         )
         db.add(saved_post)
-        db.flush()  # ← Dùng flush để lấy ID nhưng chưa commit
+        await db.flush()  # ← Dùng flush để lấy ID nhưng chưa commit
         
         # Lưu images
         if getattr(post_data, 'images', None):
@@ -102,19 +86,15 @@ def user_share_post(
                 img = PostImage(post_id=saved_post.id, image_url=img_url)
                 db.add(img)
         
-        db.commit()  # ← Commit 1 lần duy nhất
-        db.refresh(saved_post)
+        await db.commit()  # ← Commit 1 lần duy nhất
+        saved_post = await load_post(db, saved_post.id)
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(500, detail=str(e))
     
     return {
-        "is_fake": is_fake,
-        "confidence_score": dscore,
-        "credibility_label": cre_label,
-        "label": label,
-        "probabilities": proba_dict,
+        **result,
         "preprocessed_text": preprocessed,
         "post": saved_post
     }
\ No newline at end of file
@@ -1,30 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db
+from app.dependency.posts import load_post
 from app.schemas.Posts import PostResponse
 from app.models.Posts import Post
 from app.models.Post_images import PostImage
 from typing import List
-from app.models.User import User
+from app.core.principal_cache import Principal
 from app.dependency.auth import get_current_user
 from pydantic import BaseModel
+from app.core.uploads import UPLOAD_DIR, save_upload
+from app.core.image_pipeline import image_pipeline
+import asyncio
 import os
-import shutil
-from datetime import datetime
 
 router = APIRouter(tags=["images"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-UPLOAD_DIR = "uploads/images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
 
 class ImagesPayload(BaseModel):
@@ -43,80 +38,82 @@ class MultipleImageResponse(BaseModel):
 
 
 @router.post('/posts/{post_id}/images', response_model=PostResponse)
-def add_images_to_post(
+async def add_images_to_post(
     post_id: int,
     payload: ImagesPayload = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add images to post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài viết không tồn tại")
 
     for img_url in payload.images:
         img = PostImage(post_id=post.id, image_url=img_url)
         db.add(img)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
 
     return post
 
 
 @router.delete('/posts/{post_id}/images/{image_id}')
-def delete_image_from_post(
+async def delete_image_from_post(
     post_id: int,
     image_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete image from post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài viết không tồn tại")
     
-    image = db.query(PostImage).filter(
+    image = (await db.scalars(select(PostImage).where(
         PostImage.id == image_id,
         PostImage.post_id == post_id
-    ).first()
+    ))).first()
     
     if not image:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hình ảnh không tồn tại")
     
-    db.delete(image)
-    db.commit()
+    await db.delete(image)
+    await db.commit()
     
     return {"message": "Hình ảnh đã được xóa thành công"}
 
 
-@router.post('/images/upload', response_model=ImageResponse)
-async def upload_image(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    """Upload image independently"""
-    
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    
-    if file_ext not in allowed_extensions:
+def _check_extension(file: UploadFile) -> str:
+    file_ext = os.path.splitext(file.filename or "")[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
+            detail=f"File {file.filename} không hợp lệ. Chỉ chấp nhận: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
         )
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
+    return file_ext
+
+
+async def _save(file: UploadFile, file_ext: str) -> str:
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        blob = await save_upload(file, UPLOAD_DIR, file_ext)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Could not upload file: {str(e)}"
+            detail=f"Không thể upload {file.filename}: {str(e)}"
         )
-    
-    image_url = f"/{UPLOAD_DIR}/{filename}"
+    return blob.url
+
+
+@router.post('/images/upload', response_model=ImageResponse)
+async def upload_image(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload image independently"""
+    image_url = await _save(file, _check_extension(file))
+    # Tạo thumbnail / WebP ngay, trước khi ảnh được gắn vào bài viết
+    image_pipeline.enqueue(image_url)
     
     return {
         "image_url": image_url,
@@ -127,44 +124,28 @@ async def upload_image(
 @router.post('/images/upload-multiple', response_model=MultipleImageResponse)
 async def upload_multiple_images(
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload nhiều ảnh cùng lúc, trả về array URLs"""
-    
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-    uploaded_urls = []
-    
-    for file in files:
-        # Validate file type
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in allowed_extensions:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File {file.filename} không hợp lệ. Chỉ chấp nhận: {', '.join(allowed_extensions)}"
-            )
-        
-        # Generate unique filename (thêm microseconds để tránh trùng lặp)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        # Save file
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Không thể upload {file.filename}: {str(e)}"
-            )
-        
-        # Add to result
-        image_url = f"/{UPLOAD_DIR}/{filename}"
-        uploaded_urls.append(image_url)
+    # Kiểm tra hết định dạng trước khi ghi file nào
+    extensions = [_check_extension(file) for file in files]
+
+    # Ghi các file song song. 1 file lỗi -> cả request lỗi; blob đã ghi có thể
+    # đang được request khác dùng chung nên không xóa ngay, để upload_collector dọn
+    results = await asyncio.gather(
+        *(_save(file, file_ext) for file, file_ext in zip(files, extensions)),
+        return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+    uploaded_urls = list(results)
+    for image_url in uploaded_urls:
+        image_pipeline.enqueue(image_url)
     
     return {
         "urls": uploaded_urls,
         "count": len(uploaded_urls),
         "message": f"Đã upload {len(uploaded_urls)} ảnh thành công"
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional
+from app.dependency.auth import require_admin
+from app.dependency.database import get_db
+from app.core.model_registry import model_registry
+from app.core.inference import inference_engine
+from app.core.prediction_cache import prediction_cache
+from app.core.preprocess_pool import preprocess_executor
+from app.core.search_index import search_index
+from app.core.principal_cache import principal_cache
+from app.core.password_hasher import password_hasher
+from app.core.feed_cache import feed_cache
+from app.core.image_pipeline import image_pipeline
+from app.core.uploads import upload_collector
+from app.core.config import engine, replica_router
+from app.core.db_pool import pool_stats
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_admin)])
+
+
+class ModelReloadPayload(BaseModel):
+    model_path: Optional[str] = None
+    vectorizer_path: Optional[str] = None
+
+
+@router.get('/models')
+def get_model_stats():
+    """Phiên bản, thời gian nạp và bộ nhớ của từng artifact"""
+    return model_registry.stats()
+
+
+@router.post('/models/reload')
+def reload_model(payload: ModelReloadPayload):
+    """Hot-swap sang file model/vectorizer mới mà không cần restart worker"""
+    try:
+        model_registry.load(payload.model_path, payload.vectorizer_path)
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Không thể nạp model: {str(e)}"
+        )
+    return model_registry.stats()
+
+
+@router.get('/inference')
+def get_inference_stats():
+    """Độ sâu hàng đợi và thống kê batch của inference engine"""
+    return inference_engine.stats()
+
+
+@router.get('/prediction-cache')
+def get_prediction_cache_stats():
+    """Hit/miss/eviction của prediction cache"""
+    return prediction_cache.stats()
+
+
+@router.delete('/prediction-cache')
+def clear_prediction_cache():
+    prediction_cache.invalidate()
+    return prediction_cache.stats()
+
+
+@router.get('/tokenize-cache')
+def get_tokenize_cache_stats():
+    """Tỉ lệ hit của cache tách từ theo câu trong từng process tiền xử lý"""
+    return preprocess_executor.tokenize_cache_stats()
+
+
+@router.get('/db-pool')
+def get_db_pool_stats():
+    """Số connection đang dùng / overflow và thời gian chờ lấy connection của worker này"""
+    return {
+        **pool_stats(engine),
+        "primary_reads": replica_router.primary_reads,
+        "replicas": replica_router.stats(),
+    }
+
+
+@router.get('/principal-cache')
+def get_principal_cache_stats():
+    """Hit/miss của cache user đăng nhập trong get_current_user"""
+    return principal_cache.stats()
+
+
+@router.delete('/principal-cache')
+def clear_principal_cache():
+    principal_cache.invalidate()
+    return principal_cache.stats()
+
+
+@router.get('/password-hasher')
+def get_password_hasher_stats():
+    """Số việc bcrypt đang chờ / bị từ chối và thời gian hash trung bình"""
+    return password_hasher.stats()
+
+
+@router.get('/feed-cache')
+def get_feed_cache_stats():
+    """Hit/miss/304 của cache trang /posts/published và /posts/category/{id}"""
+    return feed_cache.stats()
+
+
+@router.delete('/feed-cache')
+def clear_feed_cache():
+    feed_cache.invalidate()
+    return feed_cache.stats()
+
+
+@router.get('/image-pipeline')
+def get_image_pipeline_stats():
+    """Số ảnh đang / đã tạo thumbnail, WebP / AVIF"""
+    return image_pipeline.stats()
+
+
+@router.get('/uploads')
+def get_upload_collector_stats():
+    """Số file ảnh đã dọn vì không còn bài viết nào dùng"""
+    return upload_collector.stats()
+
+
+@router.post('/uploads/gc')
+async def collect_uploads():
+    """Quét toàn bộ kho ảnh ngay, xóa file không còn tham chiếu (quá thời gian chờ)"""
+    removed = await upload_collector.sweep()
+    return {"removed": removed, **upload_collector.stats()}
+
+
+@router.get('/search-index')
+def get_search_index_stats():
+    """Số bài viết trong index full-text và số thay đổi đang chờ cập nhật"""
+    return search_index.stats()
+
+
+@router.post('/search-index/rebuild')
+async def rebuild_search_index(db: AsyncSession = Depends(get_db)):
+    """Dựng lại index full-text từ toàn bộ bài viết published"""
+    if not search_index.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index chưa được bật"
+        )
+    queued = await search_index.rebuild(db)
+    return {"queued": queued, **search_index.stats()}
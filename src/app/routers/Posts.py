@@ -1,51 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db, get_read_db
+from app.dependency.posts import FIELDS_DESCRIPTION, list_options, load_post, parse_fields, project
+from app.dependency.pagination import paginate
 from app.schemas.Posts import PostCreate, PostUpdate, PostResponse, PostSimple, FakeNewsCheckResponse
 from app.models.Posts import Post
 from app.models.Categories import Category
 from app.models.Post_images import PostImage
 from typing import List, Optional
 from datetime import datetime
-import joblib
 import re
 import pandas as pd
 from underthesea import word_tokenize
-import os
 from pydantic import BaseModel
-from app.dependency.standard import preprocess_pipeline, check_label
+from app.core.preprocess_pool import preprocess_executor
+from app.core.prediction_cache import prediction_cache
+from app.core.inference import inference_engine, EngineOverloaded
+from app.core.model_registry import model_registry
+from app.core.feed_cache import feed_cache
 
-PROJECT_ROOT = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "..")
-)
-
-model_path = os.path.join(PROJECT_ROOT, "logreg_fake_news_model.pkl")
-vectorizer_path = os.path.join(PROJECT_ROOT, "tfidf_vectorizer.pkl")
-
-loaded_model = joblib.load(model_path)
-vectorizer = joblib.load(vectorizer_path)
 
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-
 
 @router.post('/', response_model=PostResponse)
-def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
+async def create_post(post_data: PostCreate, db: AsyncSession = Depends(get_db)):
     
     # Nếu có category_id, kiểm tra tồn tại
     if post_data.category_id is not None:
-        category = db.query(Category).filter(Category.id == post_data.category_id).first()
+        category = await db.get(Category, post_data.category_id)
         if not category:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category không tồn tại")
 
@@ -59,28 +46,26 @@ def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    await db.commit()
 
     # Nếu có images gửi kèm (danh sách URL), tạo các bản ghi PostImage
     if getattr(post_data, 'images', None):
         for img_url in post_data.images:
             img = PostImage(post_id=new_post.id, image_url=img_url)
             db.add(img)
-        db.commit()
-        # refresh relationships by reloading post
-        db.refresh(new_post)
+        await db.commit()
 
-    return new_post
+    # Đọc lại bài viết kèm danh sách ảnh
+    return await load_post(db, new_post.id)
 
 
 
 
 # ============= PREDICT =================
 @router.post('/predict', response_model=FakeNewsCheckResponse)
-def predict_post(
+async def predict_post(
     post_data: PostCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     save: bool = Query(False, description="Nếu true sẽ lưu kết quả prediction thành một Post trong DB")
 ):
     if not post_data.content:
@@ -96,30 +81,27 @@ def predict_post(
             detail="Nội dung sau khi xử lý trống, vui lòng nhập nội dung hợp lệ"
         )
     # Tiền xử lý trước khi vectorize
-    preprocessed = preprocess_pipeline(combine_text)
-    vector_text = vectorizer.transform([preprocessed])
-
-    prediction = loaded_model.predict(vector_text)[0]
-    prediction_proba = loaded_model.predict_proba(vector_text)[0]
-    
-    classes = loaded_model.classes_
-    proba_dict = {}
-    for idx, class_lb in enumerate(classes):
-        label_name = "Real" if class_lb == 1 else "Fake"
-        proba_dict[label_name] = float(prediction_proba[idx])
-    
-    is_fake = bool(prediction == 0)
-    label = "Fake" if is_fake else "Real"
-
-    idx = list(classes).index(prediction)
-    dscore = float(prediction_proba[idx])
-    cre_label = check_label(is_fake, dscore)
+    model_version = model_registry.get().version
+    cached = await prediction_cache.get(post_data.title, post_data.content, model_version)
+    if cached is not None:
+        preprocessed, prediction = cached
+    else:
+        preprocessed = await preprocess_executor.run(combine_text)
+        try:
+            prediction = await inference_engine.apredict(preprocessed)
+        except EngineOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Hệ thống đang quá tải, vui lòng thử lại sau"
+            )
+        await prediction_cache.set(post_data.title, post_data.content, preprocessed, prediction)
+    result = prediction.as_check_result(fake_class=0)
 
     saved_post = None
     # Nếu người gọi muốn lưu kết quả prediction thành 1 post
     if save:
         if post_data.category_id is not None:
-            category = db.query(Category).filter(Category.id == post_data.category_id).first()
+            category = await db.get(Category, post_data.category_id)
             if not category:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category không tồn tại")
 
@@ -129,20 +111,16 @@ def predict_post(
             title=post_data.title,
             content=post_data.content,
             status=post_data.status,
-            credibility_score=dscore,
-            credibility_label=cre_label,
+            credibility_score=result["confidence_score"],
+            credibility_label=result["credibility_label"],
             published_at=post_data.published_at
         )
         db.add(saved_post)
-        db.commit()
-        db.refresh(saved_post)
+        await db.commit()
+        saved_post = await load_post(db, saved_post.id)
 
     return {
-        "is_fake": is_fake,
-        "confidence_score": dscore,
-        "credibility_label": cre_label,
-        "label": label,
-        "probabilities": proba_dict,
+        **result,
         "preprocessed_text": preprocessed,
         "post": saved_post
     }
@@ -150,54 +128,66 @@ def predict_post(
        
 
 
-@router.get('/', response_model=List[PostSimple])
-def get_all_posts(
-    db: Session = Depends(get_db),
+@router.get('/', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_all_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     status: Optional[str] = None,
     user_id: Optional[int] = None,
     category_id: Optional[int] = None
 ):
     """Lấy danh sách bài viết với filter"""
-    query = db.query(Post)
+    columns = parse_fields(fields)
+    query = select(Post).options(*list_options(columns))
     
     # Filter theo status
     if status:
-        query = query.filter(Post.status == status)
+        query = query.where(Post.status == status)
     
     # Filter theo user_id
     if user_id:
-        query = query.filter(Post.user_id == user_id)
+        query = query.where(Post.user_id == user_id)
     
     # Filter theo category_id
     if category_id:
-        query = query.filter(Post.category_id == category_id)
+        query = query.where(Post.category_id == category_id)
     
     # Sắp xếp theo ngày cập nhật mới nhất
-    posts = query.order_by(Post.updated_at.desc()).offset(skip).limit(limit).all()
+    posts = await paginate(db, query, Post.updated_at, response, skip, limit, cursor)
     
-    return posts
+    return project(posts, columns)
 
 
-@router.get('/published', response_model=List[PostSimple])
-def get_published_posts(
-    db: Session = Depends(get_db),
+@router.get('/published', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_published_posts(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
-    """Lấy danh sách bài viết đã published"""
-    posts = db.query(Post).filter(
-        Post.status == "published"
-    ).order_by(Post.published_at.desc()).offset(skip).limit(limit).all()
-    
-    return posts
+    """Lấy danh sách bài viết đã published (ETag / 304 qua feed cache)"""
+    columns = parse_fields(fields)
+    key = ("published", skip, limit, cursor, columns)
+    entry = feed_cache.get(key, request)
+    if entry is None:
+        query = select(Post).options(*list_options(columns)).where(Post.status == "published")
+        posts = await paginate(db, query, Post.published_at, response, skip, limit, cursor)
+        entry = feed_cache.put(key, posts, columns, response, request)
+
+    return entry.response(request)
 
 
 @router.get('/{post_id}', response_model=PostResponse)
-def get_post(post_id: int, db: Session = Depends(get_db)):
+async def get_post(post_id: int, db: AsyncSession = Depends(get_read_db)):
     """Lấy chi tiết bài viết theo ID"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await load_post(db, post_id)
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài viết không tồn tại")
@@ -205,30 +195,40 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
     return post
 
 
-@router.get('/category/{category_id}', response_model=List[PostSimple])
-def get_posts_by_category(
+@router.get('/category/{category_id}', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_posts_by_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
-    """Lấy danh sách bài viết theo category"""
-    posts = db.query(Post).filter(Post.category_id == category_id).order_by(Post.updated_at.desc()).offset(skip).limit(limit).all()
+    """Lấy danh sách bài viết theo category (ETag / 304 qua feed cache)"""
+    columns = parse_fields(fields)
+    key = ("category", category_id, skip, limit, cursor, columns)
+    entry = feed_cache.get(key, request)
+    if entry is None:
+        query = select(Post).options(*list_options(columns)).where(Post.category_id == category_id)
+        posts = await paginate(db, query, Post.updated_at, response, skip, limit, cursor)
+        entry = feed_cache.put(key, posts, columns, response, request)
 
-    return posts
+    return entry.response(request)
 
 
 
 
 
 @router.put('/{post_id}', response_model=PostResponse)
-def update_post(
+async def update_post(
     post_id: int,
     post_data: PostUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Cập nhật bài viết"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -245,7 +245,7 @@ def update_post(
     
     if post_data.category_id is not None:
         # Kiểm tra category có tồn tại
-        category = db.query(Category).filter(Category.id == post_data.category_id).first()
+        category = await db.get(Category, post_data.category_id)
         if not category:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category không tồn tại")
         post.category_id = post_data.category_id
@@ -256,8 +256,8 @@ def update_post(
             post.published_at = datetime.now()
         post.status = post_data.status
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
     
     return post
 
@@ -268,29 +268,29 @@ class ImagesPayload(BaseModel):
 
 
 @router.post('/{post_id}/images', response_model=PostResponse)
-def add_images_to_post(post_id: int, payload: ImagesPayload = Body(...), db: Session = Depends(get_db)):
+async def add_images_to_post(post_id: int, payload: ImagesPayload = Body(...), db: AsyncSession = Depends(get_db)):
     """Thêm danh sách URL ảnh vào Post (tạo bản ghi `post_images`).
 
     - payload.images: danh sách URL (strings).
     - Trả về Post đã được cập nhật (với danh sách images nếu ORM mapping có relationship).
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài viết không tồn tại")
 
     for img_url in payload.images:
         img = PostImage(post_id=post.id, image_url=img_url)
         db.add(img)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
 
     return post
 
 
 @router.delete('/{post_id}')
-def delete_post(post_id: int, db: Session = Depends(get_db)):
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Xóa bài viết"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -298,16 +298,16 @@ def delete_post(post_id: int, db: Session = Depends(get_db)):
             detail="Bài viết không tồn tại"
         )
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
     
     return None
 
 
 @router.post('/{post_id}/publish', response_model=PostResponse)
-def publish_post(post_id: int, db: Session = Depends(get_db)):
+async def publish_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Publish bài viết"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -324,16 +324,16 @@ def publish_post(post_id: int, db: Session = Depends(get_db)):
     post.status = "published"
     post.published_at = datetime.now()
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
     
     return post
 
 
 @router.post('/{post_id}/unpublish', response_model=PostResponse)
-def unpublish_post(post_id: int, db: Session = Depends(get_db)):
+async def unpublish_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Unpublish bài viết (chuyển về draft)"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -343,7 +343,7 @@ def unpublish_post(post_id: int, db: Session = Depends(get_db)):
     
     post.status = "draft"
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
     
     return post
\ No newline at end of file
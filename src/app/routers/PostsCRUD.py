@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db
+from app.dependency.posts import FIELDS_DESCRIPTION, list_options, load_post, parse_fields, project
+from app.dependency.pagination import paginate
 from app.dependency.auth import require_admin
 from app.schemas.Posts import PostCreate, PostUpdate, PostResponse, PostSimple
 from app.models.Posts import Post
@@ -13,46 +16,42 @@ from pydantic import BaseModel
 router = APIRouter(prefix="/posts", tags=["posts-crud"], dependencies=[Depends(require_admin)])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-@router.get('/', response_model=List[PostSimple])
-def get_all_posts(
-    db: Session = Depends(get_db),
+@router.get('/', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_all_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     status: Optional[str] = None,
     user_id: Optional[int] = None,
     category_id: Optional[int] = None
 ):
     """List posts with filter and pagination"""
-    query = db.query(Post)
+    columns = parse_fields(fields)
+    query = select(Post).options(*list_options(columns))
     
     if status:
-        query = query.filter(Post.status == status)
+        query = query.where(Post.status == status)
     
     if user_id:
-        query = query.filter(Post.user_id == user_id)
+        query = query.where(Post.user_id == user_id)
     
     if category_id:
-        query = query.filter(Post.category_id == category_id)
+        query = query.where(Post.category_id == category_id)
     
-    posts = query.order_by(Post.updated_at.desc()).offset(skip).limit(limit).all()
+    posts = await paginate(db, query, Post.updated_at, response, skip, limit, cursor)
     
-    return posts
+    return project(posts, columns)
 
 
 @router.post('/', response_model=PostResponse)
-def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
+async def create_post(post_data: PostCreate, db: AsyncSession = Depends(get_db)):
     """Manually create post (admin)"""
     
     if post_data.category_id is not None:
-        category = db.query(Category).filter(Category.id == post_data.category_id).first()
+        category = await db.get(Category, post_data.category_id)
         if not category:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category không tồn tại")
 
@@ -66,23 +65,21 @@ def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    await db.commit()
 
     if getattr(post_data, 'images', None):
         for img_url in post_data.images:
             img = PostImage(post_id=new_post.id, image_url=img_url)
             db.add(img)
-        db.commit()
-        db.refresh(new_post)
+        await db.commit()
 
-    return new_post
+    return await load_post(db, new_post.id)
 
 
 @router.get('/{post_id}', response_model=PostResponse)
-def get_post(post_id: int, db: Session = Depends(get_db)):
+async def get_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Get post details by ID"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await load_post(db, post_id)
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài viết không tồn tại")
@@ -91,13 +88,13 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
 
 
 @router.put('/{post_id}', response_model=PostResponse)
-def update_post_full(
+async def update_post_full(
     post_id: int,
     post_data: PostUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update all post fields"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -112,7 +109,7 @@ def update_post_full(
         post.content = post_data.content
     
     if post_data.category_id is not None:
-        category = db.query(Category).filter(Category.id == post_data.category_id).first()
+        category = await db.get(Category, post_data.category_id)
         if not category:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category không tồn tại")
         post.category_id = post_data.category_id
@@ -122,8 +119,8 @@ def update_post_full(
             post.published_at = datetime.now()
         post.status = post_data.status
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
     
     return post
 
@@ -131,9 +128,9 @@ def update_post_full(
 
 
 @router.delete('/{post_id}')
-def delete_post(post_id: int, db: Session = Depends(get_db)):
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_db)):
     """Delete post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -141,8 +138,8 @@ def delete_post(post_id: int, db: Session = Depends(get_db)):
             detail="Bài viết không tồn tại"
         )
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
     
     return {"message": "Bài viết đã được xóa thành công"}
 
@@ -152,13 +149,13 @@ class StatusUpdate(BaseModel):
 
 
 @router.patch('/{post_id}/status', response_model=PostResponse)
-def change_post_status(
+async def change_post_status(
     post_id: int,
     status_data: StatusUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change post status"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -171,7 +168,7 @@ def change_post_status(
     
     post.status = status_data.status
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    post = await load_post(db, post.id)
     
     return post
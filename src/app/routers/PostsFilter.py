@@ -1,83 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db, get_read_db
+from app.dependency.posts import FIELDS_DESCRIPTION, list_options, parse_fields, project
+from app.dependency.pagination import NEXT_CURSOR_HEADER, decode_offset_cursor, encode_offset_cursor, paginate
+from app.core.search_index import search_index
 from app.schemas.Posts import PostSimple
 from app.models.Posts import Post
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-router = APIRouter(prefix="/posts", tags=["posts-filter"])
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Cursor các trang kết quả full-text: vị trí trong thứ hạng bm25
+RANK_CURSOR_KEY = "bm25"
 
-@router.get('/published', response_model=List[PostSimple])
-def get_published_posts(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
-):
-    """Get published posts"""
-    posts = db.query(Post).filter(
-        Post.status == "published"
-    ).order_by(Post.published_at.desc()).offset(skip).limit(limit).all()
-    
-    return posts
+# /published, /category/{id}: xem routers/Posts.py. Router này phải được
+# include trước Posts.py để /draft, /search không bị GET /posts/{post_id} bắt mất
+router = APIRouter(prefix="/posts", tags=["posts-filter"])
 
-@router.get('/draft', response_model=List[PostSimple])
-def get_draft_posts(
-    db: Session = Depends(get_db),
+@router.get('/draft', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_draft_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     user_id: int = Query(..., description="User ID to get draft posts"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """Get draft posts (mine)"""
-    posts = db.query(Post).filter(
+    columns = parse_fields(fields)
+    query = select(Post).options(*list_options(columns)).where(
         Post.status == "draft",
         Post.user_id == user_id
-    ).order_by(Post.updated_at.desc()).offset(skip).limit(limit).all()
+    )
+    posts = await paginate(db, query, Post.updated_at, response, skip, limit, cursor)
     
-    return posts
+    return project(posts, columns)
 
 
 
-@router.get('/search', response_model=List[PostSimple])
-def search_posts(
-    db: Session = Depends(get_db),
+@router.get('/search', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def search_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     q: str = Query(..., description="Search query"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """Search posts by title or content (published only)"""
+    columns = parse_fields(fields)
+    rank_offset = decode_offset_cursor(cursor, RANK_CURSOR_KEY) if cursor else None
+    if rank_offset is not None:
+        skip, cursor = rank_offset, None
+    if search_index.available and not cursor:
+        # Full-text (bm25, không phân biệt dấu); None = index đang được dựng -> ILIKE
+        post_ids = await search_index.asearch(q, limit=limit + 1, offset=skip)
+        if post_ids is not None:
+            if len(post_ids) > limit:
+                post_ids = post_ids[:limit]
+                # Trang sau tiếp tục theo thứ hạng bm25, không quay về ILIKE
+                response.headers[NEXT_CURSOR_HEADER] = encode_offset_cursor(RANK_CURSOR_KEY, skip + limit)
+            if not post_ids:
+                return []
+            rows = await db.scalars(
+                select(Post).options(*list_options(columns)).where(Post.id.in_(post_ids), Post.status == "published")
+            )
+            by_id = {post.id: post for post in rows}
+            return project([by_id[post_id] for post_id in post_ids if post_id in by_id], columns)
+
     search_query = f"%{q}%"
     
-    posts = db.query(Post).filter(
+    query = select(Post).options(*list_options(columns)).where(
         Post.status == "published",
         or_(
             Post.title.ilike(search_query),
             Post.content.ilike(search_query)
         )
-    ).order_by(Post.published_at.desc()).offset(skip).limit(limit).all()
+    )
+    posts = await paginate(db, query, Post.published_at, response, skip, limit, cursor)
     
-    return posts
-
-@router.get('/category/{category_id}', response_model=List[PostSimple])
-def get_posts_by_category(
-    category_id: int,
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
-):
-    """Get published posts by category"""
-    posts = db.query(Post).filter(
-        Post.status == "published",
-        Post.category_id == category_id
-    ).order_by(Post.published_at.desc()).offset(skip).limit(limit).all()
-
-    return posts
-
+    return project(posts, columns)
@@ -1,59 +1,67 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db
 from app.schemas.User import UserBase, UserResponse, UserUpdate, LoginBase
 from typing import List
 from app.models.User import User
-from passlib.context import CryptContext
-from app.dependency.auth import create_access_token
+from app.core.password_hasher import PasswordHasherOverloaded, password_hasher
+from app.dependency.auth import create_access_token, token_claims
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-# Cấu hình mã hóa password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _too_many_requests() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Hệ thống đang xử lý quá nhiều yêu cầu đăng nhập, vui lòng thử lại sau",
+        headers={"Retry-After": "1"},
+    )
 
 
-def hash_password(password: str) -> str:
-   
-    return pwd_context.hash(password)
+# bcrypt chạy trên pool riêng có giới hạn hàng đợi (app.core.password_hasher)
+async def ahash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherOverloaded:
+        raise _too_many_requests()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    
-    return pwd_context.verify(plain_password, hashed_password)
+async def averify_password(db: AsyncSession, user: User, plain_password: str) -> bool:
+    """Kiểm tra password; hash cũ (khác BCRYPT_ROUNDS) được thay bằng hash mới."""
+    try:
+        ok, new_hash = await password_hasher.verify_and_update(plain_password, user.password_hash)
+    except PasswordHasherOverloaded:
+        raise _too_many_requests()
+    if ok and new_hash is not None:
+        user.password_hash = new_hash
+        await db.commit()
+    return ok
 
 
 @router.post('/register', response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserBase, db: Session = Depends(get_db)):
+async def register(user: UserBase, db: AsyncSession = Depends(get_db)):
     
     new_user = User(
         username=user.username,
         email=user.email,
-        password_hash=hash_password(user.password_hash),
+        password_hash=await ahash_password(user.password_hash),
         full_name=user.full_name,
         phone_number=user.phone_number
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post('/login')
-def login(credentials: LoginBase, db: Session = Depends(get_db)):
+async def login(credentials: LoginBase, db: AsyncSession = Depends(get_db)):
     """Đăng nhập"""
-    user = db.query(User).filter(User.username == credentials.username).first()
+    user = (await db.scalars(select(User).where(User.username == credentials.username))).first()
     
     if not user:
         raise HTTPException(
@@ -61,13 +69,13 @@ def login(credentials: LoginBase, db: Session = Depends(get_db)):
             detail="Username hoặc password không đúng"
         )
     
-    if not verify_password(credentials.password, user.password_hash):
+    if not await averify_password(db, user, credentials.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Username hoặc password không đúng"
         )
     
-    token = create_access_token({"sub": str(user.id), "username": user.username})
+    token = create_access_token(token_claims(user))
     return {
         "message": "Đăng nhập thành công",
         "user_id": user.id,
@@ -78,16 +86,16 @@ def login(credentials: LoginBase, db: Session = Depends(get_db)):
 
 
 @router.get('/', response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
+async def get_all_users(db: AsyncSession = Depends(get_db), skip: int = 0, limit: int = 100):
     """Lấy danh sách tất cả users"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = (await db.scalars(select(User).offset(skip).limit(limit))).all()
     return users
 
 
 @router.get('/{user_id}', response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Lấy thông tin user theo ID"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -99,9 +107,9 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.put('/{user_id}', response_model=UserResponse)
-def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_data: UserUpdate, db: AsyncSession = Depends(get_db)):
     """Cập nhật thông tin user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -112,10 +120,10 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
     # Cập nhật các trường nếu có
     if user_data.email is not None:
         # Kiểm tra email mới có bị trùng không
-        existing_email = db.query(User).filter(
+        existing_email = (await db.scalars(select(User).where(
             User.email == user_data.email,
             User.id != user_id
-        ).first()
+        ))).first()
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -129,22 +137,22 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
     if user_data.phone_number is not None:
         user.phone_number = user_data.phone_number
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 
 @router.post('/token')
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = (await db.scalars(select(User).where(User.username == form_data.username))).first()
+    if not user or not await averify_password(db, user, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Sai username hoặc mật khẩu"
         )
-    access_token = create_access_token({"sub": str(user.id), "username": user.username})
+    access_token = create_access_token(token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
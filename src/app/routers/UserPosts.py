@@ -1,46 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.config import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependency.database import get_db
+from app.dependency.pagination import paginate
+from app.dependency.posts import FIELDS_DESCRIPTION, list_options, parse_fields, project
 from app.dependency.auth import get_current_user
 from app.schemas.Posts import PostSimple
 from app.models.Posts import Post
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/posts", tags=["user-posts"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-@router.get('/user/my-posts', response_model=List[PostSimple])
-def get_my_posts(
-    db: Session = Depends(get_db),
+@router.get('/user/my-posts', response_model=List[PostSimple], response_model_exclude_unset=True)
+async def get_my_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: object = Depends(get_current_user)
 ):
     """Get my posts"""
     
-    posts = db.query(Post).filter(
-        Post.user_id == current_user.id
-    ).order_by(Post.updated_at.desc()).offset(skip).limit(limit).all()
-    return posts
+    columns = parse_fields(fields)
+    query = select(Post).options(*list_options(columns)).where(Post.user_id == current_user.id)
+    posts = await paginate(db, query, Post.updated_at, response, skip, limit, cursor)
+    return project(posts, columns)
 
 
 @router.delete('/user/delete/{post_id}')
-def delete_my_post(
+async def delete_my_post(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: object = Depends(get_current_user)
 ):
 
     
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     
     if not post:
         raise HTTPException(
@@ -54,7 +52,7 @@ def delete_my_post(
             detail="Bạn không có quyền xóa bài viết này"
         )
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
     
     return {"message": "Bài viết đã được xóa thành công"}
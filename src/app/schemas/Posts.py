@@ -3,12 +3,24 @@ from datetime import datetime
 from typing import Optional, List, Literal, Dict
 
 
+class PostImageVariant(BaseModel):
+    name: str
+    format: str
+    width: int
+    height: int
+    url: str
+
+
 class PostImageSchema(BaseModel):
     
     id: Optional[int] = None
     post_id: Optional[int] = None
     image_url: str 
     alt_text: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # Thumbnail / bản thu nhỏ WebP, AVIF (rỗng khi chưa xử lý xong)
+    variants: Optional[List[PostImageVariant]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -64,19 +76,24 @@ class PostResponse(PostBase):
 
 
 class PostSimple(BaseModel):
-    """Simple post representation for listing"""
+    """Simple post representation for listing (không có content, xem GET /posts/{id})"""
     
     id: int
-    user_id: int
-    title: str
-    content: str
+    user_id: Optional[int] = None
+    title: Optional[str] = None
+    # POST_EXCERPT_LENGTH ký tự đầu của content
+    excerpt: Optional[str] = None
     category_id: Optional[int] = None
-    status: str = "draft"
+    status: Optional[str] = None
     published_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     credibility_score: Optional[float] = None
     credibility_label: Optional[str] = None
+    # Ảnh chính (is_main hoặc ảnh đầu tiên), nạp cùng trang bằng selectinload
+    main_image_url: Optional[str] = None
+    # Thumbnail WebP/AVIF của ảnh chính cho card (ảnh gốc nếu chưa xử lý xong)
+    thumbnail_url: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,73 @@
+"""initial schema
+
+Schema ban đầu của các bảng users / categories / posts / post_images
+(trước khi có migration). Database đã có sẵn các bảng này: `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("email", sa.String(100), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False, unique=True),
+        sa.Column("full_name", sa.String(100), nullable=True),
+        sa.Column("phone_number", sa.String(15), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+    )
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("slug", sa.String(100), nullable=False),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=True),
+    )
+    op.create_index("ix_categories_id", "categories", ["id"])
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+    op.create_index("ix_categories_slug", "categories", ["slug"], unique=True)
+    op.create_table(
+        "posts",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("credibility_score", sa.Float(), nullable=True),
+        sa.Column("credibility_label", sa.String(50), nullable=True),
+    )
+    op.create_table(
+        "post_images",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("image_url", sa.String(255), nullable=False),
+        sa.Column("is_main", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_post_images_id", "post_images", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("post_images")
+    op.drop_table("posts")
+    op.drop_table("categories")
+    op.drop_table("users")
@@ -0,0 +1,46 @@
+"""post query indexes
+
+Index khớp với các query lọc + sắp xếp của router:
+  - (status, published_at): /posts/published, /posts/search
+  - (status, category_id, published_at): /posts/category/{id} (published)
+  - (user_id, updated_at): /posts/user/my-posts, /posts/draft
+  - (published_at, id), (updated_at, id): keyset pagination không lọc
+  - post_images(post_id): ảnh của 1 bài viết
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POST_INDEXES = {
+    "ix_posts_status_published_at": ["status", "published_at"],
+    "ix_posts_status_category_id_published_at": ["status", "category_id", "published_at"],
+    "ix_posts_user_id_updated_at": ["user_id", "updated_at"],
+    "ix_posts_published_at_id": ["published_at", "id"],
+    "ix_posts_updated_at_id": ["updated_at", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in POST_INDEXES.items():
+        op.create_index(name, "posts", columns)
+    op.create_index("ix_post_images_post_id", "post_images", ["post_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_images_post_id", table_name="post_images")
+    for name in POST_INDEXES:
+        op.drop_index(name, table_name="posts")
@@ -0,0 +1,34 @@
+"""post image variants
+
+Kích thước ảnh gốc và danh sách ảnh phái sinh (thumbnail, WebP / AVIF
+theo các chiều rộng responsive) do app.core.image_pipeline tạo sau upload.
+Ảnh cũ: `python -m app.core.image_pipeline backfill`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("post_images", sa.Column("width", sa.Integer(), nullable=True))
+    op.add_column("post_images", sa.Column("height", sa.Integer(), nullable=True))
+    op.add_column("post_images", sa.Column("variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("post_images", "variants")
+    op.drop_column("post_images", "height")
+    op.drop_column("post_images", "width")
@@ -0,0 +1,29 @@
+"""post image url index
+
+Ảnh lưu theo nội dung (sha256) nên nhiều dòng post_images dùng chung 1 file;
+số tham chiếu của file = COUNT(*) WHERE image_url = ... (GC ảnh, image_pipeline).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_post_images_image_url", "post_images", ["image_url"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_images_image_url", table_name="post_images")
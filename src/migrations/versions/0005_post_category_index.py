@@ -0,0 +1,35 @@
+"""post category index
+
+GET /posts/category/{id} được phục vụ bởi routers/Posts.py: lọc theo
+category_id (mọi status), sắp xếp theo updated_at. Index
+(status, category_id, published_at) của 0002 không khớp query nào
+đang chạy, thay bằng (category_id, updated_at).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_posts_category_id_updated_at", "posts", ["category_id", "updated_at"])
+    op.drop_index("ix_posts_status_category_id_published_at", table_name="posts")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_posts_status_category_id_published_at", "posts", ["status", "category_id", "published_at"]
+    )
+    op.drop_index("ix_posts_category_id_updated_at", table_name="posts")
@@ -0,0 +1,128 @@
+import asyncio
+import functools
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+
+# ===================================================================
+#  Cấu hình chung cho test: database SQLite + index FTS5 tạm, tiền xử lý
+#  / tạo ảnh chạy ngay trong thread (không process pool).
+#  App dùng đường dẫn tương đối (uploads/) như khi chạy `cd src && uvicorn`,
+#  nên test chạy trong 1 thư mục tạm. Chạy:  python -m pytest -q tests
+# ===================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="truthguard-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(WORKDIR, 'test.db')}")
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(WORKDIR, "search_index.db"))
+os.environ.setdefault("PREPROCESS_WORKERS", "0")
+os.environ.setdefault("IMAGE_WORKERS", "0")
+os.environ.setdefault("UPLOAD_GC_INTERVAL", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.chdir(WORKDIR)
+
+from app.core.config import Base, engine  # noqa: E402
+from app.models import Categories, Post_images, Posts, User  # noqa: E402,F401
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def wait_until(predicate, timeout: float = 10, message: str = "hết thời gian chờ"):
+    """Chờ các việc chạy nền (index, ảnh phái sinh...) xong."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError(message)
+        time.sleep(0.05)
+
+
+@functools.lru_cache(maxsize=None)
+def dataset_texts() -> tuple:
+    """Cột post_message của dataset/val.csv + dataset/test.csv (văn bản thật cho test tương đương)."""
+    import pandas as pd
+
+    texts = []
+    for name in ("val.csv", "test.csv"):
+        df = pd.read_csv(os.path.join(ROOT, "dataset", name))
+        texts.extend(df["post_message"].tolist())
+    return tuple(texts)
+
+
+@functools.lru_cache(maxsize=None)
+def preprocessed_dataset() -> tuple:
+    """dataset_texts() sau preprocess_pipeline - đầu vào của vectorizer / model."""
+    from app.dependency.standard import preprocess_pipeline
+
+    return tuple(preprocess_pipeline(text) for text in dataset_texts())
+
+
+def sklearn_model(name: str = "logreg_fake_news_model.pkl"):
+    """(vectorizer, model) pickle sklearn đi kèm repo."""
+    import joblib
+
+    return joblib.load(os.path.join(ROOT, "tfidf_vectorizer.pkl")), joblib.load(os.path.join(ROOT, name))
+
+
+def auth_headers(user_id: int, username: str = "u", is_admin: bool = False) -> dict:
+    from app.dependency.auth import create_access_token
+
+    token = create_access_token({"sub": str(user_id), "username": username, "is_admin": is_admin})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _reset_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+async def _insert(rows):
+    async with engine.begin() as conn:
+        for model, values in rows:
+            await conn.execute(model.__table__.insert(), values)
+    await engine.dispose()
+
+
+@pytest.fixture
+def database():
+    """Schema mới cho mỗi test; trả hàm insert((Model, [dict, ...]), ...)."""
+    from app.core.feed_cache import feed_cache
+    from app.core.principal_cache import principal_cache
+
+    run(_reset_schema())
+    feed_cache.invalidate()
+    principal_cache.invalidate()
+    return lambda *rows: run(_insert(rows))
+
+
+@pytest.fixture
+def search_index_path(monkeypatch, tmp_path):
+    from app.core.search_index import search_index
+
+    path = str(tmp_path / "search_index.db")
+    monkeypatch.setattr(search_index, "path", path)
+    return path
+
+
+@pytest.fixture
+def app_client(database, search_index_path):
+    """TestClient(app) chạy lifespan khi vào `with` (sau khi đã insert dữ liệu)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return lambda: TestClient(app)
+
+
+@pytest.fixture
+def client(app_client):
+    with app_client() as test_client:
+        yield test_client
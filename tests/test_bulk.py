@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from app.models.User import User
+from app.routers import CheckFakeNews
+from conftest import auth_headers
+
+
+# ===================================================================
+#  /posts/analyze/bulk: chỉ admin, giới hạn số bản ghi / số byte body
+#  được kiểm tra ngay khi đọc body (kể cả body chunked).
+# ===================================================================
+
+USERS = [
+    {"id": 1, "username": "admin", "email": "admin@example.com", "password_hash": "x1",
+     "phone_number": "01", "is_admin": True},
+    {"id": 2, "username": "user", "email": "user@example.com", "password_hash": "x2",
+     "phone_number": "02", "is_admin": False},
+]
+ADMIN = auth_headers(1, "admin", is_admin=True)
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _records(n):
+    return [{"title": f"Tin số {i}", "content": "Bộ Y tế cảnh báo thông tin sai sự thật"} for i in range(n)]
+
+
+def _ndjson(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+
+def _rows(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def bulk_client(database, app_client):
+    database((User, USERS))
+    with app_client() as client:
+        yield client
+
+
+@pytest.mark.parametrize("headers, expected", [({}, 401), (auth_headers(2, "user"), 403)])
+def test_requires_admin(bulk_client, headers, expected):
+    response = bulk_client.post("/posts/analyze/bulk", json=_records(2), headers=headers)
+    assert response.status_code == expected
+
+
+def test_admin_gets_one_row_per_record(bulk_client):
+    response = bulk_client.post("/posts/analyze/bulk", json=_records(3), headers=ADMIN)
+    assert response.status_code == 200
+    rows = _rows(response)
+    assert [row["index"] for row in rows] == [0, 1, 2]
+    assert all("error" not in row for row in rows)
+
+
+@pytest.mark.parametrize("ndjson", [True, False], ids=["ndjson", "array"])
+def test_record_limit(bulk_client, monkeypatch, ndjson):
+    monkeypatch.setattr(CheckFakeNews, "BULK_MAX_RECORDS", 5)
+    monkeypatch.setattr(CheckFakeNews, "BULK_CHUNK_SIZE", 2)
+    if ndjson:
+        response = bulk_client.post("/posts/analyze/bulk", content=_ndjson(_records(8)), headers={**ADMIN, **NDJSON})
+    else:
+        response = bulk_client.post("/posts/analyze/bulk", json=_records(8), headers=ADMIN)
+    rows = _rows(response)
+    # 5 bản ghi đầu được chấm điểm, sau đó 1 dòng lỗi
+    assert [row["index"] for row in rows] == [0, 1, 2, 3, 4, 5]
+    assert "5" in rows[-1]["error"]
+    assert all("error" not in row for row in rows[:-1])
+
+
+def test_declared_body_size_is_rejected(bulk_client, monkeypatch):
+    monkeypatch.setattr(CheckFakeNews, "BULK_MAX_BODY_BYTES", 1000)
+    response = bulk_client.post("/posts/analyze/bulk", json=_records(50), headers=ADMIN)
+    assert response.status_code == 413
+
+
+def test_chunked_body_size_is_counted_while_streaming(bulk_client, monkeypatch):
+    monkeypatch.setattr(CheckFakeNews, "BULK_MAX_BODY_BYTES", 1000)
+    monkeypatch.setattr(CheckFakeNews, "BULK_CHUNK_SIZE", 1)
+    sent = []
+
+    def body():
+        # Không có Content-Length: mỗi dòng 1 chunk
+        for record in _records(50):
+            sent.append(record)
+            yield _ndjson([record])
+
+    response = bulk_client.post("/posts/analyze/bulk", content=body(), headers={**ADMIN, **NDJSON})
+    assert response.status_code == 200
+    rows = _rows(response)
+    assert "1000" in rows[-1]["error"]
+    assert len(rows) - 1 < 50
+    assert all("error" not in row for row in rows[:-1])
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, 'crawdata'))
+
+from CrawDataVNEXPRESS import NO_CONTENT, NO_TITLE, AsyncVnExpressCrawler  # noqa: E402
+
+
+# ===================================================================
+#  CRAWLER VỚI HTML LƯU SẴN
+#  Phục vụ crawdata/fixtures/ qua HTTP server local (mỗi request chậm
+#  RESPONSE_DELAY giây, lần đầu trả 429) rồi chạy AsyncVnExpressCrawler:
+#  kiểm tra kết quả parse, giới hạn request đồng thời / khoảng cách theo host.
+# ===================================================================
+
+FIXTURES = os.path.join(ROOT, 'crawdata', 'fixtures')
+RESPONSE_DELAY = 0.1
+CATEGORIES = [
+    {'name': 'Chính trị', 'path': '/thoi-su', 'category_id': 1},
+    {'name': 'Thể thao', 'path': '/the-thao', 'category_id': 6},
+]
+# Trang trả 429 ở lần đầu (kiểm tra thử lại)
+RATE_LIMITED_ONCE = '/ha-noi-mo-rong-duong-vanh-dai-4964002.html'
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FixtureHandler)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.starts = []
+        self.rate_limited = set()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURES, **kwargs)
+
+    def translate_path(self, path):
+        # /thoi-su -> fixtures/thoi-su.html
+        full_path = super().translate_path(path)
+        if not os.path.isfile(full_path) and os.path.isfile(full_path + '.html'):
+            return full_path + '.html'
+        return full_path
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.starts.append(time.monotonic())
+            first_hit = self.path == RATE_LIMITED_ONCE and self.path not in server.rate_limited
+            server.rate_limited.add(self.path)
+        try:
+            time.sleep(RESPONSE_DELAY)
+            if first_hit:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            super().do_GET()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = FixtureServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(server, **options):
+    async def run():
+        async with AsyncVnExpressCrawler(base_url=server.base_url, categories=CATEGORIES, jitter=0, **options) as crawler:
+            return await crawler.start_crawk(articles_per_category=5), crawler.stats
+
+    server.reset()
+    started = time.monotonic()
+    posts, stats = asyncio.run(run())
+    return posts, stats, time.monotonic() - started
+
+
+@pytest.fixture(scope='module')
+def parallel(server):
+    return crawl(server, per_host=3, delay=0)
+
+
+def test_parses_posts_in_category_order(parallel):
+    posts, _, _ = parallel
+    assert [post['title'] for post in posts] == [
+        'Cứu sống một trong ba người bị sóng cuốn trôi ở Lý Sơn',
+        'Hà Nội mở rộng đường vành đai',
+        NO_TITLE,
+        'Việt Nam thắng 3-0',
+        'Giải marathon quốc tế',
+    ]
+    assert [post['category_id'] for post in posts] == [1, 1, 1, 6, 6]
+
+
+def test_content_is_description_plus_paragraphs(parallel):
+    posts, _, _ = parallel
+    assert posts[0]['content'] == (
+        'QUẢNG NGÃIÔng Phạm Duy Quang - một trong ba người bị sóng cuốn ở biển Lý Sơn '
+        'đã được cứu sống sau hơn 40 giờ mất tích.\n\n'
+        'Sáng 8/11, ông Lê Văn Lương, Giám đốc Cảng vụ Hàng hải Quảng Ngãi cho biết khoảng 8h45, '
+        'thuyền trưởng tàu Hải Nam 39 phát hiện một người đang trôi dạt trên biển.\n'
+        'Nạn nhân được đưa vào bờ, sức khỏe ổn định.\n'
+        'Phạm Linh'
+    )
+    # Trang cần JavaScript, không có nội dung
+    assert posts[2]['content'] == NO_CONTENT
+
+
+def test_retries_after_429(parallel):
+    _, stats, _ = parallel
+    assert stats['retries'] == 1
+
+
+def test_concurrency_per_host_is_bounded(server):
+    _, _, elapsed = crawl(server, per_host=3, delay=0)
+    assert 1 < server.max_in_flight <= 3
+    _, _, sequential = crawl(server, per_host=1, delay=0)
+    assert server.max_in_flight == 1
+    assert elapsed < sequential
+
+
+def test_delay_between_requests_to_one_host(server):
+    crawl(server, per_host=3, delay=0.3)
+    gaps = [b - a for a, b in zip(server.starts, server.starts[1:])]
+    assert min(gaps) >= 0.29
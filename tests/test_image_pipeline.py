@@ -0,0 +1,59 @@
+import io
+import os
+
+from PIL import Image
+
+from app.core.image_pipeline import VARIANTS_SUBDIR, image_pipeline, local_path
+from conftest import wait_until
+
+
+# ===================================================================
+#  Ảnh phái sinh sau upload: ảnh tĩnh có bản WebP để đàm phán Accept,
+#  ảnh động chỉ có thumbnail tĩnh và luôn được phục vụ bằng file gốc.
+# ===================================================================
+
+ACCEPT_WEBP = {"Accept": "image/webp,image/*"}
+
+
+def _gif(frames):
+    buffer = io.BytesIO()
+    images = [Image.new("RGB", (800, 450), color) for color in ("red", "blue", "green")[:frames]]
+    images[0].save(buffer, format="GIF", save_all=True, append_images=images[1:], duration=100, loop=0)
+    return buffer.getvalue()
+
+
+def _upload(client, data):
+    processed = image_pipeline.processed
+    response = client.post("/images/upload", files={"file": ("anh.gif", data, "image/gif")})
+    assert response.status_code == 200, response.text
+    wait_until(lambda: image_pipeline.processed > processed, message="ảnh phái sinh chưa được tạo")
+    return response.json()["image_url"]
+
+
+def _variants(image_url):
+    directory, filename = os.path.split(local_path(image_url))
+    stem = os.path.splitext(filename)[0]
+    directory = os.path.join(directory, VARIANTS_SUBDIR)
+    return {name.split("-", 1)[1].rsplit(".", 1)[0] for name in os.listdir(directory) if name.startswith(stem)}
+
+
+def test_static_gif_is_negotiated_to_webp(client):
+    image_url = _upload(client, _gif(frames=1))
+    assert "full" in _variants(image_url)
+
+    response = client.get(image_url, headers=ACCEPT_WEBP)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+
+
+def test_animated_gif_keeps_its_frames(client):
+    data = _gif(frames=3)
+    image_url = _upload(client, data)
+    assert _variants(image_url) == {"thumb"}
+
+    response = client.get(image_url, headers=ACCEPT_WEBP)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/gif"
+    assert response.content == data
+    with Image.open(io.BytesIO(response.content)) as served:
+        assert served.n_frames == 3
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.core.linear_scorer import LinearScorer, check_exportable
+from conftest import preprocessed_dataset, sklearn_model
+
+
+# ===================================================================
+#  LinearScorer (.npz, thuần NumPy) phải cho kết quả giống pickle sklearn
+#  và từ chối model / vectorizer không tái tạo được.
+# ===================================================================
+
+SMALL_TEXTS = ["tin giả lan truyền", "bộ y_tế thông báo", "tin thật từ báo chí", "giả mạo bộ y_tế"]
+SMALL_LABELS = [0, 1, 1, 0]
+
+
+def _small_model(**vectorizer_options):
+    vectorizer = TfidfVectorizer(**vectorizer_options).fit(SMALL_TEXTS)
+    model = LogisticRegression().fit(vectorizer.transform(SMALL_TEXTS), SMALL_LABELS)
+    return vectorizer, model
+
+
+def test_matches_sklearn_on_dataset(tmp_path):
+    vectorizer, model = sklearn_model()
+    path = str(tmp_path / "model.npz")
+    LinearScorer.export(vectorizer, model, path)
+    scorer = LinearScorer.load(path)
+
+    texts = list(preprocessed_dataset())
+    features = vectorizer.transform(texts)
+    np.testing.assert_allclose(scorer.decision_function(texts), model.decision_function(features), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(scorer.predict_proba(texts), model.predict_proba(features), rtol=0, atol=1e-9)
+    assert np.array_equal(scorer.predict(texts), model.predict(features))
+
+
+def test_rejects_model_without_predict_proba():
+    vectorizer, svm = sklearn_model("svm_fake_news_model.pkl")
+    with pytest.raises(ValueError, match="predict_proba"):
+        check_exportable(vectorizer, svm)
+
+
+@pytest.mark.parametrize("options", [
+    {"tokenizer": str.split, "token_pattern": None},
+    {"preprocessor": str.upper},
+    {"strip_accents": "unicode"},
+    {"use_idf": False},
+    {"sublinear_tf": True},
+    {"analyzer": "char"},
+])
+def test_rejects_unreproducible_vectorizer(options):
+    with pytest.raises(ValueError):
+        check_exportable(*_small_model(**options))
+
+
+def test_small_model_round_trip(tmp_path):
+    vectorizer, model = _small_model(ngram_range=(1, 2))
+    path = str(tmp_path / "small.npz")
+    LinearScorer.export(vectorizer, model, path)
+    scorer = LinearScorer.load(path)
+    texts = SMALL_TEXTS + ["", "không có từ nào quen"]
+    np.testing.assert_allclose(
+        scorer.predict_proba(texts), model.predict_proba(vectorizer.transform(texts)), rtol=0, atol=1e-12
+    )
+
+
+def test_only_logistic_kind_is_supported():
+    with pytest.raises(ValueError):
+        LinearScorer({}, np.ones(1), np.ones(1), 0.0, np.array([0, 1]), kind="svm")
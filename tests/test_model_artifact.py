@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app.core.model_artifact import export_artifact, header_info, open_artifact, read_header, verify_artifact
+from conftest import preprocessed_dataset, sklearn_model
+
+
+# ===================================================================
+#  File .tgm (memmap) phải cho kết quả giống pickle sklearn; sha1 trong
+#  header phát hiện được file hỏng.
+# ===================================================================
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    vectorizer, model = sklearn_model()
+    path = str(tmp_path_factory.mktemp("artifact") / "model.tgm")
+    export_artifact(vectorizer, model, path)
+    return path, vectorizer, model
+
+
+def test_matches_sklearn_on_dataset(exported):
+    path, vectorizer, model = exported
+    texts = list(preprocessed_dataset())
+    scorer = open_artifact(path)
+    features = vectorizer.transform(texts)
+
+    np.testing.assert_allclose(scorer.decision_function(texts), model.decision_function(features), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(scorer.predict_proba(texts), model.predict_proba(features), rtol=0, atol=1e-9)
+    assert np.array_equal(scorer.predict(texts), model.predict(features))
+
+
+def test_header_describes_content(exported):
+    path, vectorizer, _ = exported
+    header = read_header(path)
+    sha1, nbytes = header_info(header)
+    assert sha1 and len(sha1) == 40
+    assert header["n_features"] == len(vectorizer.vocabulary_)
+    assert nbytes >= header["n_features"] * 16
+    assert verify_artifact(path)
+
+
+def test_corrupted_section_fails_verification(exported, tmp_path):
+    path, _, _ = exported
+    header = read_header(path)
+    data = bytearray(open(path, "rb").read())
+    data[header["sections"]["weighted_coef"]["offset"] + 3] ^= 0xFF
+    corrupted = tmp_path / "corrupted.tgm"
+    corrupted.write_bytes(bytes(data))
+
+    # Mở file không hash lại dữ liệu (O(1)), chỉ verify_artifact phát hiện
+    open_artifact(str(corrupted))
+    assert not verify_artifact(str(corrupted))
+
+
+def test_rejects_non_artifact(tmp_path):
+    path = tmp_path / "model.tgm"
+    path.write_bytes(b"not a model")
+    with pytest.raises(ValueError):
+        read_header(str(path))
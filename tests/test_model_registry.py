@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.core.linear_scorer import LinearScorer
+from app.core.model_registry import ModelRegistry
+from conftest import wait_until
+
+
+# ===================================================================
+#  Nạp lại model khi file đổi: chạy ở thread nền, không trong get();
+#  file hỏng thì giữ handle cũ.
+# ===================================================================
+
+TEXTS = ["tin giả lan truyền", "bộ y_tế thông báo", "tin thật từ báo chí", "giả mạo bộ y_tế"]
+
+
+def _export(path, labels, mtime):
+    vectorizer = TfidfVectorizer().fit(TEXTS)
+    model = LogisticRegression().fit(vectorizer.transform(TEXTS), labels)
+    LinearScorer.export(vectorizer, model, path)
+    # mtime khác hẳn lần ghi trước (độ phân giải mtime của filesystem)
+    os.utime(path, (mtime, mtime))
+
+
+def _corrupt(path, mtime):
+    with open(path, "wb") as f:
+        f.write(b"truncated model file")
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = str(tmp_path / "model.npz")
+    _export(path, [0, 1, 1, 0], mtime=1_000_000)
+    registry = ModelRegistry(path, "", watch_interval=0.05)
+    registry.get()
+    yield registry
+    registry.stop()
+
+
+def test_get_never_loads_after_startup(registry, monkeypatch):
+    handle = registry.get()
+    _export(registry.model_path, [1, 0, 0, 1], mtime=1_000_010)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("get() không được nạp model")
+
+    monkeypatch.setattr(registry, "load", fail)
+    assert registry.get() is handle
+
+
+def test_corrupt_file_keeps_old_handle(registry):
+    handle = registry.get()
+    _corrupt(registry.model_path, mtime=1_000_010)
+
+    assert not registry.reload_if_changed()
+    assert registry.get() is handle
+    assert registry.reload_failures == 1
+    assert registry.stats()["last_reload_error"]
+
+    # Không thử lại cùng 1 file hỏng ở mỗi lượt
+    assert not registry.reload_if_changed()
+    assert registry.reload_failures == 1
+
+    _export(registry.model_path, [1, 0, 0, 1], mtime=1_000_020)
+    assert registry.reload_if_changed()
+    assert registry.get() is not handle
+    assert registry.stats()["last_reload_error"] is None
+
+
+def test_watcher_swaps_in_background(registry):
+    handle = registry.get()
+    swapped = []
+    registry.add_listener(swapped.append)
+    registry.start()
+
+    _corrupt(registry.model_path, mtime=1_000_010)
+    wait_until(lambda: registry.reload_failures == 1, message="thread theo dõi chưa thấy file đổi")
+    assert registry.get() is handle
+
+    _export(registry.model_path, [1, 0, 0, 1], mtime=1_000_020)
+    wait_until(lambda: swapped, message="model mới chưa được swap")
+    assert registry.get() is swapped[0]
+    assert registry.get().model.predict(["tin giả lan truyền"])[0] == 1
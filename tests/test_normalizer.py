@@ -0,0 +1,53 @@
+import math
+import random
+
+import pytest
+
+from app.dependency.normalizer import normalize_text
+from app.dependency.standard import clean_text, normalize_repeated_chars, remove_extra_punctuation
+from conftest import dataset_texts
+
+
+# ===================================================================
+#  normalize_text phải cho kết quả giống hệt pipeline regex cũ
+#      remove_extra_punctuation(normalize_repeated_chars(clean_text(text)))
+# ===================================================================
+
+def reference(text):
+    return remove_extra_punctuation(normalize_repeated_chars(clean_text(text)))
+
+
+GOLDEN = [
+    ("Bộ Y Tế   cảnh báo!!!", "bộ y tế cảnh báo!"),
+    ("Xem tại https://vnexpress.net/abc hoặc www.abc.vn", "xem tại hoặc"),
+    ("Liên hệ a.b@gmail.com / 0912345678", "liên hệ"),
+    ("<b>Tin</b> nóng 😀😀 ☃️", "tin nóng"),
+    ("quáaaaa hayyy...", "quáa hay."),
+    ("snake_case__text", "snake case text"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("text, expected", GOLDEN)
+def test_golden(text, expected):
+    assert normalize_text(text) == expected
+    assert reference(text) == expected
+
+
+@pytest.mark.parametrize("value, expected", [(None, ""), (math.nan, ""), (12345, "12345")])
+def test_non_string_input(value, expected):
+    assert normalize_text(value) == expected
+
+
+def test_matches_reference_on_dataset():
+    texts = dataset_texts()
+    mismatches = [text for text in texts if normalize_text(text) != reference(text)]
+    assert not mismatches, mismatches[:5]
+
+
+def test_matches_reference_on_random_strings():
+    alphabet = list("aAbB ._-!?,\n\t <>@/:wwhttp0123456789đĐàÀ😀‍☃️#$%*()\x1c İẞ")
+    rng = random.Random(1)
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        assert normalize_text(text) == reference(text), repr(text)
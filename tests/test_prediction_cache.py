@@ -0,0 +1,78 @@
+import sys
+
+from app.core import prediction_cache as prediction_cache_module
+from app.core.inference import Prediction
+from app.core.prediction_cache import MemoryBackend, PredictionCache, prediction_cache
+from conftest import run
+
+
+# ===================================================================
+#  Cache dự đoán: backend dùng chung được await (không chặn event loop),
+#  lỗi của backend dùng chung không làm hỏng request.
+# ===================================================================
+
+PREDICTION = Prediction(classes=(0, 1), probabilities=(0.25, 0.75), model_version="1-abc")
+
+
+class AsyncSharedBackend:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append("get")
+        if self.fail:
+            raise ConnectionError("redis không phản hồi")
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.calls.append("set")
+        if self.fail:
+            raise ConnectionError("redis không phản hồi")
+        self.data[key] = value
+
+    def clear(self):
+        pass
+
+
+def _cache(shared):
+    return PredictionCache(MemoryBackend(100, 60), shared=shared)
+
+
+def test_shared_backend_is_shared_between_workers():
+    shared = AsyncSharedBackend()
+    run(_cache(shared).set("Tiêu đề", "Nội dung", "tieu_de noi_dung", PREDICTION))
+
+    # Worker khác: cache trong process trống, lấy từ backend dùng chung
+    other = _cache(shared)
+    assert run(other.get("Tiêu đề", "Nội dung", "1-abc")) == ("tieu_de noi_dung", PREDICTION)
+    assert run(other.get("tiêu  đề", "nội dung", "1-abc")) is not None
+    assert shared.calls == ["set", "get"]
+    assert run(other.get("Tiêu đề", "Nội dung", "2-def")) is None
+
+
+def test_shared_backend_errors_fall_back_to_memory():
+    cache = _cache(AsyncSharedBackend(fail=True))
+    run(cache.set("Tiêu đề", "Nội dung", "tieu_de noi_dung", PREDICTION))
+    assert run(cache.get("Tiêu đề", "Nội dung", "1-abc")) == ("tieu_de noi_dung", PREDICTION)
+    assert run(cache.get("Khác", "Nội dung", "1-abc")) is None
+    assert cache.stats()["shared_errors"] == 2
+
+
+def test_missing_redis_package_is_logged(monkeypatch, capsys):
+    monkeypatch.setattr(prediction_cache_module, "PREDICTION_CACHE_URL", "redis://localhost:6379/0")
+    monkeypatch.setitem(sys.modules, "redis", None)
+    assert prediction_cache_module._build_shared_backend() is None
+    assert "redis" in capsys.readouterr().err
+
+
+def test_route_uses_cache(client):
+    prediction_cache.invalidate()
+    payload = {"title": "Bộ Y tế cảnh báo", "content": "Thông tin về thuốc chữa bệnh lan truyền trên mạng xã hội"}
+    hits = prediction_cache.hits
+    first = client.post("/posts/analyze", json=payload)
+    second = client.post("/posts/analyze", json=payload)
+    assert first.status_code == second.status_code == 200, first.text
+    assert first.json() == second.json()
+    assert prediction_cache.hits == hits + 1
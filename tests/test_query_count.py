@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import engine
+from app.core.feed_cache import feed_cache
+from app.core.search_index import search_index
+from app.models.Categories import Category
+from app.models.Post_images import PostImage
+from app.models.Posts import Post
+from app.models.User import User
+from conftest import auth_headers, wait_until
+
+
+# ===================================================================
+#  KIỂM TRA SỐ QUERY (N+1)
+#  Gọi các endpoint trả bài viết qua HTTP (TestClient, routing thật) với
+#  ít và nhiều bài viết (mỗi bài 2 ảnh) và đếm số câu SQL: số query phải
+#  cố định, không tăng theo số bài viết.
+# ===================================================================
+
+# (tên, path, params, số query): bài viết + selectin ảnh; my-posts thêm 1 query đọc user đăng nhập
+ENDPOINTS = [
+    ("GET /posts/", "/posts/", {}, 2),
+    ("GET /posts/?status", "/posts/", {"status": "published"}, 2),
+    ("GET /posts/published", "/posts/published", {}, 2),
+    ("GET /posts/category/{id}", "/posts/category/1", {}, 2),
+    ("GET /posts/{id}", "/posts/1", {}, 2),
+    ("GET /posts/draft", "/posts/draft", {"user_id": 1}, 2),
+    ("GET /posts/search", "/posts/search", {"q": "tin"}, 2),
+    ("GET /posts/user/my-posts", "/posts/user/my-posts", {}, 3),
+]
+
+
+def _rows(n_posts):
+    base = datetime(2025, 1, 1)
+    return (
+        (User, [{"id": 1, "username": "user1", "email": "user1@example.com",
+                 "password_hash": "hash", "phone_number": "0900000000", "is_admin": False}]),
+        (Category, [{"id": 1, "name": "Thời sự", "slug": "thoi-su"}]),
+        (Post, [{
+            "id": i, "user_id": 1, "category_id": 1, "title": f"Tin số {i}", "content": "nội dung tin",
+            "status": "published" if i % 2 else "draft",
+            "published_at": base + timedelta(hours=i), "updated_at": base + timedelta(hours=i),
+        } for i in range(1, n_posts + 1)]),
+        (PostImage, [{
+            "post_id": i, "image_url": f"/uploads/images/{i}-{k}.jpg", "is_main": k == 1,
+        } for i in range(1, n_posts + 1) for k in range(2)]),
+    )
+
+
+@contextmanager
+def _count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("use_fts", [True, False], ids=["fts", "ilike"])
+@pytest.mark.parametrize("n_posts", [5, 60])
+def test_query_count_does_not_grow_with_posts(database, app_client, monkeypatch, n_posts, use_fts):
+    database(*_rows(n_posts))
+    with app_client() as client:
+        wait_until(lambda: search_index.stats()["populated"])
+        if not use_fts:
+            monkeypatch.setattr(search_index, "available", False)
+        counts = {}
+        for name, path, params, _ in ENDPOINTS:
+            # Đếm query khi feed cache trống (miss)
+            feed_cache.invalidate()
+            with _count_statements() as statements:
+                response = client.get(path, params={**params, "limit": 100}, headers=auth_headers(1, "user1"))
+            assert response.status_code == 200, (name, response.text)
+            body = response.json()
+            rows = body if isinstance(body, list) else [body]
+            assert rows, name
+            # Ảnh được nạp cùng trang (danh sách: ảnh chính is_main, chi tiết: mọi ảnh)
+            for row in rows:
+                urls = [image["image_url"] for image in row["images"]] if "images" in row else [row["main_image_url"]]
+                assert f"/uploads/images/{row['id']}-1.jpg" in urls, name
+            counts[name] = len(statements)
+
+    assert counts == {name: expected for name, _, _, expected in ENDPOINTS}
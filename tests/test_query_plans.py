@@ -0,0 +1,180 @@
+import os
+import random
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, event, insert, text
+
+from app.core.config import DATABASE_URL, Base, engine
+from app.core.search_index import search_index
+from app.models.Categories import Category
+from app.models.Post_images import PostImage
+from app.models.Posts import Post
+from app.models.User import User
+from conftest import ROOT, auth_headers, run
+
+
+# ===================================================================
+#  KIỂM TRA QUERY PLAN
+#  Database tạo bằng migration (alembic upgrade head) + seed dữ liệu; gọi
+#  các route thật qua TestClient, ghi lại mọi câu SELECT gửi xuống DB rồi
+#  chạy EXPLAIN QUERY PLAN: quét cả bảng (SCAN <bảng> không dùng index)
+#  hoặc sort tạm (USE TEMP B-TREE) là lỗi. Riêng selectinload(Post.images)
+#  được sort: chỉ gồm ảnh của các bài viết trong 1 trang (post_id IN (...)).
+# ===================================================================
+
+DB_PATH = DATABASE_URL.split("///", 1)[1]
+FULL_SCAN_RE = re.compile(r"^SCAN (posts|post_images|users|categories)$")
+SELECTIN_RE = re.compile(r"WHERE post_images\.post_id IN \(")
+
+# (method, path, params, cần đăng nhập); route danh sách được gọi thêm 1 lần với X-Next-Cursor
+ROUTES = [
+    ("GET", "/posts/", {}, False),
+    ("GET", "/posts/", {"user_id": 3}, False),
+    ("GET", "/posts/", {"category_id": 4}, False),
+    ("GET", "/posts/published", {}, False),
+    ("GET", "/posts/category/4", {}, False),
+    ("GET", "/posts/draft", {"user_id": 3}, False),
+    ("GET", "/posts/search", {"q": "tin"}, False),
+    ("GET", "/posts/user/my-posts", {}, True),
+    ("GET", "/posts/42", {}, False),
+    ("POST", "/users/login", None, False),
+]
+
+
+async def _drop_all():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    await engine.dispose()
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, "src", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", DATABASE_URL)
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _migrate():
+    from alembic import command
+
+    run(_drop_all())
+    command.upgrade(_alembic_config(), "head")
+
+
+def _seed(n_posts: int = 5000):
+    rng = random.Random(0)
+    base = datetime(2025, 1, 1)
+    seed_engine = create_engine(f"sqlite:///{DB_PATH}")
+    with seed_engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+             "password_hash": bcrypt.using(rounds=4).hash(f"matkhau{i}"), "phone_number": "0900000000", "is_admin": False}
+            for i in range(1, 51)
+        ])
+        conn.execute(insert(Category), [
+            {"id": i, "name": f"Danh mục {i}", "slug": f"danh-muc-{i}"} for i in range(1, 11)
+        ])
+        posts = []
+        for i in range(1, n_posts + 1):
+            status = rng.choice(["published", "published", "published", "draft", "archived"])
+            posts.append({
+                "id": i, "user_id": rng.randint(1, 50), "category_id": rng.randint(1, 10),
+                "title": f"Tin số {i}", "content": "nội dung " * 20, "status": status,
+                "published_at": base + timedelta(minutes=rng.randint(0, 500000)) if status == "published" else None,
+                "updated_at": base + timedelta(minutes=rng.randint(0, 500000)) if rng.random() < 0.8 else None,
+            })
+        conn.execute(insert(Post), posts)
+        conn.execute(insert(PostImage), [
+            {"post_id": rng.randint(1, n_posts), "image_url": f"/uploads/images/{i}.jpg", "is_main": False}
+            for i in range(n_posts * 2)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    seed_engine.dispose()
+
+
+@contextmanager
+def _record_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def _call(client, method, path, params, login):
+    headers = auth_headers(3, "user3") if login else {}
+    if method == "POST":
+        response = client.post(path, json={"username": "user3", "password": "matkhau3"})
+        assert response.status_code == 200, response.text
+        return
+    response = client.get(path, params={**params, "limit": 20}, headers=headers)
+    assert response.status_code == 200, (path, response.text)
+    cursor = response.headers.get("x-next-cursor")
+    if cursor:
+        client.get(path, params={**params, "limit": 20, "cursor": cursor}, headers=headers)
+
+
+def _explain(conn, statement, parameters):
+    details = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    sort_allowed = bool(SELECTIN_RE.search(statement))
+    return details, [d for d in details if FULL_SCAN_RE.match(d) or ("TEMP B-TREE" in d and not sort_allowed)]
+
+
+@pytest.fixture
+def migrated(database, search_index_path):
+    _migrate()
+    _seed()
+
+
+def test_migrations_match_models(migrated):
+    from alembic import command
+
+    # Index khai báo trong models (__table_args__) == index tạo bởi migration
+    command.check(_alembic_config())
+
+
+@pytest.mark.parametrize("use_fts", [True, False], ids=["fts", "ilike"])
+def test_route_queries_use_indexes(migrated, monkeypatch, use_fts):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        if not use_fts:
+            monkeypatch.setattr(search_index, "available", False)
+        with _record_selects() as statements:
+            for method, path, params, login in ROUTES:
+                _call(client, method, path, params, login)
+
+    assert len(statements) >= len(ROUTES)
+    problems = {}
+    with sqlite3.connect(DB_PATH) as conn:
+        for statement, parameters in statements:
+            details, bad = _explain(conn, statement, parameters)
+            if bad:
+                problems[statement] = details
+    assert not problems, problems
+
+
+def test_category_listing_uses_category_index(migrated):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client, _record_selects() as statements:
+        client.get("/posts/category/4", params={"limit": 20})
+    with sqlite3.connect(DB_PATH) as conn:
+        plans = [_explain(conn, statement, parameters)[0] for statement, parameters in statements]
+    assert any("ix_posts_category_id_updated_at" in detail for details in plans for detail in details), plans
@@ -0,0 +1,135 @@
+import shutil
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import SessionLocal
+from app.core.db_pool import create_db_engine
+from app.core.db_replicas import ReplicaRouter
+from app.dependency import database as database_module
+from app.dependency.database import PRIMARY_PIN_HEADER, sign_pin
+from app.models.Posts import Post
+from app.models.User import User
+from conftest import run
+
+
+USER = {"id": 1, "username": "u", "email": "u@example.com", "password_hash": "x", "phone_number": "0"}
+POST = {"id": 1, "user_id": 1, "title": "t", "content": "c", "status": "published"}
+
+
+@pytest.fixture
+def stale_replica(database, monkeypatch, tmp_path):
+    """Replica là bản sao database tại thời điểm này (không nhận các lần ghi sau)."""
+    from app.core.config import DATABASE_URL
+
+    database((User, [USER]), (Post, [POST]))
+    replica_path = tmp_path / "replica.db"
+    shutil.copy(DATABASE_URL.split("///", 1)[1], replica_path)
+    router = ReplicaRouter(SessionLocal, [f"sqlite+aiosqlite:///{replica_path}"])
+    monkeypatch.setattr(database_module, "replica_router", router)
+    return router
+
+
+def _published(client, headers=None):
+    return [post["id"] for post in client.get("/posts/published", headers=headers or {}).json()]
+
+
+def test_signed_pin_reads_own_write(stale_replica, app_client):
+    with app_client() as client:
+        response = client.post("/posts/1/unpublish")
+        pin = response.headers[PRIMARY_PIN_HEADER]
+        assert "set-cookie" not in response.headers
+
+        assert _published(client, {PRIMARY_PIN_HEADER: pin}) == []
+        # Không ghim: replica chưa đồng bộ
+        assert _published(client) == [1]
+
+
+def test_unsigned_or_forged_pins_are_ignored(stale_replica, app_client):
+    soon = int(time.time()) + 3
+    forged = [
+        str(soon),
+        f"{soon}.{'0' * 64}",
+        sign_pin(soon).replace(str(soon), str(soon + 1), 1),
+        # Chữ ký đúng nhưng ghim quá DB_READ_YOUR_WRITES_SECONDS
+        sign_pin(int(time.time()) + 3600),
+        sign_pin(int(time.time()) - 1),
+    ]
+    with app_client() as client:
+        client.post("/posts/1/unpublish")
+        before = stale_replica.primary_reads
+        for value in forged:
+            assert _published(client, {PRIMARY_PIN_HEADER: value}) == [1], value
+        assert stale_replica.primary_reads == before
+
+
+def test_pin_header_is_exposed_to_the_frontend(stale_replica, app_client):
+    with app_client() as client:
+        response = client.post("/posts/1/unpublish", headers={"Origin": "http://localhost:5500"})
+        assert PRIMARY_PIN_HEADER in response.headers["access-control-expose-headers"]
+
+
+# ===================================================================
+#  Failover: primary + replica là các file SQLite có dữ liệu khác nhau
+#  để biết session đọc từ đâu; replica thứ 3 trỏ tới file không mở được.
+# ===================================================================
+
+async def _create_node(url, name):
+    engine = create_db_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE node (name TEXT)"))
+        await conn.execute(text("INSERT INTO node VALUES (:name)"), {"name": name})
+    await engine.dispose()
+
+
+async def _read_node(router, pinned=False):
+    async with router.session(pinned=pinned) as db:
+        return (await db.execute(text("SELECT name FROM node"))).scalar_one()
+
+
+async def _read_nodes(router, count, pinned=False):
+    return [await _read_node(router, pinned) for _ in range(count)]
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    def url(name):
+        return f"sqlite+aiosqlite:///{tmp_path / name}"
+
+    for name in ("primary", "replica1", "replica2"):
+        run(_create_node(url(f"{name}.db"), name))
+    primary_engine = create_db_engine(url("primary.db"))
+    primary = async_sessionmaker(bind=primary_engine, expire_on_commit=False)
+    broken = url("missing/replica3.db")
+    router = ReplicaRouter(primary, [url("replica1.db"), url("replica2.db"), broken], retry_seconds=60)
+    yield router
+    run(router.dispose())
+    run(primary_engine.dispose())
+
+
+def test_round_robin_skips_broken_replica(nodes):
+    reads = run(_read_nodes(nodes, 6))
+    assert sorted(set(reads)) == ["replica1", "replica2"]
+    assert nodes.failures == [0, 0, 1]
+    assert [node["healthy"] for node in nodes.stats()] == [True, True, False]
+    assert nodes.primary_reads == 0
+
+
+def test_broken_replica_is_not_retried_within_retry_seconds(nodes):
+    run(_read_nodes(nodes, 10))
+    assert nodes.failures[2] == 1
+    assert sum(nodes.reads) == 10
+
+
+def test_pinned_read_goes_to_primary(nodes):
+    assert run(_read_nodes(nodes, 3, pinned=True)) == ["primary"] * 3
+    assert nodes.reads == [0, 0, 0]
+
+
+def test_all_replicas_down_falls_back_to_primary(nodes):
+    for index in range(len(nodes.engines)):
+        nodes.mark_down(index)
+    assert run(_read_node(nodes)) == "primary"
+    assert nodes.primary_reads == 1
@@ -0,0 +1,103 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from app.core.search_index import search_index
+from app.models.Posts import Post
+from app.models.User import User
+from conftest import wait_until
+
+
+USER = {"id": 1, "username": "u", "email": "u@example.com", "password_hash": "x", "phone_number": "0"}
+
+
+def _posts(count, **extra):
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "title": f"Tin y tế số {i}" if i % 2 else f"Giá xăng kỳ {i}",
+            "content": "Bộ Y tế cảnh báo dịch bệnh. " * (i % 4 + 1) if i % 2 else "Điều chỉnh giá xăng dầu.",
+            "status": "published",
+            "published_at": base + timedelta(days=i),
+            **extra,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _populated():
+    return search_index.stats()["populated"]
+
+
+def test_search_and_draft_not_shadowed_by_post_id(database, app_client):
+    draft = {"id": 3, "user_id": 1, "title": "Nháp", "content": "c", "status": "draft", "published_at": None}
+    database((User, [USER]), (Post, _posts(2) + [draft]))
+    with app_client() as client:
+        wait_until(_populated)
+        response = client.get("/posts/search", params={"q": "xăng"})
+        assert response.status_code == 200
+        assert [post["id"] for post in response.json()] == [2]
+
+        response = client.get("/posts/draft", params={"user_id": 1})
+        assert response.status_code == 200
+        assert [post["id"] for post in response.json()] == [3]
+
+        assert client.get("/posts/2").json()["id"] == 2
+
+
+def test_existing_posts_are_backfilled_on_startup(database, app_client):
+    database((User, [USER]), (Post, _posts(6)))
+    with app_client() as client:
+        wait_until(_populated, message="backfill không xong")
+        # Không dấu vẫn tìm được (ILIKE không làm được)
+        ids = [post["id"] for post in client.get("/posts/search", params={"q": "y te"}).json()]
+        assert sorted(ids) == [1, 3, 5]
+        assert search_index.stats()["documents"] == 6
+
+
+def test_falls_back_to_ilike_until_index_is_populated(database, client, search_index_path):
+    database((User, [USER]), (Post, _posts(4)))
+    wait_until(_populated)
+    with sqlite3.connect(search_index_path) as conn:
+        conn.execute("DELETE FROM posts_fts_state")
+        conn.execute("DELETE FROM posts_fts")
+
+    ids = [post["id"] for post in client.get("/posts/search", params={"q": "xăng"}).json()]
+    assert ids == [4, 2]
+
+
+def test_cursor_pages_follow_bm25_order(database, app_client):
+    database((User, [USER]), (Post, _posts(11)))
+    with app_client() as client:
+        wait_until(_populated)
+        everything = [post["id"] for post in client.get("/posts/search", params={"q": "y tế", "limit": 100}).json()]
+        assert sorted(everything) == [1, 3, 5, 7, 9, 11]
+        # Thứ hạng bm25 khác thứ tự published_at của ILIKE
+        assert everything != [11, 9, 7, 5, 3, 1]
+
+        pages, cursor = [], None
+        while True:
+            params = {"q": "y tế", "limit": 4}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/posts/search", params=params)
+            pages.append([post["id"] for post in response.json()])
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert len(pages) == 2
+        assert sum(pages, []) == everything
+
+
+def test_index_follows_commits(database, client):
+    database((User, [USER]), (Post, _posts(2)))
+    wait_until(_populated)
+
+    response = client.put("/posts/2", json={"title": "Đường sắt cao tốc"})
+    assert response.status_code == 200
+    search = lambda q: [post["id"] for post in client.get("/posts/search", params={"q": q}).json()]  # noqa: E731
+    wait_until(lambda: search("duong sat") == [2], message="index không cập nhật sau commit")
+    client.delete("/posts/2")
+    wait_until(lambda: search("duong sat") == [], message="index không xóa bài viết")
+
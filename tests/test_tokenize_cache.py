@@ -0,0 +1,58 @@
+import pytest
+from underthesea import word_tokenize
+
+from app.dependency.normalizer import normalize_text
+from app.dependency.standard import vietnamese_tokenize
+from app.dependency.tokenize_cache import SentenceTokenizeCache
+from conftest import dataset_texts
+
+
+# ===================================================================
+#  Cache tách từ theo câu phải cho kết quả giống hệt word_tokenize
+#  (underthesea đang cài) trên câu mẫu và toàn bộ dataset đi kèm.
+# ===================================================================
+
+GOLDEN = [
+    # Ví dụ trong docstring của underthesea.word_tokenize, kết quả thật của
+    # model trong underthesea==1.4.0 ("báo tin" không được ghép như docstring)
+    ("Bác sĩ bây giờ có thể thản nhiên báo tin bệnh nhân bị ung thư",
+     "Bác_sĩ bây_giờ có_thể thản_nhiên báo tin bệnh_nhân bị ung_thư"),
+    # Sau normalize_text (chữ thường)
+    ("bác sĩ bây giờ có thể thản nhiên báo tin bệnh nhân bị ung thư",
+     "bác_sĩ bây_giờ có_thể thản_nhiên báo tin bệnh_nhân bị ung_thư"),
+]
+
+
+@pytest.fixture(scope="module")
+def cache():
+    cache = SentenceTokenizeCache(max_entries=100000)
+    # underthesea khác 1.4.0 (không có API nội bộ) -> cache tắt, không có gì để so
+    assert cache.enabled, "underthesea không có CRFModel / regex_tokenize (cần underthesea==1.4.0)"
+    return cache
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return [text for text in (normalize_text(raw) for raw in dataset_texts()) if text]
+
+
+@pytest.mark.parametrize("text, expected", GOLDEN)
+def test_golden_sentences(cache, text, expected):
+    assert word_tokenize(text, format="text") == expected
+    assert cache.tokenize(text) == expected
+    assert vietnamese_tokenize(text) == expected
+
+
+def test_matches_word_tokenize_on_dataset(cache, texts):
+    expected = [word_tokenize(text, format="text") for text in texts]
+    # Lượt 2 lấy nhãn từ cache
+    for _ in range(2):
+        assert [cache.tokenize(text) for text in texts] == expected
+    assert cache.stats()["hits"] > 0
+
+
+def test_matches_word_tokenize_across_joined_texts(cache, texts):
+    # Câu ở chỗ nối 2 văn bản có ngữ cảnh khác -> phải chạy lại CRF, không lấy nhầm cache
+    for first, second in zip(texts[:200], texts[1:201]):
+        joined = f"{first} {second}"
+        assert cache.tokenize(joined) == word_tokenize(joined, format="text")